@@ -1,10 +1,10 @@
 import json
 import uuid
-from typing import Dict, Any
-import openai
-from anthropic import Anthropic
+from typing import Dict, Any, Optional
 
 from app.core.config import settings
+from app.core.key_pool import key_pool
+from app.core.model_routing import model_router
 
 
 class ArticleAgent:
@@ -22,14 +22,9 @@ class ArticleAgent:
     def __init__(self):
         self.llm_provider = settings.LLM_PROVIDER
         model = settings.ARTICLE_LLM_MODEL or settings.OPENAI_MODEL
-        self.openai_client = openai.AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=60.0
-        ) if settings.OPENAI_API_KEY else None
-        self.anthropic_client = Anthropic(
-            api_key=settings.ANTHROPIC_API_KEY
-        ) if settings.ANTHROPIC_API_KEY else None
+        # 每次调用从 Key 池中选择负载最低的 Key
+        self.openai_client = key_pool.client("openai", timeout=60.0)
+        self.anthropic_client = key_pool.client("claude", timeout=60.0)
         self.model = model
         self.temperature = settings.ARTICLE_LLM_TEMPERATURE if hasattr(settings, 'ARTICLE_LLM_TEMPERATURE') else 0.7
 
@@ -327,20 +322,28 @@ class ArticleAgent:
         }
 
     async def _call_llm(self, prompt: str) -> str:
-        """调用 LLM"""
-        if self.llm_provider == 'anthropic' and self.anthropic_client:
-            message = self.anthropic_client.messages.create(
-                model=self.model,
-                max_tokens=4000,
+        """调用 LLM（按阶段路由模型，经录像带录制/回放）"""
+        return await model_router.call(
+            "article", "article", prompt,
+            lambda model, max_tokens, provider: self._request_llm(prompt, model, max_tokens, provider), self.model
+        )
+
+    async def _request_llm(self, prompt: str, model: str, max_tokens: int, provider: Optional[str] = None) -> str:
+        """向 LLM 提供商发起请求，provider 默认为配置的主提供商"""
+        provider = provider or self.llm_provider
+        if provider in ('claude', 'anthropic') and self.anthropic_client:
+            message = await self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
                 temperature=self.temperature,
                 messages=[{"role": "user", "content": prompt}]
             )
             return message.content[0].text
         elif self.openai_client:
             response = await self.openai_client.chat.completions.create(
-                model=self.model,
+                model=model,
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=4000,
+                max_tokens=max_tokens,
                 temperature=self.temperature
             )
             return response.choices[0].message.content
@@ -1,11 +1,19 @@
 import json
 import uuid
-from typing import List, Dict, Any, AsyncGenerator
-import openai
-from anthropic import Anthropic
+from typing import List, Dict, Any, AsyncGenerator, Callable, Optional
 import hashlib
 
 from app.core.config import settings
+from app.core.key_pool import key_pool
+from app.core.metrics import metrics
+from app.core.model_routing import model_router
+from app.core.text import normalize_text, bigram_similarity
+from app.core.json_stream import JSONStreamExtractor
+from app.agents.preclassifier import clarification_for
+
+
+# on_query(搜索查询, 目前已解析出的分析字段)
+QueryCallback = Callable[[str, Dict[str, Any]], None]
 
 
 class ParserAgent:
@@ -15,34 +23,65 @@ class ParserAgent:
 
     def __init__(self):
         self.llm_provider = settings.LLM_PROVIDER
-        self.openai_client = openai.AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL
-        ) if settings.OPENAI_API_KEY else None
-        self.anthropic_client = Anthropic(
-            api_key=settings.ANTHROPIC_API_KEY
-        ) if settings.ANTHROPIC_API_KEY else None
+        # 每次调用从 Key 池中选择负载最低的 Key
+        self.openai_client = key_pool.client("openai")
+        self.anthropic_client = key_pool.client("claude")
+        self.model = settings.ANTHROPIC_MODEL if self.llm_provider == "claude" else settings.OPENAI_MODEL
 
     def _get_cache_key(self, content: str) -> str:
         return hashlib.md5(content.encode()).hexdigest()
 
-    async def parse(self, content: str) -> Dict[str, Any]:
-        """分析查询并生成搜索方案"""
+    def _precheck(self, task_id: str, content: str) -> Optional[Dict[str, Any]]:
+        """本地预分类：明显无法核实的输入直接返回澄清结果，不调用 LLM"""
+        clarification = clarification_for(content)
+        if clarification is None:
+            return None
+        print(f"[ParserAgent] Pre-classified as {clarification['input_type']} ({clarification['confidence']}), skipping LLM")
+        metrics.incr("parser_preclassified", input_type=clarification["input_type"])
+        return {
+            "task_id": task_id,
+            "original_query": content,
+            "is_event": False,
+            "needs_clarification": True,
+            "clarification_prompt": clarification["clarification_prompt"],
+            "analysis": {},
+            "search_queries": [],
+            "metadata": {
+                "source_type": "user_input",
+                "content_length": len(content),
+                "timestamp": str(uuid.uuid1()),
+                "input_type": clarification["input_type"],
+                "preclassifier_confidence": clarification["confidence"]
+            }
+        }
+
+    async def parse(self, content: str, on_query: Optional[QueryCallback] = None) -> Dict[str, Any]:
+        """
+        分析查询并生成搜索方案
+
+        给定 on_query 时流式读取 LLM 输出，search_queries 中的每条查询一生成完就回调，
+        下游可以在分析结束前开始搜索
+        """
         task_id = str(uuid.uuid4())
 
+        clarification = self._precheck(task_id, content)
+        if clarification:
+            return clarification
+
         cache_key = self._get_cache_key(content)
         if cache_key in self._cache:
             cached_result = self._cache[cache_key].copy()
             cached_result["task_id"] = task_id
             return cached_result
 
-        analysis = await self._analyze_query(content)
+        analysis = await self._analyze_query(content, on_query)
 
         result = {
             "task_id": task_id,
             "original_query": content,
             "analysis": analysis,
             "search_queries": analysis.get("search_queries", []),
+            "claims": self._extract_claims(analysis, content),
             "metadata": {
                 "source_type": "user_input",
                 "content_length": len(content),
@@ -53,10 +92,27 @@ class ParserAgent:
         self._cache[cache_key] = result.copy()
         return result
 
-    async def parse_stream(self, content: str) -> AsyncGenerator[Dict[str, Any], None]:
-        """流式分析查询"""
+    async def parse_stream(self, content: str,
+                           on_query: Optional[QueryCallback] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """流式分析查询，on_query 同 parse"""
         task_id = str(uuid.uuid4())
 
+        clarification = self._precheck(task_id, content)
+        if clarification:
+            yield {
+                "type": "reasoning",
+                "agent": "parser",
+                "step": "输入预判",
+                "content": f"💡 输入内容不构成可核实的事件，需要补充信息\n"
+                           f"   {clarification['clarification_prompt']}"
+            }
+            yield {
+                "type": "result",
+                "agent": "parser",
+                "data": clarification
+            }
+            return
+
         cache_key = self._get_cache_key(content)
         if cache_key in self._cache:
             yield {
@@ -86,7 +142,7 @@ class ParserAgent:
                        "   4. 评估验证需求：是否需要多源交叉验证"
         }
 
-        analysis = await self._analyze_query(content)
+        analysis = await self._analyze_query(content, on_query)
 
         # 输出详细分析结果
         core_entities = analysis.get('core_entities', [])
@@ -152,11 +208,22 @@ class ParserAgent:
                            f"      目的: 从不同角度收集信息，确保全面覆盖"
             }
 
+        claims = self._extract_claims(analysis, content)
+        if len(claims) > 1:
+            yield {
+                "type": "reasoning",
+                "agent": "parser",
+                "step": "主张拆分",
+                "content": f"🧩 内容包含 {len(claims)} 个可独立核实的主张，将分别核查:\n" +
+                           chr(10).join([f"   {c['claim_id']}. {c['claim_text']}" for c in claims])
+            }
+
         result = {
             "task_id": task_id,
             "original_query": content,
             "analysis": analysis,
             "search_queries": queries,
+            "claims": claims,
             "metadata": {
                 "source_type": "user_input",
                 "content_length": len(content),
@@ -171,7 +238,53 @@ class ParserAgent:
             "data": result
         }
 
-    async def _analyze_query(self, content: str) -> Dict[str, Any]:
+    def _extract_claims(self, analysis: Dict[str, Any], content: str) -> List[Dict[str, Any]]:
+        """
+        规范化 LLM 拆分出的原子主张：去重、限制数量并重新编号为 c1..cN
+
+        相似的主张合并为一条，搜索查询取并集。未拆分、只有一个主张或关闭拆分时，
+        整条内容作为唯一的主张 c1，沿用完整的搜索查询列表。
+        """
+        single = [{
+            "claim_id": "c1",
+            "claim_text": analysis.get("core_question") or content,
+            "search_queries": list(analysis.get("search_queries", []))
+        }]
+        raw_claims = analysis.get("claims")
+        if not settings.CLAIM_DECOMPOSITION_ENABLED or not isinstance(raw_claims, list):
+            return single
+
+        claims: List[Dict[str, Any]] = []
+        keys: List[str] = []
+        for raw in raw_claims:
+            if not isinstance(raw, dict):
+                continue
+            text = str(raw.get("claim_text") or "").strip()
+            key = normalize_text(text)
+            if not key:
+                continue
+            queries = [q for q in raw.get("search_queries") or [] if isinstance(q, str) and q.strip()]
+            duplicate = next((claims[i] for i, existing in enumerate(keys)
+                              if bigram_similarity(existing, key) >= settings.CLAIM_DEDUP_SIMILARITY), None)
+            if duplicate is not None:
+                duplicate["search_queries"] += [q for q in queries if q not in duplicate["search_queries"]]
+                metrics.incr("parser_claims_merged")
+                continue
+            claims.append({"claim_text": text, "search_queries": queries})
+            keys.append(key)
+
+        claims = claims[:max(1, settings.CLAIM_MAX_COUNT)]
+        if len(claims) <= 1:
+            return single
+        for i, claim in enumerate(claims, 1):
+            claim["claim_id"] = f"c{i}"
+            if not claim["search_queries"]:
+                claim["search_queries"] = [claim["claim_text"], f"{claim['claim_text']} 官方通报"]
+        print(f"[ParserAgent] Split into {len(claims)} claims")
+        return [{"claim_id": c["claim_id"], "claim_text": c["claim_text"], "search_queries": c["search_queries"]}
+                for c in claims]
+
+    async def _analyze_query(self, content: str, on_query: Optional[QueryCallback] = None) -> Dict[str, Any]:
         """分析查询并生成搜索方案"""
         prompt = f"""你是一位专业的情报分析师和搜索策略师。请对以下事实性查询进行完整的搜索前分析，并设计搜索方案。
 
@@ -191,6 +304,14 @@ class ParserAgent:
         "查询2（精准聚焦）",
         "查询3（精准聚焦）",
         ...
+    ],
+    "claims": [
+        {{
+            "claim_id": "c1",
+            "claim_text": "可独立核实的原子主张（一句话）",
+            "search_queries": ["针对该主张的查询1", "针对该主张的查询2"]
+        }},
+        ...
     ]
 }}
 
@@ -202,13 +323,15 @@ class ParserAgent:
 5. 多源交叉验证：判断是否需要多个独立信源验证
 6. 搜索策略：说明搜索思路，如从宽泛到具体、多语言、多角度等
 7. 搜索查询：生成3-6条精准搜索查询，中英文都可，每条聚焦不同角度
+8. 原子主张：把内容拆分为可独立核实的主张（例如“公司宣布破产”和“数千名员工失业”），每条只包含一个事实断言，
+   主张之间不要重复，每条附1-3条专门的搜索查询；内容只有一个主张时只输出一条
 
 注意：
 - 搜索查询要具体、可执行，包含关键实体
 - 查询之间要有差异化，覆盖不同角度
 - 优先使用中文查询，必要时补充英文"""
 
-        result_text = await self._call_llm(prompt)
+        result_text = await self._call_llm(prompt, on_query)
 
         try:
             text = self._clean_json_text(result_text)
@@ -227,41 +350,111 @@ class ParserAgent:
                 "search_queries": [content, f"{content} 官方通报", f"{content} 最新消息"]
             }
 
-    async def _call_llm(self, prompt: str) -> str:
-        """调用 LLM"""
+    async def _call_llm(self, prompt: str, on_query: Optional[QueryCallback] = None) -> str:
+        """
+        调用 LLM（按阶段路由模型，经录像带录制/回放）
+
+        给定 on_query 时流式请求，每次请求（包括升级重试）各用一个增量解析器；
+        回放录像带时不经过流式请求，查询随完整结果一并交给下游。
+        """
+        def request(model: str, max_tokens: int, provider: str):
+            on_delta = JSONStreamExtractor("search_queries", self._query_emitter(on_query)).feed if on_query else None
+            return self._request_llm(prompt, model, max_tokens, on_delta=on_delta, provider=provider)
+
         try:
-            if self.llm_provider == "openai" and self.openai_client:
-                response = await self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "你是一位专业的情报分析师和搜索策略师，擅长设计精准的搜索方案。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,
-                    max_tokens=2000
-                )
-                content = response.choices[0].message.content
-                print(f"[ParserAgent] LLM Response: {content[:100]}...")
-                return content
-            elif self.llm_provider == "claude" and self.anthropic_client:
-                response = self.anthropic_client.messages.create(
-                    model=settings.ANTHROPIC_MODEL,
-                    max_tokens=2000,
-                    temperature=0.3,
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                content = response.content[0].text
-                print(f"[ParserAgent] LLM Response: {content[:100]}...")
-                return content
-            else:
-                print(f"[ParserAgent] Warning: No LLM client available")
-                return "{}"
+            return await model_router.call("parser", "query_analysis", prompt, request, self.model)
         except Exception as e:
             print(f"[ParserAgent] LLM Error: {str(e)}")
             return "{}"
 
+    @staticmethod
+    def _query_emitter(on_query: QueryCallback) -> Callable[[Any, Dict[str, Any]], None]:
+        def emit(query: Any, fields: Dict[str, Any]):
+            if isinstance(query, str) and query.strip():
+                try:
+                    on_query(query, fields)
+                except Exception as e:
+                    print(f"[ParserAgent] Query handoff error: {e}")
+        return emit
+
+    async def _request_llm(self, prompt: str, model: str, max_tokens: int,
+                           on_delta: Optional[Callable[[str], None]] = None, provider: Optional[str] = None) -> str:
+        """
+        向 LLM 提供商发起请求；给定 on_delta 时流式读取，每段输出到达即回调
+
+        provider 默认为配置的主提供商，主提供商熔断时由模型路由指定备用提供商
+        """
+        provider = provider or self.llm_provider
+        if on_delta is not None:
+            return await self._request_llm_stream(prompt, model, max_tokens, on_delta, provider)
+        if provider == "openai" and self.openai_client:
+            response = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "你是一位专业的情报分析师和搜索策略师，擅长设计精准的搜索方案。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens
+            )
+            content = response.choices[0].message.content
+            print(f"[ParserAgent] LLM Response: {content[:100]}...")
+            return content
+        elif provider == "claude" and self.anthropic_client:
+            response = await self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            content = response.content[0].text
+            print(f"[ParserAgent] LLM Response: {content[:100]}...")
+            return content
+        else:
+            print(f"[ParserAgent] Warning: No LLM client available")
+            return "{}"
+
+    async def _request_llm_stream(self, prompt: str, model: str, max_tokens: int,
+                                  on_delta: Callable[[str], None], provider: str) -> str:
+        """流式请求，返回完整文本"""
+        parts: List[str] = []
+        if provider == "openai" and self.openai_client:
+            stream = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "你是一位专业的情报分析师和搜索策略师，擅长设计精准的搜索方案。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        elif provider == "claude" and self.anthropic_client:
+            async with self.anthropic_client.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.3,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            ) as stream:
+                async for delta in stream.text_stream:
+                    parts.append(delta)
+                    on_delta(delta)
+        else:
+            print(f"[ParserAgent] Warning: No LLM client available")
+            return "{}"
+        content = "".join(parts)
+        print(f"[ParserAgent] LLM Response (streamed): {content[:100]}...")
+        return content
+
     def _clean_json_text(self, text: str) -> str:
         """清理JSON文本"""
         if not text:
@@ -0,0 +1,239 @@
+"""
+输入预分类器
+
+在调用 LLM 之前识别明显无法核实的输入（个人观点、提问、过短或不构成事件的内容），
+直接返回澄清提示。由词法规则和一个可离线训练的朴素贝叶斯模型（字符 n-gram）组成，
+单次分类耗时在毫秒以内。
+
+训练与试用：
+    python -m app.agents.preclassifier train --data samples.jsonl --output model.json
+    python -m app.agents.preclassifier predict "我觉得现在的科技公司都太不靠谱了"
+"""
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+LABELS = ("event", "opinion", "question", "non_event")
+
+SEED_PATH = os.path.join(os.path.dirname(__file__), "data", "preclassifier_seed.jsonl")
+
+# 参与打分的最大字符数，长文本的开头足以判断类型
+MAX_CHARS = 200
+
+CJK = re.compile(r"[\u4e00-\u9fff]")
+
+# 词法规则：(类别, 对数几率加成, 模式)
+RULES: List[Tuple[str, float, "re.Pattern[str]"]] = [
+    ("event", 2.5, re.compile(r"网传|传言|据报道|据悉|消息称|爆料|曝光|通报|辟谣|宣布|声明|被捕|去世|破产|召回|下架|热搜|疯传|流传")),
+    ("event", 3.0, re.compile(r"是真的吗|是否属实|真的假的|是不是真的|属实吗|是谣言吗")),
+    # “为什么说……”“听说……”转述的是一个待核实的说法，而不是开放式提问
+    ("event", 2.5, re.compile(r"为什么说|为何说|据说|听说|有人说")),
+    ("event", 1.0, re.compile(r"近日|昨日|今日|日前|\d+月|\d+日|\d{4}年")),
+    # “会致癌吗”“能治病吗”一类的是非问句本身就是可核实的说法
+    ("event", 1.5, re.compile(r"(会|能|可以|致|导致).{0,10}[吗?？]+$")),
+    ("opinion", 2.5, re.compile(r"^(我|俺|本人)?(觉得|认为|感觉|个人认为|说实话|真心觉得)")),
+    ("opinion", 1.5, re.compile(r"太.{0,8}了[!！。~]*$")),
+    ("opinion", 1.0, re.compile(r"真的是|好烦|无语|受够|失望|讨厌|我支持|我反对")),
+    ("question", 2.5, re.compile(r"^(请问|问一下|求问|求推荐|有谁知道|谁知道|你能|你是)")),
+    ("question", 1.5, re.compile(r"有什么|有哪些|有没有|怎么样|如何|怎么|为什么|哪个|哪里|推荐")),
+    ("question", 1.0, re.compile(r"[？?吗呢][!！。~]*$")),
+    # 整条输入只有寒暄语（归一化时已去掉空白，不能用 \b 判断词边界）
+    ("non_event", 3.0, re.compile(r"^((你好|您好|hello|hi|hey|谢谢|thanks|哈哈+|测试|test|在吗|早上好|晚安)[\W_]*)+$")),
+    # 不含任何字母和汉字（纯数字、符号、表情）
+    ("non_event", 3.0, re.compile(r"^[^a-z\u4e00-\u9fff]+$")),
+]
+
+CLARIFICATION_PROMPTS = {
+    "opinion": "您输入的内容更像是个人观点，无法进行事实核查。请提供需要核实的具体事件或说法，例如“网传某公司宣布破产”。",
+    "question": "您输入的是一个提问，而不是待核实的说法。请提供需要核实的具体消息或传言，例如“网传某地发生地震”。",
+    "non_event": "未识别到需要核实的事件或说法。请输入具体的消息、传言或新闻内容。",
+    "too_short": "内容过短，无法识别需要核实的事件。请补充时间、地点、人物等具体信息。",
+}
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", "", text).lower()[:MAX_CHARS]
+
+
+def _features(text: str) -> List[str]:
+    """字符 1-gram 与 2-gram"""
+    chars = _normalize(text)
+    return list(chars) + [chars[i:i + 2] for i in range(len(chars) - 1)]
+
+
+class NaiveBayes:
+    """多项式朴素贝叶斯"""
+
+    def __init__(self, label_docs: Dict[str, int], feature_counts: Dict[str, Dict[str, int]], alpha: float = 1.0):
+        self.label_docs = label_docs
+        self.feature_counts = feature_counts
+        self.alpha = alpha
+        self.vocab_size = len({f for counts in feature_counts.values() for f in counts}) or 1
+        total_docs = sum(label_docs.values()) or 1
+        self.priors = {label: math.log((label_docs.get(label, 0) + 1) / (total_docs + len(label_docs)))
+                       for label in label_docs}
+        self.totals = {label: sum(counts.values()) for label, counts in feature_counts.items()}
+
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], alpha: float = 1.0) -> "NaiveBayes":
+        label_docs: Dict[str, int] = {label: 0 for label in LABELS}
+        feature_counts: Dict[str, Counter] = {label: Counter() for label in LABELS}
+        for text, label in samples:
+            if label not in label_docs:
+                raise ValueError(f"未知类别: {label}")
+            label_docs[label] += 1
+            feature_counts[label].update(_features(text))
+        return cls(label_docs, {label: dict(counts) for label, counts in feature_counts.items()}, alpha)
+
+    def log_scores(self, features: List[str]) -> Dict[str, float]:
+        scores = {}
+        for label, prior in self.priors.items():
+            counts = self.feature_counts.get(label, {})
+            denominator = math.log(self.totals.get(label, 0) + self.alpha * self.vocab_size)
+            score = prior
+            for feature in features:
+                score += math.log(counts.get(feature, 0) + self.alpha) - denominator
+            scores[label] = score
+        return scores
+
+    def to_dict(self) -> Dict[str, object]:
+        return {"alpha": self.alpha, "label_docs": self.label_docs, "feature_counts": self.feature_counts}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "NaiveBayes":
+        return cls(data["label_docs"], data["feature_counts"], data.get("alpha", 1.0))
+
+
+def load_samples(path: str) -> List[Tuple[str, str]]:
+    """读取 JSON Lines 训练样本，每行 {"text": ..., "label": event|opinion|question|non_event}"""
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line)
+                samples.append((item["text"], item["label"]))
+    return samples
+
+
+class PreClassifier:
+    """
+    输入预分类器
+
+    Args:
+        model: 朴素贝叶斯模型
+        min_length: 去除空白后短于该长度的输入直接判为过短
+        nb_weight: 模型按特征平均后的对数似然的权重，避免长文本的模型得分压过规则
+    """
+
+    def __init__(self, model: NaiveBayes, min_length: int = 4, nb_weight: float = 4.0):
+        self.model = model
+        self.min_length = min_length
+        self.nb_weight = nb_weight
+
+    @classmethod
+    def load(cls, model_path: Optional[str] = None) -> "PreClassifier":
+        """加载训练好的模型；未指定时用内置种子样本现场训练"""
+        if model_path and os.path.exists(model_path):
+            with open(model_path, "r", encoding="utf-8") as f:
+                model = NaiveBayes.from_dict(json.load(f))
+        else:
+            model = NaiveBayes.train(load_samples(SEED_PATH))
+        return cls(model, min_length=settings.PRECLASSIFIER_MIN_LENGTH)
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """
+        返回 (类别, 置信度)
+
+        类别为 event / opinion / question / non_event / too_short，置信度为 0-1 的后验概率。
+        不含汉字的输入只按规则打分，通常达不到阈值而交给 LLM 判断。
+        """
+        normalized = _normalize(text)
+        if len(normalized) < self.min_length:
+            return "too_short", 1.0
+
+        if CJK.search(normalized):
+            features = _features(text)
+            scores = {label: self.nb_weight * score / len(features)
+                      for label, score in self.model.log_scores(features).items()}
+        else:
+            # 种子样本都是中文，模型对其他语言的输入没有判断力，只按规则打分
+            scores = {label: 0.0 for label in LABELS}
+        for label, boost, pattern in RULES:
+            if pattern.search(normalized):
+                scores[label] = scores.get(label, 0.0) + boost
+
+        top = max(scores.values())
+        exp_scores = {label: math.exp(score - top) for label, score in scores.items()}
+        total = sum(exp_scores.values())
+        label = max(exp_scores, key=exp_scores.get)
+        return label, exp_scores[label] / total
+
+
+_classifier: Optional[PreClassifier] = None
+
+
+def get_classifier() -> PreClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = PreClassifier.load(settings.PRECLASSIFIER_MODEL_PATH)
+    return _classifier
+
+
+def clarification_for(content: str) -> Optional[Dict[str, object]]:
+    """
+    判断输入是否明显无法核实
+
+    Returns:
+        需要澄清时返回 {"input_type", "confidence", "clarification_prompt"}；
+        判为事件或置信度低于阈值时返回 None，由 LLM 继续分析
+    """
+    if not settings.PRECLASSIFIER_ENABLED:
+        return None
+    label, confidence = get_classifier().classify(content)
+    if label == "event" or confidence < settings.PRECLASSIFIER_THRESHOLD:
+        return None
+    return {
+        "input_type": label,
+        "confidence": round(confidence, 3),
+        "clarification_prompt": CLARIFICATION_PROMPTS[label]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="输入预分类器")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="用 JSON Lines 样本训练模型")
+    train.add_argument("--data", action="append", required=True, help="训练样本文件，可重复")
+    train.add_argument("--with-seed", action="store_true", help="同时加入内置种子样本")
+    train.add_argument("--output", required=True, help="模型输出路径（JSON），配置到 PRECLASSIFIER_MODEL_PATH")
+
+    predict = subparsers.add_parser("predict", help="对输入分类")
+    predict.add_argument("text", nargs="+")
+
+    args = parser.parse_args()
+    if args.command == "train":
+        samples = load_samples(SEED_PATH) if args.with_seed else []
+        for path in args.data:
+            samples.extend(load_samples(path))
+        model = NaiveBayes.train(samples)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(model.to_dict(), f, ensure_ascii=False)
+        print(f"[PreClassifier] Trained on {len(samples)} samples -> {args.output}")
+    else:
+        classifier = get_classifier()
+        for text in args.text:
+            label, confidence = classifier.classify(text)
+            print(f"{label}\t{confidence:.3f}\t{text}")
+
+
+if __name__ == "__main__":
+    main()
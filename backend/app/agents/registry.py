@@ -0,0 +1,64 @@
+"""
+Agent 单例
+
+各 Agent 在首次使用时才创建；warm_up() 在应用启动后于后台创建鉴定流水线用到的 Agent、
+加载预分类模型，并为主提供商的 Key 预先建立连接，使第一个请求不必承担这些开销。
+"""
+import asyncio
+import time
+from functools import cached_property
+from typing import List
+
+from app.core.config import settings
+from app.core.key_pool import key_pool
+from app.agents.parser import ParserAgent
+from app.agents.search import SearchAgent
+from app.agents.verdict import VerdictAgent
+from app.agents.article import ArticleAgent
+from app.agents.preclassifier import get_classifier
+from app.services.claims import ClaimVerifier
+
+
+class AgentRegistry:
+    """按需创建的 Agent 单例"""
+
+    @cached_property
+    def parser(self) -> ParserAgent:
+        return ParserAgent()
+
+    @cached_property
+    def search(self) -> SearchAgent:
+        return SearchAgent()
+
+    @cached_property
+    def verdict(self) -> VerdictAgent:
+        return VerdictAgent()
+
+    @cached_property
+    def article(self) -> ArticleAgent:
+        return ArticleAgent()
+
+    @cached_property
+    def claims(self) -> ClaimVerifier:
+        return ClaimVerifier(self.search, self.verdict)
+
+    def _prepare(self, providers: List[str]):
+        for name in ("parser", "search", "verdict", "claims"):
+            getattr(self, name)
+        if settings.PRECLASSIFIER_ENABLED:
+            get_classifier()
+        # 导入用到的提供商 SDK 并创建客户端
+        key_pool.prepare(providers)
+
+    async def warm_up(self):
+        """创建鉴定流水线的 Agent 并预热连接；新闻稿 Agent 仍在首次使用时创建"""
+        started = time.monotonic()
+        # 备用提供商的 SDK 在首次切换时才导入
+        providers = [settings.LLM_PROVIDER]
+        # 导入模块、加载模型是同步的，放到线程中以免阻塞已经到达的请求
+        await asyncio.to_thread(self._prepare, providers)
+        await key_pool.warm_up(providers, settings.LLM_WARMUP_TIMEOUT_SECONDS)
+        print(f"[Agents] Warm-up finished in {(time.monotonic() - started) * 1000:.0f}ms")
+
+
+agents = AgentRegistry()
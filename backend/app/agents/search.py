@@ -1,11 +1,122 @@
 import json
+import time
 import uuid
-from typing import List, Dict, Any, AsyncGenerator
-import openai
-from anthropic import Anthropic
+from dataclasses import replace
+from typing import List, Dict, Any, AsyncGenerator, Awaitable, Callable, Optional, Tuple
 import asyncio
 
 from app.core.config import settings
+from app.core.key_pool import key_pool
+from app.core.deadline import skip_stage
+from app.core.analysis_mode import current_mode
+from app.core.model_routing import model_router
+from app.core.metrics import metrics
+from app.core.text import normalize_text, bigram_similarity
+from app.models.source import Source
+from app.agents.sufficiency import assess_sufficiency
+from app.agents.preclassifier import clarification_for
+from app.services.links import link_checker, DEAD
+from app.services.pages import page_fetcher
+
+
+# 排序时的可信度权重
+CREDIBILITY_RANK = {"high": 3, "medium": 2, "low": 1}
+
+# 深度分析覆盖的信源数（存在争议时扩大）
+ANALYSIS_LIMIT = 15
+EXPANDED_ANALYSIS_LIMIT = 25
+
+# 存在争议时追加的查询后缀
+EXPANSION_SUFFIXES = ("官方回应", "辟谣", "事实核查")
+
+# 预测性搜索：Parser 完成前直接用原文发起的基础查询（与 Parser 兜底方案一致）
+SPECULATIVE_SUFFIXES = ("", " 官方通报", " 最新消息")
+SPECULATIVE_SUBJECT_CHARS = 100
+
+
+class SearchPool:
+    """
+    一次鉴定内共享的联网搜索结果
+
+    - 多主张核查时，不同主张生成的相同查询只执行一次搜索
+    - 预测性搜索：Parser 分析的同时先用原文发起基础搜索，Parser 的查询与之重复时直接复用
+    - 查询预取：Parser 流式输出的查询一生成完就开始搜索
+
+    每次取用都返回信源的副本，各主张后续的深度分析和排序互不影响。
+    """
+
+    def __init__(self):
+        self._searches: Dict[str, asyncio.Future] = {}
+        # 提前发起、尚未被取用的搜索 -> 来源（speculative / prefetch）
+        self._origins: Dict[str, str] = {}
+        self.speculative: List[str] = []
+        self.prefetched = 0
+        self._used: set = set()
+        self.shared = 0
+        self._closed = False
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.split()).lower()
+
+    def _start(self, query: str, search: Callable[[], Awaitable[Dict[str, Any]]], origin: str) -> bool:
+        key = self._key(query)
+        if self._closed or key in self._searches:
+            return False
+        self._searches[key] = asyncio.ensure_future(search())
+        self._origins[key] = origin
+        return True
+
+    def speculate(self, queries: List[str], search: Callable[[str], Awaitable[Dict[str, Any]]]):
+        """立即在后台启动搜索，结果在 fetch 相同查询时取用"""
+        for query in queries:
+            if self._start(query, lambda q=query: search(q), "speculative"):
+                self.speculative.append(query)
+        metrics.incr("search_speculative_started", len(self.speculative))
+
+    def prefetch(self, query: str, search: Callable[[], Awaitable[Dict[str, Any]]]):
+        """在搜索阶段开始前启动单条查询的搜索"""
+        if self._start(query, search, "prefetch"):
+            self.prefetched += 1
+            metrics.incr("search_prefetch_started")
+
+    def match(self, query: str) -> Optional[str]:
+        """返回与该查询重复（相似度最高且达到阈值）的预测性搜索查询，没有则返回 None"""
+        normalized = normalize_text(query)
+        best, best_score = None, settings.SEARCH_SPECULATIVE_SIMILARITY
+        for speculative in self.speculative:
+            score = bigram_similarity(normalize_text(speculative), normalized)
+            if score > best_score or (best is None and score == best_score):
+                best, best_score = speculative, score
+        return best
+
+    async def fetch(self, query: str, search: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = self._key(query)
+        future = self._searches.get(key)
+        if future is None:
+            future = self._searches[key] = asyncio.ensure_future(search())
+            self._used.add(key)
+        elif key not in self._used:
+            # 首次取用提前发起的搜索
+            self._used.add(key)
+            metrics.incr(f"search_{self._origins[key]}_used")
+        else:
+            self.shared += 1
+            metrics.incr("search_pool_hits")
+        # 一个主张被取消时不影响等待同一搜索的其他主张
+        result = await asyncio.shield(future)
+        return {**result, "sources": [replace(s) for s in result.get("sources", [])]}
+
+    def close(self):
+        """取消仍在进行的搜索（包括最终没有用到的提前搜索）"""
+        if self._closed:
+            return
+        self._closed = True
+        for key, future in self._searches.items():
+            if not future.done():
+                future.cancel()
+                if key not in self._used:
+                    metrics.incr(f"search_{self._origins[key]}_cancelled")
 
 
 class SearchAgent:
@@ -22,131 +133,55 @@ class SearchAgent:
 
     def __init__(self):
         self.llm_provider = settings.LLM_PROVIDER
-        self.openai_client = openai.AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=120.0
-        ) if settings.OPENAI_API_KEY else None
-        self.anthropic_client = Anthropic(
-            api_key=settings.ANTHROPIC_API_KEY
-        ) if settings.ANTHROPIC_API_KEY else None
+        # 每次调用从 Key 池中选择负载最低的 Key
+        self.openai_client = key_pool.client("openai", timeout=120.0)
+        self.anthropic_client = key_pool.client("claude", timeout=120.0)
+        self.model = settings.ANTHROPIC_MODEL if self.llm_provider == "claude" else settings.OPENAI_MODEL
         print(f"[SearchAgent] Initialized with LLM provider: {self.llm_provider}")
 
-    async def search(self, parser_result: Dict[str, Any], original_content: str) -> Dict[str, Any]:
+    async def search(self, parser_result: Dict[str, Any], original_content: str,
+                     pool: Optional[SearchPool] = None) -> Dict[str, Any]:
         """
         执行深度搜索和分析
 
         Args:
             parser_result: Parser Agent 的输出，包含搜索查询列表和分析
             original_content: 用户的原始查询内容
+            pool: 多主张核查时共享的搜索结果池
 
         Returns:
             包含深度分析的信源数据集
         """
-        search_id = str(uuid.uuid4())
-        search_queries = parser_result.get("search_queries", [])
-        query_analysis = parser_result.get("analysis", {})
-
-        print(f"[SearchAgent] Starting deep analysis with {len(search_queries)} queries")
-
-        # 阶段1: 执行多次搜索收集证据
-        all_sources = []
-        query_reasoning = []
-
-        for i, query in enumerate(search_queries[:4]):
-            print(f"[SearchAgent] Query {i+1}/{len(search_queries)}: {query}")
-
-            result = await self._execute_web_search(query, original_content, query_analysis)
-            sources = result.get("sources", [])
-            reasoning = result.get("search_reasoning", "")
-
-            all_sources.extend(sources)
-            if reasoning:
-                query_reasoning.append({
-                    "query": query,
-                    "reasoning": reasoning
-                })
-
-            print(f"[SearchAgent] Query {i+1} returned {len(sources)} sources")
-
-        # 阶段2: 深度分析信源
-        print(f"[SearchAgent] Starting source analysis...")
-        analyzed_sources = await self._analyze_sources_deep(
-            all_sources, original_content, query_analysis
-        )
-
-        # 阶段3: 识别关键证据和突破口
-        print(f"[SearchAgent] Identifying key evidence...")
-        key_findings = await self._identify_key_findings(
-            analyzed_sources, original_content, query_analysis
-        )
-
-        # 阶段4: 整理输出
-        unique_sources = self._deduplicate_sources(analyzed_sources)
-        ranked_sources = self._rank_sources_by_importance(unique_sources, key_findings)
-
-        # 分离关键信源和普通信源
-        key_sources = [s for s in ranked_sources if s.get("is_key_source", False)][:8]
-        regular_sources = [s for s in ranked_sources if not s.get("is_key_source", False)][:12]
-
-        print(f"[SearchAgent] Analysis complete: {len(key_sources)} key sources, {len(regular_sources)} regular sources")
-
-        return {
-            "search_id": search_id,
-            "parser_task_ref": parser_result.get("task_id"),
-            "original_query": original_content,
-            "query_analysis": query_analysis,
-            
-            # 关键信源（最重要的突破口）
-            "key_sources": key_sources,
-            
-            # 普通信源
-            "regular_sources": regular_sources,
-            
-            # 所有信源（合并）
-            "all_sources": ranked_sources[:20],
-            
-            # 深度分析结果
-            "analysis": {
-                # 搜索过程推理
-                "search_reasoning_chain": query_reasoning,
-                
-                # 核心发现
-                "key_findings": key_findings.get("findings", []),
-                
-                # 信息冲突点
-                "conflict_points": key_findings.get("conflict_points", []),
-                
-                # 证据缺口
-                "evidence_gaps": key_findings.get("evidence_gaps", []),
-                
-                # 分析推理过程
-                "analysis_reasoning": key_findings.get("analysis_reasoning", ""),
-                
-                # 多角度观点汇总
-                "perspectives": key_findings.get("perspectives", {})
-            },
-            
-            # 元数据
-            "search_metadata": {
-                "total_queries": len(search_queries),
-                "executed_queries": min(len(search_queries), 4),
-                "sources_found": len(all_sources),
-                "sources_after_dedup": len(unique_sources),
-                "key_sources_count": len(key_sources),
-                "coverage_score": min(0.95, 0.5 + len(unique_sources) * 0.03),
-                "analysis_depth": "deep",
-                "search_duration_ms": 8000
-            }
-        }
-
-    async def search_stream(self, parser_result: Dict[str, Any], original_content: str) -> AsyncGenerator[Dict[str, Any], None]:
+        result: Dict[str, Any] = {}
+        async for event in self.search_stream(parser_result, original_content, pool):
+            if event.get("type") == "result":
+                result = event["data"]
+        return result
+
+    async def search_stream(self, parser_result: Dict[str, Any], original_content: str,
+                            pool: Optional[SearchPool] = None) -> AsyncGenerator[Dict[str, Any], None]:
         """
         流式搜索分析，实时返回推理过程
+
+        自适应模式下每批搜索返回后评估证据充分度：达到阈值即停止追加搜索，
+        并跳过信源深度分析；说法存在争议时追加搜索并扩大分析范围。
+        deep 分析模式保持完整流程：证据充分时也不提前结束，始终执行深度分析（争议时仍会扩展）。
+        请求的剩余时延预算不足时停止追加搜索、跳过信源深度分析。
+        fast 分析模式下深度分析与关键发现合并为一次调用，不受上述跳过规则影响。
         """
+        started_at = time.monotonic()
         search_id = str(uuid.uuid4())
         search_queries = parser_result.get("search_queries", [])
         query_analysis = parser_result.get("analysis", {})
+        adaptive = settings.SEARCH_ADAPTIVE
+        mode = current_mode()
+        # 证据充分时提前结束（并跳过深度分析）不适用于 deep 模式
+        stop_when_sufficient = adaptive and mode != "deep"
+        queries = self._plan_queries(search_queries, pool)
+
+        # 固定流程的调用数（搜索轮数 + 深度分析 + 关键发现），用于计算节省的调用
+        baseline_calls = min(len(search_queries), settings.SEARCH_MAX_QUERIES) + 2
+        llm_calls = 0
 
         # 开始分析 - 详细推理过程
         core_entities = query_analysis.get('core_entities', [])
@@ -169,93 +204,196 @@ class SearchAgent:
                        f"   4. 识别信息冲突和突破口"
         }
 
-        all_sources = []
+        all_sources: List[Source] = []
         query_reasoning = []
+        max_queries = settings.SEARCH_MAX_QUERIES
+        batch_size = max(1, settings.SEARCH_QUERY_CONCURRENCY)
+        executed = 0
+        expanded = False
+        sufficient = False
+        deadline_limited = False
+        dead_links = 0
 
         # 执行多次搜索
-        for i, query in enumerate(search_queries[:4]):
-            yield {
-                "type": "reasoning",
-                "agent": "search",
-                "step": f"搜索{i+1}",
-                "content": f"🔍 执行第 {i+1} 轮搜索...\n\n"
-                           f"📡 搜索查询:\n   {query}\n\n"
-                           f"💡 搜索策略:\n"
-                           f"   • 使用联网搜索获取实时信息\n"
-                           f"   • 筛选高可信度信源\n"
-                           f"   • 记录搜索思路和关键发现"
-            }
+        while executed < min(len(queries), max_queries):
+            if executed and skip_stage("search", settings.DEADLINE_VERDICT_RESERVE_SECONDS):
+                deadline_limited = True
+                yield {
+                    "type": "reasoning",
+                    "agent": "search",
+                    "step": "时间预算",
+                    "content": f"⏱️ 剩余时间不足，停止追加搜索\n"
+                               f"   🔍 已完成 {executed} 轮搜索，剩余时间留给分析与鉴定"
+                }
+                break
 
-            result = await self._execute_web_search(query, original_content, query_analysis)
-            sources = result.get("sources", [])
-            reasoning = result.get("search_reasoning", "")
+            batch = queries[executed:min(len(queries), max_queries, executed + batch_size)]
+            for offset, query in enumerate(batch):
+                print(f"[SearchAgent] Query {executed + offset + 1}/{len(queries)}: {query}")
+                yield {
+                    "type": "reasoning",
+                    "agent": "search",
+                    "step": f"搜索{executed + offset + 1}",
+                    "content": f"🔍 执行第 {executed + offset + 1} 轮搜索...\n\n"
+                               f"📡 搜索查询:\n   {query}\n\n"
+                               f"💡 搜索策略:\n"
+                               f"   • 使用联网搜索获取实时信息\n"
+                               f"   • 筛选高可信度信源\n"
+                               f"   • 记录搜索思路和关键发现"
+                }
 
-            all_sources.extend(sources)
-            if reasoning:
-                query_reasoning.append({
-                    "query": query,
-                    "reasoning": reasoning
-                })
+            results = await asyncio.gather(*[
+                self._search_query(query, original_content, query_analysis, pool) for query in batch
+            ])
+            llm_calls += len(batch)
 
-            yield {
-                "type": "reasoning",
-                "agent": "search",
-                "step": f"搜索{i+1}结果",
-                "content": f"✓ 第 {i+1} 轮搜索完成\n"
-                           f"   📊 找到 {len(sources)} 个信源\n"
-                           f"   💭 搜索思路: {reasoning}"
-            }
+            for query, result in zip(batch, results):
+                executed += 1
+                sources = result.get("sources", [])
+                reasoning = result.get("search_reasoning", "")
+                dead_links += result.get("dead_links", 0)
 
-            # 显示每个信源的详细分析
-            for j, source in enumerate(sources, 1):
-                credibility = source.get("source_credibility", "medium")
-                credibility_emoji = "🟢" if credibility == "high" else "🟡" if credibility == "medium" else "🔴"
-                credibility_text = "高" if credibility == "high" else "中" if credibility == "medium" else "低"
-                domain = source.get('source_domain', '未知')
-                title = source.get('title', '')
-                insight = source.get('key_insight', '')
+                all_sources.extend(sources)
+                if reasoning:
+                    query_reasoning.append({
+                        "query": query,
+                        "reasoning": reasoning
+                    })
 
                 yield {
                     "type": "reasoning",
                     "agent": "search",
-                    "step": f"信源{i+1}-{j}",
-                    "content": f"   {credibility_emoji} 信源 {j}: [{credibility_text}可信度]\n"
-                               f"      来源: {domain}\n"
-                               f"      标题: {title}\n"
-                               f"      关键信息: {insight}"
+                    "step": f"搜索{executed}结果",
+                    "content": f"✓ 第 {executed} 轮搜索完成\n"
+                               f"   📊 找到 {len(sources)} 个信源\n" +
+                               (f"   🔗 {result['dead_links']} 个信源链接已失效"
+                                f"{'，已丢弃' if settings.LINK_CHECK_ACTION == 'drop' else ''}\n"
+                                if result.get("dead_links") else "") +
+                               f"   💭 搜索思路: {reasoning}"
                 }
 
-            await asyncio.sleep(0.1)
+                # 显示每个信源的详细分析
+                for j, source in enumerate(sources, 1):
+                    credibility = source.source_credibility
+                    credibility_emoji = "🟢" if credibility == "high" else "🟡" if credibility == "medium" else "🔴"
+                    credibility_text = "高" if credibility == "high" else "中" if credibility == "medium" else "低"
+                    domain = source.source_domain or '未知'
+                    title = source.title
+                    insight = source.key_insight
+
+                    yield {
+                        "type": "reasoning",
+                        "agent": "search",
+                        "step": f"信源{executed}-{j}",
+                        "content": f"   {credibility_emoji} 信源 {j}: [{credibility_text}可信度]\n"
+                                   f"      来源: {domain}\n"
+                                   f"      标题: {title}\n"
+                                   f"      关键信息: {insight}"
+                    }
 
-        # 深度分析阶段
-        yield {
-            "type": "reasoning",
-            "agent": "search",
-            "step": "深度分析",
-            "content": f"🧠 对 {len(all_sources)} 个信源进行深度分析...\n"
-                       f"   - 评估可信度和立场\n"
-                       f"   - 识别信息冲突点\n"
-                       f"   - 寻找关键突破口"
-        }
+            if settings.SEARCH_STREAM_PACING_MS > 0:
+                await asyncio.sleep(settings.SEARCH_STREAM_PACING_MS / 1000)
+
+            if not adaptive or executed < settings.SEARCH_MIN_QUERIES:
+                continue
+
+            sufficiency = assess_sufficiency(all_sources)
+            if stop_when_sufficient and sufficiency.score >= settings.SEARCH_SUFFICIENCY_THRESHOLD:
+                sufficient = True
+                yield {
+                    "type": "reasoning",
+                    "agent": "search",
+                    "step": "证据充分",
+                    "content": f"✅ 证据已充分，停止追加搜索\n"
+                               f"   📈 充分度: {sufficiency.score:.2f}（阈值 {settings.SEARCH_SUFFICIENCY_THRESHOLD:.2f}）\n"
+                               f"   🤝 立场一致度: {sufficiency.agreement:.0%}"
+                }
+                break
+
+            if sufficiency.contested and not expanded:
+                expanded = True
+                max_queries = max(max_queries, settings.SEARCH_EXPANDED_MAX_QUERIES)
+                queries.extend(self._expansion_queries(queries, query_analysis, original_content))
+                yield {
+                    "type": "reasoning",
+                    "agent": "search",
+                    "step": "扩展搜索",
+                    "content": f"⚠️ 信源立场存在明显分歧，扩大搜索范围\n"
+                               f"   🤝 立场一致度: {sufficiency.agreement:.0%}\n"
+                               f"   🔍 搜索轮数上限提高到 {max_queries}"
+                }
 
-        analyzed_sources = await self._analyze_sources_deep(
-            all_sources, original_content, query_analysis
-        )
+        sufficiency = assess_sufficiency(all_sources)
+
+        # 深度分析阶段：证据已充分时跳过，存在争议时扩大分析范围
+        # fast 模式下深度分析与关键发现合并为一次调用；只有 deep 模式在分析时开启联网搜索
+        web_search = mode == "deep"
+        analysis_depth = mode
+        analysis_limit = EXPANDED_ANALYSIS_LIMIT if expanded else ANALYSIS_LIMIT
+        key_findings: Optional[Dict[str, Any]] = None
+        if mode == "fast":
+            yield {
+                "type": "reasoning",
+                "agent": "search",
+                "step": "深度分析",
+                "content": f"🧠 对 {len(all_sources)} 个信源进行综合分析...\n"
+                           f"   - 评估可信度和立场\n"
+                           f"   - 识别信息冲突点\n"
+                           f"   - 提炼核心发现"
+            }
+
+            analyzed_sources, key_findings = await self._analyze_sources_combined(
+                all_sources, original_content, query_analysis, analysis_limit
+            )
+            if all_sources:
+                llm_calls += 1
+        elif sufficient:
+            analysis_depth = "basic"
+            analyzed_sources = all_sources
+        elif skip_stage("source_analysis", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            deadline_limited = True
+            analysis_depth = "basic"
+            analyzed_sources = all_sources
+            yield {
+                "type": "reasoning",
+                "agent": "search",
+                "step": "深度分析",
+                "content": "⏱️ 剩余时间不足，跳过信源深度分析"
+            }
+        else:
+            yield {
+                "type": "reasoning",
+                "agent": "search",
+                "step": "深度分析",
+                "content": f"🧠 对 {len(all_sources)} 个信源进行深度分析...\n"
+                           f"   - 评估可信度和立场\n"
+                           f"   - 识别信息冲突点\n"
+                           f"   - 寻找关键突破口"
+            }
+
+            analyzed_sources = await self._analyze_sources_deep(
+                all_sources, original_content, query_analysis, analysis_limit, web_search
+            )
+            if all_sources:
+                llm_calls += 1
 
         yield {
             "type": "reasoning",
             "agent": "search",
             "step": "信源评估",
             "content": f"📊 信源评估完成:\n"
-                       f"   - 高可信度: {sum(1 for s in analyzed_sources if s.get('source_credibility') == 'high')}\n"
-                       f"   - 中等可信度: {sum(1 for s in analyzed_sources if s.get('source_credibility') == 'medium')}\n"
-                       f"   - 发现偏见信源: {sum(1 for s in analyzed_sources if s.get('potential_bias'))}"
+                       f"   - 高可信度: {sum(1 for s in analyzed_sources if s.source_credibility == 'high')}\n"
+                       f"   - 中等可信度: {sum(1 for s in analyzed_sources if s.source_credibility == 'medium')}\n"
+                       f"   - 发现偏见信源: {sum(1 for s in analyzed_sources if s.potential_bias)}"
         }
 
         # 识别关键发现
-        key_findings = await self._identify_key_findings(
-            analyzed_sources, original_content, query_analysis
-        )
+        if key_findings is None:
+            key_findings = await self._identify_key_findings(
+                analyzed_sources, original_content, query_analysis, analysis_limit - 3, web_search
+            )
+            if analyzed_sources:
+                llm_calls += 1
 
         yield {
             "type": "reasoning",
@@ -278,8 +416,31 @@ class SearchAgent:
         unique_sources = self._deduplicate_sources(analyzed_sources)
         ranked_sources = self._rank_sources_by_importance(unique_sources, key_findings)
 
-        key_sources = [s for s in ranked_sources if s.get("is_key_source", False)][:8]
-        regular_sources = [s for s in ranked_sources if not s.get("is_key_source", False)][:12]
+        key_sources = [s for s in ranked_sources if s.is_key_source][:8]
+        regular_sources = [s for s in ranked_sources if not s.is_key_source][:12]
+
+        # 原文抓取：排名最靠前的关键信源的正文摘录交给 Verdict
+        pages_fetched = 0
+        fetch_targets = (key_sources or ranked_sources)[:settings.PAGE_FETCH_TOP_N] if settings.PAGE_FETCH_ENABLED else []
+        if fetch_targets and skip_stage("page_fetch", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            deadline_limited = True
+        elif fetch_targets:
+            pages_fetched = await page_fetcher.fill(fetch_targets)
+            yield {
+                "type": "reasoning",
+                "agent": "search",
+                "step": "原文抓取",
+                "content": f"📄 已抓取 {pages_fetched}/{len(fetch_targets)} 个关键信源的原文正文"
+            }
+
+        search_mode = "expanded" if expanded else "early_exit" if sufficient else "standard"
+        llm_calls_saved = baseline_calls - llm_calls
+        metrics.incr("search_requests", mode=search_mode, analysis=mode)
+        metrics.incr("search_llm_calls", llm_calls)
+        metrics.incr("search_llm_calls_saved", llm_calls_saved)
+
+        print(f"[SearchAgent] Analysis complete ({search_mode}, {mode}, {llm_calls} LLM calls): "
+              f"{len(key_sources)} key sources, {len(regular_sources)} regular sources")
 
         yield {
             "type": "reasoning",
@@ -297,26 +458,54 @@ class SearchAgent:
             "parser_task_ref": parser_result.get("task_id"),
             "original_query": original_content,
             "query_analysis": query_analysis,
+            
+            # 关键信源（最重要的突破口）
             "key_sources": key_sources,
+            
+            # 普通信源
             "regular_sources": regular_sources,
+            
+            # 所有信源（合并）
             "all_sources": ranked_sources[:20],
+            
+            # 深度分析结果
             "analysis": {
+                # 搜索过程推理
                 "search_reasoning_chain": query_reasoning,
+                
+                # 核心发现
                 "key_findings": key_findings.get("findings", []),
+                
+                # 信息冲突点
                 "conflict_points": key_findings.get("conflict_points", []),
+                
+                # 证据缺口
                 "evidence_gaps": key_findings.get("evidence_gaps", []),
+                
+                # 分析推理过程
                 "analysis_reasoning": key_findings.get("analysis_reasoning", ""),
+                
+                # 多角度观点汇总
                 "perspectives": key_findings.get("perspectives", {})
             },
+            
+            # 元数据
             "search_metadata": {
-                "total_queries": len(search_queries),
-                "executed_queries": min(len(search_queries), 4),
+                "total_queries": len(queries),
+                "executed_queries": executed,
                 "sources_found": len(all_sources),
                 "sources_after_dedup": len(unique_sources),
+                "dead_links": dead_links,
+                "pages_fetched": pages_fetched,
                 "key_sources_count": len(key_sources),
                 "coverage_score": min(0.95, 0.5 + len(unique_sources) * 0.03),
-                "analysis_depth": "deep",
-                "search_duration_ms": 8000
+                "analysis_depth": analysis_depth,
+                "search_mode": search_mode,
+                "deadline_limited": deadline_limited,
+                "sufficiency": sufficiency.to_dict(),
+                "llm_calls": llm_calls,
+                "llm_calls_saved": llm_calls_saved,
+                "search_duration_ms": int((time.monotonic() - started_at) * 1000)
             }
         }
 
@@ -326,6 +515,76 @@ class SearchAgent:
             "data": result
         }
 
+    def speculate(self, original_content: str) -> SearchPool:
+        """
+        预测性搜索：在 Parser 分析的同时直接用原文发起基础搜索
+
+        返回的搜索池传给 search / search_stream（多主张时由各主张共享），
+        鉴定结束后调用 close() 取消没有用到的搜索。预分类判定无需核实的输入不发起搜索。
+        """
+        pool = SearchPool()
+        subject = original_content.strip()[:SPECULATIVE_SUBJECT_CHARS]
+        if subject and clarification_for(original_content) is None:
+            pool.speculate([f"{subject}{suffix}" for suffix in SPECULATIVE_SUFFIXES],
+                           lambda query: self._execute_web_search(query, original_content, {}))
+            print(f"[SearchAgent] Speculative search started: {len(pool.speculative)} queries")
+        return pool
+
+    def prefetch(self, pool: SearchPool, query: str, original_content: str, query_analysis: Dict[str, Any]):
+        """
+        Parser 流式输出一条查询时立即开始搜索
+
+        只预取搜索阶段必定执行的第一批查询（自适应模式下后续批次可能因证据充分而不执行），
+        与预测性搜索重复的查询不再预取（直接取用预测性搜索的结果）。
+        """
+        if settings.SEARCH_ADAPTIVE and current_mode() != "deep":
+            guaranteed = max(settings.SEARCH_MIN_QUERIES, settings.SEARCH_QUERY_CONCURRENCY)
+        else:
+            guaranteed = settings.SEARCH_MAX_QUERIES
+        guaranteed = min(guaranteed, settings.SEARCH_MAX_QUERIES)
+        if pool.prefetched >= guaranteed or pool.match(query):
+            return
+        print(f"[SearchAgent] Prefetching streamed query: {query}")
+        pool.prefetch(query, lambda: self._execute_web_search(query, original_content, dict(query_analysis)))
+
+    def _plan_queries(self, search_queries: List[str], pool: Optional[SearchPool]) -> List[str]:
+        """
+        合并预测性搜索与 Parser 的查询
+
+        Parser 的针对性查询排在前面，轮数上限和证据充分时的提前结束先作用于它们；与预测性查询
+        重复的 Parser 查询换成该预测性查询，直接取用已在进行中的结果。其余预测性查询排在最后，
+        只在 Parser 的查询不足时补充。顺序固定，结果与各搜索的完成先后无关。
+        """
+        if pool is None or not pool.speculative:
+            return list(search_queries)
+        planned: List[str] = []
+        matched = 0
+        for query in search_queries:
+            speculative = pool.match(query)
+            if speculative:
+                matched += 1
+                query = speculative
+            if query not in planned:
+                planned.append(query)
+        planned.extend(query for query in pool.speculative if query not in planned)
+        if matched:
+            metrics.incr("search_speculative_matched", matched)
+            print(f"[SearchAgent] {matched} queries reuse speculative search results")
+        return planned
+
+    def _expansion_queries(self, queries: List[str], query_analysis: Dict, original_content: str) -> List[str]:
+        """说法存在争议时追加的核查类查询"""
+        subject = query_analysis.get("core_question") or original_content[:50]
+        candidates = [f"{subject} {suffix}" for suffix in EXPANSION_SUFFIXES]
+        return [q for q in candidates if q not in queries]
+
+    def _search_query(self, query: str, original_content: str, query_analysis: Dict,
+                      pool: Optional[SearchPool]) -> Awaitable[Dict[str, Any]]:
+        """执行单次搜索；给定共享池时相同查询只搜索一次"""
+        if pool is None:
+            return self._execute_web_search(query, original_content, query_analysis)
+        return pool.fetch(query, lambda: self._execute_web_search(query, original_content, query_analysis))
+
     async def _execute_web_search(self, query: str, original_content: str, query_analysis: Dict) -> Dict[str, Any]:
         """
         使用 DeepSeek 联网功能执行单次搜索，带着对问题的理解去搜索
@@ -382,10 +641,30 @@ class SearchAgent:
 5. 详细说明搜索思路和你发现的关键信息
 6. 思考不同立场的信源，确保观点多元"""
 
-        result_text = await self._call_llm_with_search(prompt)
-        return self._parse_search_result(result_text)
-
-    async def _analyze_sources_deep(self, sources: List[Dict], original_content: str, query_analysis: Dict) -> List[Dict]:
+        result_text = await self._call_llm_with_search(prompt, "web_search")
+        result = self._parse_search_result(result_text)
+        if settings.LINK_CHECK_ENABLED and result.get("sources"):
+            # 失效链接在进入深度分析（以及充分度评估）之前处理掉
+            result["sources"], result["dead_links"] = await self._screen_links(result["sources"])
+        return result
+
+    async def _screen_links(self, sources: List[Source]) -> Tuple[List[Source], int]:
+        """并发检查信源链接，失效的按 LINK_CHECK_ACTION 丢弃或降为低可信度"""
+        dead = await link_checker.annotate(sources)
+        if not dead:
+            return sources, 0
+        metrics.incr("search_dead_links", dead, action=settings.LINK_CHECK_ACTION)
+        if settings.LINK_CHECK_ACTION == "flag":
+            for source in sources:
+                if source.link_status == DEAD:
+                    source.source_credibility = "low"
+                    source.credibility_reason = f"链接无法访问。{source.credibility_reason}"
+            return sources, dead
+        print(f"[SearchAgent] Dropped {dead} sources with dead links")
+        return [s for s in sources if s.link_status != DEAD], dead
+
+    async def _analyze_sources_deep(self, sources: List[Source], original_content: str, query_analysis: Dict,
+                                    limit: int = ANALYSIS_LIMIT, web_search: bool = True) -> List[Source]:
         """
         对所有信源进行深度分析，识别模式和问题
         """
@@ -394,14 +673,14 @@ class SearchAgent:
 
         # 准备信源摘要
         sources_summary = []
-        for i, s in enumerate(sources[:15]):  # 最多分析15个
+        for i, s in enumerate(sources[:limit]):  # 最多分析 limit 个
             sources_summary.append({
                 "index": i,
-                "domain": s.get("source_domain", ""),
-                "title": s.get("title", "")[:80],
-                "credibility": s.get("source_credibility", "medium"),
-                "stance": s.get("source_stance", "neutral"),
-                "insight": s.get("key_insight", "")[:100]
+                "domain": s.source_domain,
+                "title": s.title[:80],
+                "credibility": s.source_credibility,
+                "stance": s.source_stance,
+                "insight": s.key_insight[:100]
             })
 
         prompt = f"""你是一位信息分析专家。请对以下信源集合进行深度分析。
@@ -436,27 +715,29 @@ class SearchAgent:
     "recommended_focus": [0, 2, 5]
 }}
 
-请分析前10个信源，返回它们的深度分析。"""
+请分析前{limit - 5}个信源，返回它们的深度分析。"""
 
         try:
-            result_text = await self._call_llm_with_search(prompt)
-            analysis_result = self._parse_search_result(result_text)
-            
-            # 将分析结果合并到原信源
-            source_analysis = analysis_result.get("source_analysis", [])
-            for analysis in source_analysis:
-                idx = analysis.get("index", 0)
-                if idx < len(sources):
-                    sources[idx]["deep_analysis"] = analysis.get("analysis", "")
-                    sources[idx]["reliability_concerns"] = analysis.get("reliability_concerns", "")
-                    sources[idx]["unique_value"] = analysis.get("unique_value", "")
-
-            return sources
+            result_text = await self._call_llm_with_search(prompt, "source_analysis", web_search)
+            return self._apply_source_analysis(sources, self._parse_search_result(result_text))
         except Exception as e:
             print(f"[SearchAgent] Deep analysis error: {e}")
             return sources
 
-    async def _identify_key_findings(self, sources: List[Dict], original_content: str, query_analysis: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def _apply_source_analysis(sources: List[Source], analysis_result: Dict[str, Any]) -> List[Source]:
+        """将逐条信源的深度分析结果合并到原信源"""
+        for analysis in analysis_result.get("source_analysis", []):
+            idx = analysis.get("index", 0)
+            if isinstance(idx, int) and 0 <= idx < len(sources):
+                source = sources[idx]
+                source.deep_analysis = analysis.get("analysis", "") or ""
+                source.reliability_concerns = analysis.get("reliability_concerns", "") or ""
+                source.unique_value = analysis.get("unique_value", "") or ""
+        return sources
+
+    async def _identify_key_findings(self, sources: List[Source], original_content: str, query_analysis: Dict,
+                                     limit: int = ANALYSIS_LIMIT - 3, web_search: bool = True) -> Dict[str, Any]:
         """
         识别关键发现、冲突点和证据缺口
         """
@@ -471,12 +752,12 @@ class SearchAgent:
 
         # 准备关键信息摘要
         key_info = []
-        for s in sources[:12]:
+        for s in sources[:limit]:
             key_info.append({
-                "domain": s.get("source_domain", ""),
-                "insight": s.get("key_insight", "")[:150],
-                "stance": s.get("source_stance", "neutral"),
-                "credibility": s.get("source_credibility", "medium")
+                "domain": s.source_domain,
+                "insight": s.key_insight[:150],
+                "stance": s.source_stance,
+                "credibility": s.source_credibility
             })
 
         prompt = f"""你是一位资深的事实核查专家。基于收集到的信源，请进行深入分析。
@@ -523,7 +804,7 @@ class SearchAgent:
 请确保分析深入、客观、专业。"""
 
         try:
-            result_text = await self._call_llm_with_search(prompt)
+            result_text = await self._call_llm_with_search(prompt, "findings", web_search)
             return self._parse_search_result(result_text)
         except Exception as e:
             print(f"[SearchAgent] Key findings error: {e}")
@@ -536,53 +817,158 @@ class SearchAgent:
                 "key_source_indices": []
             }
 
-    async def _call_llm_with_search(self, prompt: str) -> str:
-        """调用支持联网功能的 LLM (DeepSeek via 阿里百炼)"""
+    async def _analyze_sources_combined(self, sources: List[Source], original_content: str, query_analysis: Dict,
+                                        limit: int = ANALYSIS_LIMIT) -> Tuple[List[Source], Dict[str, Any]]:
+        """
+        fast 模式：一次不联网的调用同时完成信源深度分析和关键发现提炼，信源摘要只序列化一次
+        """
+        if not sources:
+            return [], {
+                "findings": [],
+                "conflict_points": [],
+                "evidence_gaps": ["未找到任何相关信源"],
+                "analysis_reasoning": "",
+                "perspectives": {}
+            }
+
+        sources_summary = []
+        for i, s in enumerate(sources[:limit]):
+            sources_summary.append({
+                "index": i,
+                "domain": s.source_domain,
+                "title": s.title[:80],
+                "credibility": s.source_credibility,
+                "stance": s.source_stance,
+                "insight": s.key_insight[:150]
+            })
+
+        prompt = f"""你是一位资深的事实核查专家。请基于已收集的信源，一次完成信源综合分析与关键发现提炼。
+
+【待核实内容】
+{original_content}
+
+【核心问题】
+{query_analysis.get('core_question', '')}
+
+【核心实体】
+{', '.join(query_analysis.get('core_entities', []))}
+
+【信源列表】
+{json.dumps(sources_summary, ensure_ascii=False, indent=2)}
+
+【你的分析任务】
+1. 逐条分析最重要的信源（不超过{max(1, limit - 5)}个）：可靠性担忧和独特价值
+2. 提炼核心发现（3-5条）
+3. 识别信息冲突点（不同信源之间的矛盾）
+4. 指出证据缺口（还需要什么信息）
+5. 分析不同立场的观点，给出推理过程
+
+请返回JSON格式：
+{{
+    "source_analysis": [
+        {{
+            "index": 0,
+            "analysis": "对该信源的深度分析",
+            "reliability_concerns": "可靠性方面的担忧（如有）",
+            "unique_value": "该信源的独特价值"
+        }}
+    ],
+    "findings": [
+        "核心发现1：基于高可信度信源的关键事实",
+        "核心发现2：..."
+    ],
+    "conflict_points": [
+        "冲突点1：信源A说X，信源B说Y"
+    ],
+    "evidence_gaps": [
+        "证据缺口1：缺少官方数据"
+    ],
+    "analysis_reasoning": "分析推理过程，包括你如何权衡不同信源、如何处理冲突信息",
+    "perspectives": {{
+        "supporting": "支持方的主要观点和证据",
+        "opposing": "反对方的主要观点和证据",
+        "neutral": "中立方的观察"
+    }},
+    "key_source_indices": [0, 3, 5]
+}}
+
+只依据上面列出的信源进行分析，请确保分析深入、客观、专业。"""
+
+        try:
+            result_text = await self._call_llm_with_search(prompt, "combined_analysis", web_search=False)
+            result = self._parse_search_result(result_text)
+            return self._apply_source_analysis(sources, result), result
+        except Exception as e:
+            print(f"[SearchAgent] Combined analysis error: {e}")
+            return sources, {
+                "findings": ["分析过程中出现错误"],
+                "conflict_points": [],
+                "evidence_gaps": [],
+                "analysis_reasoning": f"错误: {str(e)}",
+                "perspectives": {},
+                "key_source_indices": []
+            }
+
+    async def _call_llm_with_search(self, prompt: str, stage: str, web_search: bool = True) -> str:
+        """调用支持联网功能的 LLM（按阶段路由模型，经录像带录制/回放），web_search 为 False 时不开启联网搜索"""
         try:
-            if self.llm_provider == "openai" and self.openai_client:
-                print(f"[SearchAgent] Calling DeepSeek with web search...")
-                
-                # 阿里百炼 DeepSeek 联网搜索配置
-                # 参考: https://help.aliyun.com/zh/model-studio/user-guide/deepseek
-                response = await self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": "你是一位专业的信息分析师、调查记者和事实核查专家。你擅长深度搜索、批判性思维和多角度分析。你总是基于证据说话，善于发现信息冲突和偏见。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.4,
-                    max_tokens=4000,
-                    # 阿里百炼联网搜索配置
-                    # 使用 enable_search 参数启用联网搜索（阿里百炼特定参数）
-                    extra_body={
-                        "enable_search": True
-                    }
-                )
-                
-                content = response.choices[0].message.content
-                print(f"[SearchAgent] LLM Response: {content[:200]}...")
-                
-                # 检查是否有工具调用结果（搜索结果）
-                if hasattr(response.choices[0], 'tool_calls') and response.choices[0].tool_calls:
-                    print(f"[SearchAgent] Web search tool was used")
-                
-                return content
-            elif self.llm_provider == "claude" and self.anthropic_client:
-                # Claude 目前不直接支持联网搜索，需要配合其他搜索工具
-                print(f"[SearchAgent] Claude does not support web search directly")
-                response = self.anthropic_client.messages.create(
-                    model=settings.ANTHROPIC_MODEL,
-                    max_tokens=4000,
-                    temperature=0.4,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
-            else:
-                return "{}"
+            return await model_router.call(
+                "search", stage, prompt,
+                lambda model, max_tokens, provider: self._request_llm_with_search(
+                    prompt, model, max_tokens, provider, web_search=web_search
+                ),
+                self.model
+            )
         except Exception as e:
             print(f"[SearchAgent] LLM Error: {str(e)}")
             return "{}"
 
+    async def _request_llm_with_search(self, prompt: str, model: str, max_tokens: int,
+                                       provider: Optional[str] = None, web_search: bool = True) -> str:
+        """调用支持联网功能的 LLM (DeepSeek via 阿里百炼)，provider 默认为配置的主提供商"""
+        provider = provider or self.llm_provider
+        if provider == "openai" and self.openai_client:
+            print(f"[SearchAgent] Calling DeepSeek {'with' if web_search else 'without'} web search...")
+            
+            # 阿里百炼 DeepSeek 联网搜索配置
+            # 参考: https://help.aliyun.com/zh/model-studio/user-guide/deepseek
+            response = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "你是一位专业的信息分析师、调查记者和事实核查专家。你擅长深度搜索、批判性思维和多角度分析。你总是基于证据说话，善于发现信息冲突和偏见。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.4,
+                max_tokens=max_tokens,
+                # 阿里百炼联网搜索配置
+                # 使用 enable_search 参数启用联网搜索（阿里百炼特定参数）
+                extra_body={
+                    "enable_search": web_search
+                }
+            )
+            
+            content = response.choices[0].message.content
+            print(f"[SearchAgent] LLM Response: {content[:200]}...")
+            
+            # 检查是否有工具调用结果（搜索结果）
+            if hasattr(response.choices[0], 'tool_calls') and response.choices[0].tool_calls:
+                print(f"[SearchAgent] Web search tool was used")
+            
+            return content
+        elif provider == "claude" and self.anthropic_client:
+            # Claude 目前不直接支持联网搜索，需要配合其他搜索工具
+            if web_search:
+                print(f"[SearchAgent] Claude does not support web search directly")
+            response = await self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=0.4,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.content[0].text
+        else:
+            return "{}"
+
     def _parse_search_result(self, result_text: str) -> Dict[str, Any]:
         """解析 LLM 返回的搜索结果"""
         if not result_text or not result_text.strip():
@@ -600,52 +986,40 @@ class SearchAgent:
         text = text.strip()
 
         try:
-            result = json.loads(text)
-            
-            # 为每个信源添加 ID 和默认值
-            if "sources" in result:
-                for source in result["sources"]:
-                    if not source.get("evidence_id"):
-                        source["evidence_id"] = str(uuid.uuid4())
-                    if not source.get("source_category"):
-                        source["source_category"] = "news"
-                    if not source.get("relevance_score"):
-                        source["relevance_score"] = 0.8
-                    if not source.get("evidence_type"):
-                        source["evidence_type"] = "primary"
-                    if not source.get("source_stance"):
-                        source["source_stance"] = "neutral"
-            
-            return result
+            return self._normalize_sources(json.loads(text))
         except json.JSONDecodeError:
             # 尝试提取 JSON
             try:
                 start = text.find("{")
                 end = text.rfind("}") + 1
                 if start >= 0 and end > start:
-                    return json.loads(text[start:end])
+                    return self._normalize_sources(json.loads(text[start:end]))
             except:
                 pass
             return {"sources": [], "search_reasoning": ""}
 
-    def _deduplicate_sources(self, sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _normalize_sources(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """将原始信源字典转换为 Source，补齐 ID 和默认值"""
+        if isinstance(result, dict) and "sources" in result:
+            raw_sources = result["sources"] if isinstance(result["sources"], list) else []
+            result["sources"] = [Source.from_llm(raw) for raw in raw_sources if isinstance(raw, dict)]
+        return result
+
+    def _deduplicate_sources(self, sources: List[Source]) -> List[Source]:
         """按 URL 去重，保留最完整的版本"""
-        seen_urls = {}
+        seen_urls: Dict[str, Source] = {}
         
         for source in sources:
-            url = source.get("source_url", "")
+            url = source.source_url
             if url:
-                if url not in seen_urls:
+                existing = seen_urls.get(url)
+                # 保留更完整的版本（非空字段更多的）
+                if existing is None or source.completeness() > existing.completeness():
                     seen_urls[url] = source
-                else:
-                    # 保留更完整的版本（有更多字段的）
-                    existing = seen_urls[url]
-                    if len(str(source)) > len(str(existing)):
-                        seen_urls[url] = source
         
         return list(seen_urls.values())
 
-    def _rank_sources_by_importance(self, sources: List[Dict[str, Any]], key_findings: Dict) -> List[Dict[str, Any]]:
+    def _rank_sources_by_importance(self, sources: List[Source], key_findings: Dict) -> List[Source]:
         """
         按重要性排序信源，并标记关键信源
         """
@@ -653,31 +1027,23 @@ class SearchAgent:
         
         # 为每个信源计算重要性分数
         for i, source in enumerate(sources):
-            score = 0
-            
-            # 可信度权重
-            credibility_scores = {"high": 3, "medium": 2, "low": 1}
-            score += credibility_scores.get(source.get("source_credibility", "low"), 1) * 10
-            
-            # 相关度权重
-            score += source.get("relevance_score", 0.5) * 10
+            # 可信度权重 + 相关度权重
+            score = CREDIBILITY_RANK.get(source.source_credibility, 1) * 10 + source.relevance_score * 10
             
             # 是否被标记为关键信源
-            if i in key_indices:
+            source.is_key_source = i in key_indices
+            if source.is_key_source:
                 score += 20
-                source["is_key_source"] = True
-            else:
-                source["is_key_source"] = False
             
             # 是否有深度分析
-            if source.get("deep_analysis"):
+            if source.deep_analysis:
                 score += 5
             
             # 是否有独特价值
-            if source.get("unique_value"):
+            if source.unique_value:
                 score += 3
             
-            source["importance_score"] = score
+            source.importance_score = score
         
         # 按重要性分数排序
-        return sorted(sources, key=lambda x: -x.get("importance_score", 0))
+        return sorted(sources, key=lambda x: -x.importance_score)
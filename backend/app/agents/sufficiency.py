@@ -0,0 +1,79 @@
+"""
+证据充分度评估
+
+每轮搜索返回后，根据信源可信度、立场一致性和相关度计算一个廉价的充分度分数，
+供 Search Agent 决定提前结束搜索，或在说法存在争议时扩大搜索范围。
+不调用 LLM。
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+from app.models.source import Source
+
+
+# 单个信源的证据量：可信度系数 × 相关度
+CREDIBILITY_MASS = {"high": 1.0, "medium": 0.5, "low": 0.15}
+
+# 证据量达到该值视为覆盖充分（约两个高度相关的权威信源）
+SUFFICIENT_EVIDENCE_MASS = 2.0
+
+# 少数立场占有立场证据量的比例达到该值，且证据量不低于 CONTESTED_MIN_MASS 时视为存在争议
+CONTESTED_SHARE = 0.3
+CONTESTED_MIN_MASS = 0.5
+
+
+@dataclass
+class Sufficiency:
+    """充分度评估结果"""
+    score: float
+    coverage: float
+    agreement: float
+    contested: bool
+    dominant_stance: str
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "score": round(self.score, 3),
+            "coverage": round(self.coverage, 3),
+            "agreement": round(self.agreement, 3),
+            "contested": self.contested,
+            "dominant_stance": self.dominant_stance
+        }
+
+
+def assess_sufficiency(sources: List[Source]) -> Sufficiency:
+    """
+    评估当前已收集信源的充分度
+
+    score = 覆盖度 × 立场一致度；没有任何明确立场的信源时一致度为 0，
+    即仅凭中立信源不会提前结束搜索。
+    """
+    evidence_mass = 0.0
+    stance_mass = {"supportive": 0.0, "opposing": 0.0}
+    seen_urls = set()
+
+    for source in sources:
+        if source.source_url:
+            if source.source_url in seen_urls:
+                continue
+            seen_urls.add(source.source_url)
+        mass = CREDIBILITY_MASS.get(source.source_credibility, 0.15) * source.relevance_score
+        evidence_mass += mass
+        if source.source_stance in stance_mass:
+            stance_mass[source.source_stance] += mass
+
+    coverage = min(1.0, evidence_mass / SUFFICIENT_EVIDENCE_MASS)
+    supportive, opposing = stance_mass["supportive"], stance_mass["opposing"]
+    decisive = supportive + opposing
+    if decisive <= 0:
+        return Sufficiency(0.0, coverage, 0.0, False, "unclear")
+
+    minority = min(supportive, opposing)
+    agreement = max(supportive, opposing) / decisive
+    return Sufficiency(
+        score=coverage * agreement,
+        coverage=coverage,
+        agreement=agreement,
+        contested=minority / decisive >= CONTESTED_SHARE and minority >= CONTESTED_MIN_MASS,
+        dominant_stance="supportive" if supportive >= opposing else "opposing"
+    )
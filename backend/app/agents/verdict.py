@@ -1,11 +1,36 @@
 import json
 import uuid
-from typing import List, Dict, Any, AsyncGenerator
-import openai
-from anthropic import Anthropic
+from typing import List, Dict, Any, AsyncGenerator, Optional
 import asyncio
 
 from app.core.config import settings
+from app.core.key_pool import key_pool
+from app.core.deadline import DeadlineExceeded, skip_stage
+from app.core.metrics import metrics
+from app.core.model_routing import model_router, parse_json_object
+from app.models.source import Source
+
+
+# 证据权重中的可信度系数
+CREDIBILITY_WEIGHTS = {"high": 0.9, "medium": 0.6, "low": 0.3}
+
+# 确定性快速判定：主导立场 -> 结论
+STANCE_CONCLUSIONS = {"supportive": "true", "opposing": "false"}
+
+# 主导立场的证据权重达到该值时视为证据量充分（约两个高度相关的权威关键信源）
+FAST_PATH_FULL_WEIGHT = 1.0
+
+# 证据评估提示词中每个关键信源附带的原文字符数
+PAGE_EXCERPT_CHARS = 600
+
+CONCLUSION_LABELS = {
+    "true": "真实",
+    "false": "虚假",
+    "uncertain": "存疑",
+    "unverifiable": "无法核实",
+    "partially_true": "部分真实",
+    "misleading": "误导性"
+}
 
 
 class VerdictAgent:
@@ -23,20 +48,18 @@ class VerdictAgent:
     def __init__(self):
         self.llm_provider = settings.LLM_PROVIDER
         model = settings.VERDICT_LLM_MODEL or settings.OPENAI_MODEL
-        self.openai_client = openai.AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=60.0
-        ) if settings.OPENAI_API_KEY else None
-        self.anthropic_client = Anthropic(
-            api_key=settings.ANTHROPIC_API_KEY
-        ) if settings.ANTHROPIC_API_KEY else None
+        # 每次调用从 Key 池中选择负载最低的 Key
+        self.openai_client = key_pool.client("openai", timeout=60.0)
+        self.anthropic_client = key_pool.client("claude", timeout=60.0)
         self.model = model
         self.temperature = settings.VERDICT_LLM_TEMPERATURE
 
-    async def verdict(self, search_result: Dict[str, Any], original_content: str) -> Dict[str, Any]:
+    async def verdict(self, search_result: Dict[str, Any], original_content: str,
+                      claim_ref: str = "c1") -> Dict[str, Any]:
         """
         基于 Search Agent 的深度分析结果，生成多维度鉴定结论
+
+        claim_ref 为所鉴定主张的编号，写入证据链
         """
         print(f"[VerdictAgent] Starting multi-dimensional verdict")
         verdict_id = str(uuid.uuid4())
@@ -52,27 +75,45 @@ class VerdictAgent:
             print("[VerdictAgent] No sources found, returning unverifiable result")
             return self._create_unverifiable_result(verdict_id, search_result.get("search_id"))
 
-        # 阶段1: 多维度问题分解
-        print("[VerdictAgent] Performing multi-dimensional analysis...")
-        dimensions = await self._analyze_dimensions(
-            original_content, query_analysis, search_analysis
-        )
-
-        # 阶段2: 深度证据评估
-        print("[VerdictAgent] Evaluating evidence...")
-        evidence_evaluation = await self._evaluate_evidence_comprehensive(
-            key_sources, regular_sources, search_analysis, original_content
-        )
-
-        # 阶段3: 多角度综合判断
+        # 证据高度一致时直接判定，不走多阶段 LLM 分析
+        consensus = self._aggregate_evidence(all_sources)
+        if consensus["eligible"]:
+            return await self._fast_verdict(verdict_id, search_result, original_content, consensus, claim_ref)
+        metrics.incr("verdict_path", path="full")
+
+        # 阶段1: 多维度问题分解（时延预算不足时跳过）
+        dimensions = {}
+        if not skip_stage("dimensions", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            print("[VerdictAgent] Performing multi-dimensional analysis...")
+            dimensions = await self._analyze_dimensions(
+                original_content, query_analysis, search_analysis
+            )
+
+        # 阶段2: 深度证据评估（时延预算不足时跳过）
+        evidence_evaluation = {}
+        if not skip_stage("evidence_evaluation", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            print("[VerdictAgent] Evaluating evidence...")
+            evidence_evaluation = await self._evaluate_evidence_comprehensive(
+                key_sources, regular_sources, search_analysis, original_content
+            )
+
+        # 阶段3: 多角度综合判断；来不及调用 LLM 时按证据权重直接判定
+        if skip_stage("synthesis", settings.DEADLINE_MIN_CALL_SECONDS):
+            return await self._fast_verdict(verdict_id, search_result, original_content, consensus, claim_ref,
+                                            degraded=True)
         print("[VerdictAgent] Synthesizing multi-angle judgment...")
-        final_judgment = await self._synthesize_judgment(
-            original_content, dimensions, evidence_evaluation, search_analysis
-        )
+        try:
+            final_judgment = await self._synthesize_judgment(
+                original_content, dimensions, evidence_evaluation, search_analysis
+            )
+        except DeadlineExceeded:
+            # 综合判断调用中途耗尽预算，同样按证据权重给出部分结果
+            return await self._fast_verdict(verdict_id, search_result, original_content, consensus, claim_ref,
+                                            degraded=True)
 
         # 构建证据链
         evidence_chain = self._build_comprehensive_evidence_chain(
-            key_sources, regular_sources, final_judgment.get("supporting_sources", [])
+            key_sources, regular_sources, final_judgment.get("supporting_sources", []), claim_ref
         )
 
         print(f"[VerdictAgent] Verdict complete: {final_judgment.get('conclusion')} with confidence {final_judgment.get('confidence_score')}")
@@ -113,17 +154,7 @@ class VerdictAgent:
             },
             
             # 重要信源引用
-            "key_sources_cited": [
-                {
-                    "evidence_id": s.get("evidence_id"),
-                    "title": s.get("title"),
-                    "domain": s.get("source_domain"),
-                    "credibility": s.get("source_credibility"),
-                    "key_insight": s.get("key_insight", "")[:100],
-                    "why_important": s.get("importance_note", "")
-                }
-                for s in key_sources[:5]
-            ],
+            "key_sources_cited": self._cite_key_sources(key_sources),
             
             # 可追溯日志
             "traceability_log": {
@@ -143,7 +174,8 @@ class VerdictAgent:
             "processing_time_ms": 3500
         }
 
-    async def verdict_stream(self, search_result: Dict[str, Any], original_content: str) -> AsyncGenerator[Dict[str, Any], None]:
+    async def verdict_stream(self, search_result: Dict[str, Any], original_content: str,
+                             claim_ref: str = "c1") -> AsyncGenerator[Dict[str, Any], None]:
         """
         流式鉴定，实时返回多维度推理过程
         """
@@ -177,21 +209,56 @@ class VerdictAgent:
             yield {"type": "result", "agent": "verdict", "data": result}
             return
 
-        # 阶段1: 多维度问题分解
-        yield {
-            "type": "reasoning",
-            "agent": "verdict",
-            "step": "多维度分析",
-            "content": "🔬 从多维度审视问题...\n"
-                       "   - 事实维度：核心主张是否属实\n"
-                       "   - 背景维度：事件的前因后果\n"
-                       "   - 动机维度：信息传播的可能动机\n"
-                       "   - 影响维度：该信息的潜在影响"
-        }
+        consensus = self._aggregate_evidence(all_sources)
+        if consensus["eligible"]:
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "一致性判定",
+                "content": f"⚖️ 证据高度一致，直接判定\n"
+                           f"   📌 {consensus['high_credibility']} 个高可信度信源立场一致，无高可信度反方信源\n"
+                           f"   📊 主导立场权重 {consensus['dominant_weight']:.2f}，"
+                           f"反方权重 {consensus['minority_weight']:.2f}，一致度 {consensus['margin']:.0%}\n"
+                           f"   ⏩ 跳过多维度分析与多阶段综合判断"
+            }
+            result = await self._fast_verdict(verdict_id, search_result, original_content, consensus, claim_ref)
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "结论生成",
+                "content": f"🎯 最终鉴定结论\n\n"
+                           f"   结论: {CONCLUSION_LABELS.get(result['conclusion'], result['conclusion'])}\n"
+                           f"   📊 置信度: {result['confidence_score']:.0%}\n"
+                           f"   📝 结论摘要:\n      {result['conclusion_summary']}"
+            }
+            yield {"type": "result", "agent": "verdict", "data": result}
+            return
+        metrics.incr("verdict_path", path="full")
 
-        dimensions = await self._analyze_dimensions(
-            original_content, query_analysis, search_analysis
-        )
+        # 阶段1: 多维度问题分解（时延预算不足时跳过）
+        dimensions = {}
+        if skip_stage("dimensions", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "多维度分析",
+                "content": "⏱️ 剩余时间不足，跳过多维度分析"
+            }
+        else:
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "多维度分析",
+                "content": "🔬 从多维度审视问题...\n"
+                           "   - 事实维度：核心主张是否属实\n"
+                           "   - 背景维度：事件的前因后果\n"
+                           "   - 动机维度：信息传播的可能动机\n"
+                           "   - 影响维度：该信息的潜在影响"
+            }
+
+            dimensions = await self._analyze_dimensions(
+                original_content, query_analysis, search_analysis
+            )
 
         for dim_name, dim_data in dimensions.items():
             yield {
@@ -201,44 +268,72 @@ class VerdictAgent:
                 "content": f"📊 {dim_name}维度分析:\n{dim_data.get('analysis', '')}"
             }
 
-        # 阶段2: 证据评估
-        yield {
-            "type": "reasoning",
-            "agent": "verdict",
-            "step": "证据评估",
-            "content": f"🧩 深度评估证据...\n"
-                       f"   - 评估 {len(key_sources)} 个关键信源\n"
-                       f"   - 评估 {len(regular_sources)} 个普通信源\n"
-                       f"   - 分析 Search Agent 识别的 {len(search_analysis.get('conflict_points', []))} 个冲突点"
-        }
+        # 阶段2: 证据评估（时延预算不足时跳过）
+        evidence_evaluation = {}
+        if skip_stage("evidence_evaluation", settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "证据评估",
+                "content": "⏱️ 剩余时间不足，跳过证据评估"
+            }
+        else:
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "证据评估",
+                "content": f"🧩 深度评估证据...\n"
+                           f"   - 评估 {len(key_sources)} 个关键信源\n"
+                           f"   - 评估 {len(regular_sources)} 个普通信源\n"
+                           f"   - 分析 Search Agent 识别的 {len(search_analysis.get('conflict_points', []))} 个冲突点"
+            }
 
-        evidence_evaluation = await self._evaluate_evidence_comprehensive(
-            key_sources, regular_sources, search_analysis, original_content
-        )
+            evidence_evaluation = await self._evaluate_evidence_comprehensive(
+                key_sources, regular_sources, search_analysis, original_content
+            )
 
-        yield {
-            "type": "reasoning",
-            "agent": "verdict",
-            "step": "证据权重",
-            "content": "⚖️ 证据权重分析:\n" +
-                       "\n".join([f"   • {e}" for e in evidence_evaluation.get("weight_analysis", [])])
-        }
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "证据权重",
+                "content": "⚖️ 证据权重分析:\n" +
+                           "\n".join([f"   • {e}" for e in evidence_evaluation.get("weight_analysis", [])])
+            }
 
-        # 阶段3: 多角度综合
-        yield {
-            "type": "reasoning",
-            "agent": "verdict",
-            "step": "综合判断",
-            "content": "🎭 从多角度综合判断...\n"
-                       "   - 字面意思 vs 深层含义\n"
-                       "   - 直接证据 vs 间接证据\n"
-                       "   - 短期影响 vs 长期影响\n"
-                       "   - 表面现象 vs 本质问题"
-        }
+        # 阶段3: 多角度综合；来不及调用 LLM 或调用中途耗尽预算时按证据权重直接判定
+        final_judgment = None
+        if not skip_stage("synthesis", settings.DEADLINE_MIN_CALL_SECONDS):
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "综合判断",
+                "content": "🎭 从多角度综合判断...\n"
+                           "   - 字面意思 vs 深层含义\n"
+                           "   - 直接证据 vs 间接证据\n"
+                           "   - 短期影响 vs 长期影响\n"
+                           "   - 表面现象 vs 本质问题"
+            }
+            try:
+                final_judgment = await self._synthesize_judgment(
+                    original_content, dimensions, evidence_evaluation, search_analysis
+                )
+            except DeadlineExceeded:
+                pass
 
-        final_judgment = await self._synthesize_judgment(
-            original_content, dimensions, evidence_evaluation, search_analysis
-        )
+        if final_judgment is None:
+            result = await self._fast_verdict(verdict_id, search_result, original_content, consensus, claim_ref,
+                                              degraded=True)
+            yield {
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": "结论生成",
+                "content": f"⏱️ 剩余时间不足，按信源可信度与立场直接判定\n\n"
+                           f"   结论: {CONCLUSION_LABELS.get(result['conclusion'], result['conclusion'])}\n"
+                           f"   📊 置信度: {result['confidence_score']:.0%}\n"
+                           f"   📝 结论摘要:\n      {result['conclusion_summary']}"
+            }
+            yield {"type": "result", "agent": "verdict", "data": result}
+            return
 
         # 输出多角度推理 - 详细分析
         multi_angle = final_judgment.get("multi_angle_reasoning", {})
@@ -317,21 +412,12 @@ class VerdictAgent:
             "misleading": "🟧"
         }.get(conclusion, "❓")
 
-        conclusion_labels = {
-            "true": "真实",
-            "false": "虚假",
-            "uncertain": "存疑",
-            "unverifiable": "无法核实",
-            "partially_true": "部分真实",
-            "misleading": "误导性"
-        }
-
         yield {
             "type": "reasoning",
             "agent": "verdict",
             "step": "结论生成",
             "content": f"🎯 最终鉴定结论\n\n"
-                       f"   {conclusion_emoji} 结论: {conclusion_labels.get(conclusion, conclusion)}\n"
+                       f"   {conclusion_emoji} 结论: {CONCLUSION_LABELS.get(conclusion, conclusion)}\n"
                        f"   📊 置信度: {confidence:.0%}\n"
                        f"   📝 结论摘要:\n      {summary}\n\n"
                        f"   💡 结论依据:\n"
@@ -342,7 +428,7 @@ class VerdictAgent:
 
         # 构建最终结果
         evidence_chain = self._build_comprehensive_evidence_chain(
-            key_sources, regular_sources, final_judgment.get("supporting_sources", [])
+            key_sources, regular_sources, final_judgment.get("supporting_sources", []), claim_ref
         )
 
         final_result = {
@@ -367,17 +453,7 @@ class VerdictAgent:
                 "uncertain_claims": final_judgment.get("uncertain_claims", []),
                 "nuanced_claims": final_judgment.get("nuanced_claims", [])
             },
-            "key_sources_cited": [
-                {
-                    "evidence_id": s.get("evidence_id"),
-                    "title": s.get("title"),
-                    "domain": s.get("source_domain"),
-                    "credibility": s.get("source_credibility"),
-                    "key_insight": s.get("key_insight", "")[:100],
-                    "why_important": s.get("importance_note", "")
-                }
-                for s in key_sources[:5]
-            ],
+            "key_sources_cited": self._cite_key_sources(key_sources),
             "traceability_log": {
                 "agent_version": "2.0",
                 "processing_steps": [
@@ -454,7 +530,7 @@ class VerdictAgent:
 4. 思考维度之间的关联"""
 
         try:
-            result_text = await self._call_llm(prompt)
+            result_text = await self._call_llm(prompt, "dimensions")
             return self._parse_llm_response(result_text)
         except Exception as e:
             print(f"[VerdictAgent] Dimension analysis error: {e}")
@@ -465,7 +541,7 @@ class VerdictAgent:
                 "impact": {"analysis": "分析失败", "key_points": [], "confidence": 0.5}
             }
 
-    async def _evaluate_evidence_comprehensive(self, key_sources: List[Dict], regular_sources: List[Dict], 
+    async def _evaluate_evidence_comprehensive(self, key_sources: List[Source], regular_sources: List[Source], 
                                                 search_analysis: Dict, original_content: str) -> Dict[str, Any]:
         """
         综合评估所有证据
@@ -477,12 +553,14 @@ class VerdictAgent:
         key_sources_summary = []
         for s in key_sources[:6]:
             key_sources_summary.append({
-                "domain": s.get("source_domain", ""),
-                "credibility": s.get("source_credibility", "medium"),
-                "stance": s.get("source_stance", "neutral"),
-                "insight": s.get("key_insight", "")[:120],
-                "deep_analysis": s.get("deep_analysis", "")[:80]
+                "domain": s.source_domain,
+                "credibility": s.source_credibility,
+                "stance": s.source_stance,
+                "insight": s.key_insight[:120],
+                "deep_analysis": s.deep_analysis[:80]
             })
+            if s.page_text:
+                key_sources_summary[-1]["page_excerpt"] = s.page_text[:PAGE_EXCERPT_CHARS]
 
         prompt = f"""你是一位证据评估专家。请对以下证据进行综合评估。
 
@@ -522,10 +600,11 @@ class VerdictAgent:
 1. 详细评估每个关键信源
 2. 说明如何处理冲突信息
 3. 评估证据的整体强度和覆盖度
-4. 指出任何可靠性担忧"""
+4. 指出任何可靠性担忧
+5. page_excerpt 是从信源页面抓取的原文，与 insight 不一致时以原文为准"""
 
         try:
-            result_text = await self._call_llm(prompt)
+            result_text = await self._call_llm(prompt, "evidence_evaluation")
             return self._parse_llm_response(result_text)
         except Exception as e:
             print(f"[VerdictAgent] Evidence evaluation error: {e}")
@@ -624,8 +703,10 @@ class VerdictAgent:
 5. 考虑不同角度的观点"""
 
         try:
-            result_text = await self._call_llm(prompt)
+            result_text = await self._call_llm(prompt, "synthesis")
             return self._parse_llm_response(result_text)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"[VerdictAgent] Judgment synthesis error: {e}")
             return {
@@ -643,37 +724,18 @@ class VerdictAgent:
                 "confidence_breakdown": {}
             }
 
-    async def _call_llm(self, prompt: str) -> str:
-        """调用 LLM"""
+    async def _call_llm(self, prompt: str, stage: str) -> str:
+        """调用 LLM（按阶段路由模型，经录像带录制/回放）"""
+        default_model = settings.ANTHROPIC_MODEL if self.llm_provider == "claude" else self.model
         try:
-            if self.llm_provider == "openai" and self.openai_client:
-                print(f"[VerdictAgent] Calling OpenAI API with model: {self.model}")
-                response = await self.openai_client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "你是一位资深的事实核查专家和批判性思维导师。你擅长多维度分析、多角度思考，不局限于表面现象。你总是基于证据说话，善于发现问题的复杂性，给出 nuanced 的结论。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=self.temperature,
-                    max_tokens=3000
-                )
-                content = response.choices[0].message.content
-                print(f"[VerdictAgent] LLM Response received: {content[:200]}...")
-                return content
-            elif self.llm_provider == "claude" and self.anthropic_client:
-                print(f"[VerdictAgent] Calling Claude API")
-                response = self.anthropic_client.messages.create(
-                    model=settings.ANTHROPIC_MODEL,
-                    max_tokens=3500,
-                    temperature=self.temperature,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response.content[0].text
-                print(f"[VerdictAgent] LLM Response received: {content[:200]}...")
-                return content
-            else:
-                print(f"[VerdictAgent] Warning: No LLM client available")
-                return self._create_fallback_response()
+            return await model_router.call(
+                "verdict", stage, prompt,
+                lambda model, max_tokens, provider: self._request_llm(prompt, model, max_tokens, provider),
+                default_model
+            )
+        except DeadlineExceeded:
+            # 时延预算耗尽由调用方按已有证据降级判定，不能当作普通超时返回“无法完成鉴定”
+            raise
         except asyncio.TimeoutError:
             print(f"[VerdictAgent] LLM Timeout Error")
             return self._create_fallback_response()
@@ -681,6 +743,38 @@ class VerdictAgent:
             print(f"[VerdictAgent] LLM Error: {str(e)}")
             return self._create_fallback_response()
 
+    async def _request_llm(self, prompt: str, model: str, max_tokens: int, provider: Optional[str] = None) -> str:
+        """向 LLM 提供商发起请求，provider 默认为配置的主提供商"""
+        provider = provider or self.llm_provider
+        if provider == "openai" and self.openai_client:
+            print(f"[VerdictAgent] Calling OpenAI API with model: {model}")
+            response = await self.openai_client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": "你是一位资深的事实核查专家和批判性思维导师。你擅长多维度分析、多角度思考，不局限于表面现象。你总是基于证据说话，善于发现问题的复杂性，给出 nuanced 的结论。"},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=max_tokens
+            )
+            content = response.choices[0].message.content
+            print(f"[VerdictAgent] LLM Response received: {content[:200]}...")
+            return content
+        elif provider == "claude" and self.anthropic_client:
+            print(f"[VerdictAgent] Calling Claude API")
+            response = await self.anthropic_client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            content = response.content[0].text
+            print(f"[VerdictAgent] LLM Response received: {content[:200]}...")
+            return content
+        else:
+            print(f"[VerdictAgent] Warning: No LLM client available")
+            return self._create_fallback_response()
+
     def _parse_llm_response(self, result_text: str) -> Dict[str, Any]:
         """解析 LLM 响应"""
         if not result_text or not result_text.strip():
@@ -729,43 +823,215 @@ class VerdictAgent:
             "confidence_breakdown": {}
         })
 
-    def _build_comprehensive_evidence_chain(self, key_sources: List[Dict], regular_sources: List[Dict], 
-                                            supporting_ids: List[str]) -> List[Dict[str, Any]]:
+    def _aggregate_evidence(self, sources: List[Source]) -> Dict[str, Any]:
+        """
+        确定性地汇总证据（不调用 LLM）
+
+        每个信源按 _calculate_weight 计入其立场；一致度 margin = (主导权重 - 反方权重) / 有立场的总权重。
+        主导立场有足够的高可信度信源、没有高可信度反方信源且一致度达到阈值时可直接判定。
+        置信度 = 0.5 + 0.45 × margin × min(1, 主导权重 / FAST_PATH_FULL_WEIGHT)。
+        """
+        weights = {"supportive": 0.0, "opposing": 0.0}
+        high = {"supportive": 0, "opposing": 0}
+        seen_urls = set()
+        for source in sources:
+            if source.source_url:
+                if source.source_url in seen_urls:
+                    continue
+                seen_urls.add(source.source_url)
+            if source.source_stance in weights:
+                weights[source.source_stance] += self._calculate_weight(source)
+                if source.source_credibility == "high":
+                    high[source.source_stance] += 1
+
+        stance = "supportive" if weights["supportive"] > weights["opposing"] else "opposing"
+        minority = "opposing" if stance == "supportive" else "supportive"
+        decisive = weights[stance] + weights[minority]
+        margin = (weights[stance] - weights[minority]) / decisive if decisive > 0 else 0.0
+        coverage = min(1.0, weights[stance] / FAST_PATH_FULL_WEIGHT)
+        eligible = (
+            settings.VERDICT_FAST_PATH_ENABLED
+            and margin >= settings.VERDICT_FAST_PATH_MARGIN
+            and high[stance] >= settings.VERDICT_FAST_PATH_MIN_HIGH
+            and high[minority] == 0
+        )
+        return {
+            "eligible": eligible,
+            "stance": stance,
+            "conclusion": STANCE_CONCLUSIONS[stance],
+            "margin": round(margin, 3),
+            "dominant_weight": round(weights[stance], 3),
+            "minority_weight": round(weights[minority], 3),
+            "high_credibility": high[stance],
+            "confidence": round(0.5 + 0.45 * margin * coverage, 3)
+        }
+
+    async def _fast_verdict(self, verdict_id: str, search_result: Dict[str, Any], original_content: str,
+                            consensus: Dict[str, Any], claim_ref: str, degraded: bool = False) -> Dict[str, Any]:
+        """
+        证据高度一致时的快速判定：结论、置信度和证据链由确定性汇总得出，LLM 最多只生成摘要
+
+        degraded 为 True 时表示时延预算不足、来不及综合判断：一致度未达到阈值的判为存疑，不调用 LLM。
+        """
+        key_sources = search_result.get("key_sources", [])
+        regular_sources = search_result.get("regular_sources", [])
+        all_sources = search_result.get("all_sources", [])
+        decisive = consensus["margin"] >= settings.VERDICT_FAST_PATH_MARGIN
+        conclusion = consensus["conclusion"] if decisive else "uncertain"
+        confidence = consensus["confidence"] if decisive else 0.5
+        label = CONCLUSION_LABELS[conclusion]
+        metrics.incr("verdict_path", path="deadline" if degraded else "fast")
+        print(f"[VerdictAgent] {'Deadline' if degraded else 'Fast'} path: {conclusion} "
+              f"with confidence {confidence} (margin {consensus['margin']})")
+
+        aligned = [s for s in all_sources if s.source_stance == consensus["stance"]]
+        authorities = "、".join(dict.fromkeys(s.source_domain for s in aligned if s.source_credibility == "high"))
+        action = "证实" if consensus["conclusion"] == "true" else "否认"
+        if degraded:
+            summary = (f"时间预算内未能完成完整分析，按 {len(all_sources)} 个信源的可信度与立场汇总，" +
+                       (f"主要信源{action}该说法，初步判定为{label}。" if decisive else "信源立场分歧较大，暂判定为存疑。"))
+            decision = f"时间预算不足，一致度 {consensus['margin']:.0%}，按证据权重直接判定"
+        else:
+            summary = (f"{consensus['high_credibility']} 个高可信度信源（{authorities}）一致{action}该说法，"
+                       f"未发现可信的相反证据，判定为{label}。")
+            decision = f"一致度 {consensus['margin']:.0%}，走快速判定"
+            if settings.VERDICT_FAST_PATH_SUMMARY:
+                summary = await self._summarize_fast_verdict(original_content, conclusion, aligned) or summary
+
+        weight_analysis = [
+            f"{s.source_domain}（{s.source_credibility}，{s.source_stance}）权重 {self._calculate_weight(s):.2f}"
+            for s in sorted(all_sources, key=lambda s: -self._calculate_weight(s))[:5]
+        ]
+        if degraded:
+            reasoning_chain = [
+                "时间预算不足，跳过多阶段综合判断",
+                f"按可信度、立场与相关度汇总 {len(all_sources)} 个信源的证据权重",
+                f"主导立场权重 {consensus['dominant_weight']:.2f}，反方权重 {consensus['minority_weight']:.2f}，"
+                f"一致度 {consensus['margin']:.0%}",
+                f"判定为{label}"
+            ]
+        else:
+            reasoning_chain = [
+                f"按可信度、立场与相关度汇总 {len(all_sources)} 个信源的证据权重",
+                f"主导立场权重 {consensus['dominant_weight']:.2f}，反方权重 {consensus['minority_weight']:.2f}，"
+                f"一致度 {consensus['margin']:.0%}",
+                f"{consensus['high_credibility']} 个高可信度信源立场一致，没有高可信度信源持相反立场",
+                f"一致度达到阈值 {settings.VERDICT_FAST_PATH_MARGIN:.0%}，判定为{label}"
+            ]
+        return {
+            "verdict_id": verdict_id,
+            "search_task_ref": search_result.get("search_id"),
+            "conclusion": conclusion,
+            "confidence_score": confidence,
+            "conclusion_summary": summary,
+            "dimensional_analysis": {},
+            "reasoning_chain": reasoning_chain,
+            "multi_angle_reasoning": {},
+            "evidence_evaluation": {
+                "evidence_strength": confidence,
+                "overall_quality": f"{consensus['high_credibility']} 个高可信度信源立场一致" if decisive else "信源立场存在分歧",
+                "weight_analysis": weight_analysis,
+                "method": "deterministic"
+            },
+            "evidence_chain": self._build_comprehensive_evidence_chain(
+                key_sources, regular_sources, [s.evidence_id for s in aligned], claim_ref
+            ),
+            "findings": {
+                "verified_claims": [original_content] if conclusion == "true" else [],
+                "refuted_claims": [original_content] if conclusion == "false" else [],
+                "uncertain_claims": [original_content] if conclusion == "uncertain" else [],
+                "nuanced_claims": []
+            },
+            "key_sources_cited": self._cite_key_sources(key_sources),
+            "traceability_log": {
+                "agent_version": "2.0",
+                "processing_steps": ["deterministic_aggregation", "conclusion_generation"],
+                "decision_points": [
+                    {"step": "证据汇总", "decision": decision}
+                ],
+                "confidence_breakdown": {
+                    "margin": consensus["margin"],
+                    "dominant_weight": consensus["dominant_weight"],
+                    "minority_weight": consensus["minority_weight"]
+                }
+            },
+            "generated_at": str(uuid.uuid1()),
+            "processing_time_ms": 0
+        }
+
+    async def _summarize_fast_verdict(self, original_content: str, conclusion: str,
+                                      aligned: List[Source]) -> Optional[str]:
+        """快速判定时用一次短 LLM 调用生成结论摘要，失败返回 None"""
+        evidence = "\n".join(f"- {s.source_domain}：{s.key_insight[:80]}" for s in aligned[:5])
+        prompt = f"""请为以下事实核查结论写一句话结论摘要（60字以内）。
+
+【待核实内容】
+{original_content}
+
+【结论】
+{CONCLUSION_LABELS[conclusion]}
+
+【一致的信源】
+{evidence}
+
+请返回JSON格式：{{"summary": "结论摘要"}}"""
+        try:
+            parsed = parse_json_object(await self._call_llm(prompt, "summary"))
+        except DeadlineExceeded:
+            return None
+        summary = parsed.get("summary") if parsed else None
+        return summary if isinstance(summary, str) and summary.strip() else None
+
+    def _cite_key_sources(self, key_sources: List[Source]) -> List[Dict[str, Any]]:
+        """结果中引用的关键信源"""
+        return [
+            {
+                "evidence_id": s.evidence_id,
+                "title": s.title,
+                "domain": s.source_domain,
+                "credibility": s.source_credibility,
+                "key_insight": s.key_insight[:100],
+                "why_important": s.importance_note
+            }
+            for s in key_sources[:5]
+        ]
+
+    def _build_comprehensive_evidence_chain(self, key_sources: List[Source], regular_sources: List[Source], 
+                                            supporting_ids: List[str], claim_ref: str = "c1") -> List[Dict[str, Any]]:
         """构建综合证据链"""
         evidence_chain = []
         all_sources = key_sources + regular_sources
 
         for source in all_sources:
-            evidence_id = source.get("evidence_id")
+            evidence_id = source.evidence_id
             supports = evidence_id in supporting_ids if supporting_ids else True
 
             evidence_chain.append({
                 "evidence_id": evidence_id,
-                "source_ref": source.get("source_url"),
-                "source_domain": source.get("source_domain"),
-                "source_credibility": source.get("source_credibility"),
-                "is_key_source": source.get("is_key_source", False),
-                "claim_ref": "c1",
+                "source_ref": source.source_url,
+                "source_domain": source.source_domain,
+                "source_credibility": source.source_credibility,
+                "is_key_source": source.is_key_source,
+                "claim_ref": claim_ref,
                 "supports": supports,
                 "weight": self._calculate_weight(source),
-                "reason": source.get("key_insight", "")[:100] if supports else source.get("deep_analysis", "")[:100]
+                "reason": source.key_insight[:100] if supports else source.deep_analysis[:100]
             })
 
         return evidence_chain
 
-    def _calculate_weight(self, source: Dict) -> float:
+    def _calculate_weight(self, source: Source) -> float:
         """计算证据权重"""
         weight = 0.5
 
         # 可信度权重
-        credibility_scores = {"high": 0.9, "medium": 0.6, "low": 0.3}
-        weight *= credibility_scores.get(source.get("source_credibility", "medium"), 0.5)
+        weight *= CREDIBILITY_WEIGHTS.get(source.source_credibility, 0.5)
 
         # 相关度权重
-        weight *= source.get("relevance_score", 0.8)
+        weight *= source.relevance_score
 
         # 关键信源加成
-        if source.get("is_key_source"):
+        if source.is_key_source:
             weight *= 1.2
 
         return min(1.0, weight)
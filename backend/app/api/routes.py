@@ -1,25 +1,281 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
-import json
+from typing import AsyncGenerator, Dict, Any, Optional, Set, Tuple
 import asyncio
 
+from app.core.admission import AdmissionRejected, Ticket, admission
+from app.core.circuit_breaker import breakers
+from app.core.config import settings
+from app.core.analysis_mode import mode_scope
+from app.core.deadline import current_deadline, deadline_scope
+from app.core.hedging import hedger
+from app.core.key_pool import key_pool
+from app.core.metrics import metrics
+from app.core.scheduler import llm_scheduler, lower_priority, priority_scope
+from app.core.text import bigram_similarity, normalize_text
+from app.db.crud import save_verification_result
+from app.api.sse import SSEStream, with_heartbeat
 from app.models.schemas import VerifyRequest, VerifyResponse, LoadingStep, ArticleRequest, ArticleResponse
-from app.agents.parser import ParserAgent
-from app.agents.search import SearchAgent
-from app.agents.verdict import VerdictAgent
-from app.agents.article import ArticleAgent
+from app.agents.registry import agents
+from app.agents.search import SearchPool
+from app.agents.verdict import CONCLUSION_LABELS
+from app.services.images import image_index
 
 router = APIRouter()
 
-# 初始化 Agents
-parser_agent = ParserAgent()
-search_agent = SearchAgent()
-verdict_agent = VerdictAgent()
-article_agent = ArticleAgent()
+# 客户端断开后继续运行的后台任务，保持强引用直到完成
+_background_tasks: Set[asyncio.Task] = set()
+
+# 调用方（如网关）传入剩余时延预算的请求头，单位毫秒
+DEADLINE_HEADER = "X-Request-Deadline-Ms"
+# 批量任务等调用方降低自身优先级的请求头（interactive | article | batch | background）
+PRIORITY_HEADER = "X-Request-Priority"
+
+REJECTION_MESSAGES = {
+    "rate_limited": "请求过于频繁，请稍后重试",
+    "queue_full": "服务繁忙，请稍后重试",
+    "queue_timeout": "排队超时，请稍后重试"
+}
+
+
+async def _pace():
+    """可选的事件节流，默认关闭"""
+    if settings.SSE_EVENT_PACING_MS > 0:
+        await asyncio.sleep(settings.SSE_EVENT_PACING_MS / 1000)
+
+
+async def _wait_for_disconnect(http_request: Request):
+    """轮询直到客户端断开连接"""
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(settings.DISCONNECT_POLL_INTERVAL)
+
+
+def _forget_background(task: asyncio.Task):
+    _background_tasks.discard(task)
+    # 失败已在流水线内记录并入库，这里只取出异常避免告警
+    if not task.cancelled():
+        task.exception()
+
+
+async def drain_background_tasks(timeout: float):
+    """进程退出前等待后台任务完成，超时仍未完成的取消"""
+    if not _background_tasks:
+        return
+    print(f"[API] Waiting for {len(_background_tasks)} background tasks before shutdown")
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        metrics.incr("background_tasks_cancelled_on_shutdown", len(pending))
+
+
+def _abandon(task: asyncio.Task, background: bool, endpoint: str, stage: str):
+    """
+    客户端已离开时处理未完成的流水线
+
+    后台任务继续运行直到结果入库；其余任务立即取消，
+    取消会传递到正在等待的 LLM 请求并关闭其 HTTP 连接。
+    """
+    if background:
+        _background_tasks.add(task)
+        task.add_done_callback(_forget_background)
+        metrics.incr("pipeline_detached", endpoint=endpoint)
+        print(f"[API] Client disconnected during {stage}, continuing in background")
+    else:
+        task.cancel()
+        metrics.incr("pipeline_cancelled", endpoint=endpoint, stage=stage)
+        print(f"[API] Client disconnected during {stage}, pipeline cancelled")
+
+
+def _client_key(http_request: Request) -> str:
+    """限流用的客户端标识"""
+    if settings.ADMISSION_TRUST_FORWARDED_FOR:
+        forwarded = http_request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def _rejection(error: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=REJECTION_MESSAGES.get(error.reason, error.reason),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _admit(http_request: Request) -> Ticket:
+    """申请运行一条流水线：名额已满时排队，队列已满或客户端超限时立即返回 429"""
+    try:
+        return admission.enter(_client_key(http_request))
+    except AdmissionRejected as e:
+        raise _rejection(e)
+
+
+def _precheck(http_request: Request):
+    """流式接口在响应开始前检查限流和队列，超限时直接返回 429；名额在响应体开始后才申请"""
+    if not settings.ADMISSION_ENABLED:
+        return
+    try:
+        admission.check_rate(_client_key(http_request))
+        admission.check_capacity()
+    except AdmissionRejected as e:
+        raise _rejection(e)
+
+
+def _queue_timeout() -> float:
+    """排队等待上限，不超过请求剩余的时延预算"""
+    deadline = current_deadline()
+    if deadline is None:
+        return settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    return min(settings.ADMISSION_QUEUE_TIMEOUT_SECONDS, deadline.remaining())
+
+
+def _deadline_budget(request: VerifyRequest, http_request: Request) -> float:
+    """本次请求的时延预算（秒）：请求头与请求体都指定时取较小值，均未指定时使用默认值"""
+    budgets = []
+    if request.deadline_ms:
+        budgets.append(request.deadline_ms / 1000)
+    header = http_request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            if float(header) > 0:
+                budgets.append(float(header) / 1000)
+        except ValueError:
+            print(f"[API] Ignoring invalid {DEADLINE_HEADER}: {header}")
+    budget = min(budgets) if budgets else settings.REQUEST_DEADLINE_SECONDS
+    return min(budget, settings.REQUEST_DEADLINE_MAX_SECONDS)
+
+
+def _priority(default: str, http_request: Request) -> str:
+    """LLM 调用的优先级；客户端可通过 X-Request-Priority 请求头降低（如批量任务用 batch），不能提升"""
+    return lower_priority(default, http_request.headers.get(PRIORITY_HEADER))
+
+
+def _verify_priority(request: VerifyRequest, http_request: Request) -> str:
+    return _priority("background" if request.background else "interactive", http_request)
+
+
+def _degradation(endpoint: str) -> Dict[str, Any]:
+    """时延预算不足时被跳过或超时的阶段"""
+    deadline = current_deadline()
+    if deadline is None or not deadline.degraded:
+        return {"degraded": False, "degraded_stages": []}
+    metrics.incr("pipeline_degraded", endpoint=endpoint)
+    return {"degraded": True, "degraded_stages": list(deadline.degraded_stages)}
+
+
+def _search_pool(content: str) -> Optional[SearchPool]:
+    """
+    本次鉴定共享的搜索池
+
+    开启预测性搜索时在 Parser 分析的同时用原文发起基础搜索；
+    开启查询流式交接时承接 Parser 边生成边预取的搜索。
+    """
+    if settings.SEARCH_SPECULATIVE:
+        return agents.search.speculate(content)
+    if settings.PARSER_STREAM_QUERIES:
+        return SearchPool()
+    return None
+
+
+def _query_handoff(pool: Optional[SearchPool], content: str):
+    """Parser 每生成一条查询就交给 Search Agent 预取"""
+    if pool is None or not settings.PARSER_STREAM_QUERIES:
+        return None
+    return lambda query, analysis: agents.search.prefetch(pool, query, content, analysis)
+
+
+async def _single_claim_stream(parser_result: Dict[str, Any], content: str,
+                               pool: Optional[SearchPool]) -> AsyncGenerator[Dict[str, Any], None]:
+    """单主张流程：搜索完成后鉴定"""
+    search_result = None
+    async for event in agents.search.search_stream(parser_result, content, pool):
+        if event.get("type") == "result":
+            search_result = event.get("data")
+        yield event
+    if search_result:
+        async for event in agents.verdict.verdict_stream(search_result, content):
+            yield event
+
+
+async def _persist_result(content: str, result: Optional[Dict[str, Any]], error: Optional[str] = None) -> Optional[str]:
+    """鉴定结果写入数据库（后台任务、带图片的鉴定），返回任务ID"""
+    try:
+        task_id = await asyncio.to_thread(save_verification_result, content, result, error)
+        print(f"[API] Verification result saved: {task_id}")
+        return task_id
+    except Exception as e:
+        print(f"[API] Failed to save verification result: {e}")
+        return None
+
+
+async def _image_lookup(request: VerifyRequest) -> Tuple[Optional[Tuple[int, int]], Optional[Dict[str, Any]]]:
+    """
+    带图片的请求：计算图片哈希并查找此前鉴定过的相同图片，返回 (哈希, 之前的鉴定结果)
+
+    之前的鉴定结果带有 content_similarity：本次内容与当时鉴定的内容的相似度
+    """
+    if not request.image_url or not image_index.available:
+        return None, None
+    hashes = await image_index.hash_url(request.image_url)
+    if hashes is None:
+        return None, None
+    prior = await image_index.lookup(hashes)
+    if prior:
+        prior["content_similarity"] = round(
+            bigram_similarity(normalize_text(request.content), normalize_text(prior["content"] or "")), 3
+        )
+    return hashes, prior
+
+
+def _reuses_verdict(prior: Optional[Dict[str, Any]]) -> bool:
+    """图片相同且说法也一致时才沿用之前的结论；同一张图配了新说法（旧图新用）时照常鉴定"""
+    return bool(prior) and prior["content_similarity"] >= settings.IMAGE_MATCH_MIN_TEXT_SIMILARITY
+
+
+def _image_match(prior: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "verdict_id": prior["verdict_id"],
+        "distance": prior["distance"],
+        "original_content": prior["content"] or "",
+        "original_conclusion": prior["conclusion"],
+        "content_similarity": prior["content_similarity"],
+        "reused": _reuses_verdict(prior)
+    }
+
+
+def _image_reuse_note(prior: Dict[str, Any]) -> str:
+    """图片相同但说法不同时写入推理链的提示"""
+    conclusion = CONCLUSION_LABELS.get(prior["conclusion"], prior["conclusion"])
+    return (f"图片与此前鉴定过的图片一致（汉明距离 {prior['distance']}），但当时的内容为“{(prior['content'] or '')[:60]}”"
+            f"（结论：{conclusion}），与本次说法不同，可能是旧图新用")
+
+
+def _image_match_result(prior: Dict[str, Any]) -> Dict[str, Any]:
+    """命中已鉴定图片且说法一致时沿用之前的结论"""
+    return {
+        "verdict_id": prior["verdict_id"],
+        "conclusion": prior["conclusion"],
+        "confidence_score": prior["confidence_score"] or 0.0,
+        "summary": prior["summary"] or "",
+        "evidence_list": [],
+        "reasoning_chain": [f"图片与此前鉴定过的图片一致（汉明距离 {prior['distance']}），"
+                            f"内容也与当时一致，沿用当时的结论"]
+                           + list(prior["reasoning_chain"]),
+        "image_match": _image_match(prior)
+    }
+
+
+async def _index_image(request: VerifyRequest, hashes: Tuple[int, int], result: Dict[str, Any]):
+    """鉴定结果入库并登记图片（后台任务的结果已经入库）"""
+    task_id = result.get("verdict_id") if request.background else await _persist_result(request.content, result)
+    if task_id:
+        await image_index.record(hashes, task_id, result.get("conclusion"), request.image_url)
 
 
 @router.post("/verify", response_model=VerifyResponse)
-async def verify_content(request: VerifyRequest):
+async def verify_content(request: VerifyRequest, http_request: Request):
     """
     鉴定舆情内容的真实性（非流式版本）
     
@@ -27,12 +283,56 @@ async def verify_content(request: VerifyRequest):
     1. Parser Agent 解析内容，生成搜索策略
     2. Search Agent 深度搜索和分析证据
     3. Verdict Agent 多维度鉴定结论
+    
+    内容包含多个主张时，各主张并发执行 2-3 步后汇总结论。
+    客户端提前断开时取消流水线（background 任务除外）。
+    截止时间随流水线任务的上下文传递到各 Agent，预算不足时返回降级的部分结果。
+    mode 指定搜索后的信源分析方式（fast / standard / deep），同样随上下文传递。
+    同时运行的流水线已满时排队等待；队列已满、排队超时或客户端请求过快时返回 429。
     """
+    ticket = _admit(http_request)
+    progress = {"stage": "parser" if ticket.admitted else "queued"}
+    metrics.incr("pipeline_started", endpoint="verify")
+    # 任务创建时复制当前上下文，截止时间、优先级和分析模式随之传入流水线及其子任务
+    with deadline_scope(_deadline_budget(request, http_request)), \
+            priority_scope(_verify_priority(request, http_request)), mode_scope(request.mode):
+        pipeline = asyncio.create_task(_run_verify(request, progress, ticket))
+    # 任务开始执行前就被取消时 _run_verify 的 finally 不会运行，由回调归还名额
+    pipeline.add_done_callback(lambda _: ticket.release())
+    watcher = asyncio.create_task(_wait_for_disconnect(http_request))
     try:
+        await asyncio.wait({pipeline, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+    if not pipeline.done():
+        _abandon(pipeline, request.background, "verify", progress["stage"])
+        # 客户端已断开，响应不会被读取
+        return Response(status_code=499)
+    return pipeline.result()
+
+
+async def _run_verify(request: VerifyRequest, progress: Dict[str, str], ticket: Ticket) -> VerifyResponse:
+    """非流式鉴定流水线，准入后开始执行"""
+    try:
+        await ticket.wait(_queue_timeout())
+    except AdmissionRejected as e:
+        metrics.incr("pipeline_failed", endpoint="verify", reason=e.reason)
+        raise _rejection(e)
+    progress["stage"] = "parser"
+    pool = None
+    try:
+        # 图片与此前鉴定过的图片相同、说法也一致时直接返回之前的结论
+        image_hashes, prior = await _image_lookup(request)
+        if _reuses_verdict(prior):
+            metrics.incr("pipeline_completed", endpoint="verify", outcome="image_match")
+            return VerifyResponse(**_image_match_result(prior))
+
+        pool = _search_pool(request.content)
         # Step 1: 解析内容
-        parser_result = await parser_agent.parse(request.content)
+        parser_result = await agents.parser.parse(request.content, _query_handoff(pool, request.content))
         
         if parser_result.get("needs_clarification"):
+            metrics.incr("pipeline_completed", endpoint="verify", outcome="clarification")
             return VerifyResponse(
                 verdict_id="",
                 conclusion="unverifiable",
@@ -42,57 +342,59 @@ async def verify_content(request: VerifyRequest):
                 reasoning_chain=[]
             )
         
-        # Step 2: 深度搜索和分析（传入原始内容）
-        search_result = await search_agent.search(parser_result, request.content)
-        
-        # Step 3: 多维度鉴定结论
-        verdict_result = await verdict_agent.verdict(search_result, request.content)
+        if len(parser_result.get("claims", [])) > 1:
+            # 多主张：各主张并发搜索与鉴定，合并信源并汇总结论
+            progress["stage"] = "claims"
+            search_result, verdict_result = await agents.claims.verify(parser_result, request.content, pool)
+        else:
+            # Step 2: 深度搜索和分析（传入原始内容）
+            progress["stage"] = "search"
+            search_result = await agents.search.search(parser_result, request.content, pool)
+            
+            # Step 3: 多维度鉴定结论
+            progress["stage"] = "verdict"
+            verdict_result = await agents.verdict.verdict(search_result, request.content)
         
         # 构建响应 - 合并关键信源和普通信源
         all_sources = search_result.get("all_sources", [])
         
-        evidence_list = [
-            {
-                "evidence_id": s.get("evidence_id"),
-                "source_url": s.get("source_url"),
-                "source_domain": s.get("source_domain"),
-                "source_credibility": s.get("source_credibility"),
-                "source_category": s.get("source_category"),
-                "publish_time": s.get("publish_time"),
-                "title": s.get("title"),
-                "content_snippet": s.get("content_snippet"),
-                "relevance_score": s.get("relevance_score"),
-                "evidence_type": s.get("evidence_type"),
-                "is_key_source": s.get("is_key_source", False),
-                "key_insight": s.get("key_insight", ""),
-                "importance_note": s.get("importance_note", ""),
-                "source_stance": s.get("source_stance", "neutral"),
-                "potential_bias": s.get("potential_bias", ""),
-                "supports": True
-            }
-            for s in all_sources
-        ]
-        
-        return VerifyResponse(
+        response = VerifyResponse(
             verdict_id=verdict_result.get("verdict_id"),
             conclusion=verdict_result.get("conclusion"),
             confidence_score=verdict_result.get("confidence_score"),
             summary=verdict_result.get("conclusion_summary"),
-            evidence_list=evidence_list,
-            reasoning_chain=verdict_result.get("reasoning_chain", []),
+            evidence_list=all_sources,  # Source 按属性校验为 Evidence
+            reasoning_chain=([_image_reuse_note(prior)] if prior else []) + verdict_result.get("reasoning_chain", []),
             # 扩展字段
             dimensional_analysis=verdict_result.get("dimensional_analysis", {}),
             multi_angle_reasoning=verdict_result.get("multi_angle_reasoning", {}),
             key_sources_cited=verdict_result.get("key_sources_cited", []),
-            search_analysis=search_result.get("analysis", {})
+            search_analysis=search_result.get("analysis", {}),
+            claims=verdict_result.get("claims"),
+            analysis_depth=search_result.get("search_metadata", {}).get("analysis_depth"),
+            image_match=_image_match(prior) if prior else None,
+            **_degradation("verify")
         )
+        metrics.incr("pipeline_completed", endpoint="verify", outcome="verdict")
+        if request.background:
+            await _persist_result(request.content, response.model_dump())
+        if image_hashes:
+            await _index_image(request, image_hashes, response.model_dump())
+        return response
         
     except Exception as e:
+        metrics.incr("pipeline_failed", endpoint="verify", reason="error")
+        if request.background:
+            await _persist_result(request.content, None, str(e))
         raise HTTPException(status_code=500, detail=f"鉴定过程出错: {str(e)}")
+    finally:
+        if pool:
+            pool.close()
+        ticket.release()
 
 
 @router.post("/verify/stream")
-async def verify_content_stream(request: VerifyRequest):
+async def verify_content_stream(request: VerifyRequest, http_request: Request):
     """
     流式鉴定舆情内容，实时返回每个 Agent 的详细推理过程
     
@@ -104,16 +406,75 @@ async def verify_content_stream(request: VerifyRequest):
         "content": "推理内容",
         "data": {}  // 最终结果时包含
     }
+    
+    每个事件带有递增的 SSE id；长时间无事件时发送 ": keep-alive" 心跳注释。
+    客户端断开时立即取消未完成的 Agent 调用；background 为 true 时继续执行并将结果入库。
+    时延预算不足时跳过可选阶段，最终结果的 metadata.degraded 为 true，metadata.degraded_stages 列出被跳过或超时的阶段。
+    metadata.analysis_depth 为实际执行的分析方式：fast / standard / deep，跳过深度分析时为 basic（不因降级而改变）。
+    同时运行的流水线已满时先排队，排队位置变化时发送 {"type": "queued", "position": n}；
+    队列已满或客户端请求过快时直接返回 429，排队超时（或响应开始时队列恰好已满）时发送 error 事件。
     """
-    async def event_generator():
+    _precheck(http_request)
+    budget = _deadline_budget(request, http_request)
+    stream = SSEStream()
+    progress = {"stage": "queued", "finished": False}
+
+    async def event_generator(ticket: Ticket):
         try:
+            async for position in ticket.positions(_queue_timeout()):
+                yield stream.event({
+                    'type': 'queued',
+                    'position': position,
+                    'message': f'排队中，前面还有 {position - 1} 个请求'
+                })
+        except AdmissionRejected as e:
+            metrics.incr("pipeline_failed", endpoint="verify_stream", reason=e.reason)
+            yield stream.event({
+                'type': 'error',
+                'message': REJECTION_MESSAGES.get(e.reason, e.reason),
+                'retry_after': e.retry_after
+            })
+            return
+        progress["stage"] = "parser"
+        pool = None
+        try:
+            # 图片与此前鉴定过的图片相同、说法也一致时直接返回之前的结论
+            image_hashes, prior = await _image_lookup(request)
+            if _reuses_verdict(prior):
+                result = _image_match_result(prior)
+                yield stream.event({
+                    'type': 'reasoning',
+                    'agent': 'parser',
+                    'step': '图片检索',
+                    'content': f"🖼️ {result['reasoning_chain'][0]}"
+                })
+                result["metadata"] = {
+                    "parser_task_id": "",
+                    "search_task_id": "",
+                    "verdict_task_id": prior["verdict_id"],
+                    "total_sources": 0,
+                    "key_sources_count": 0,
+                    "analysis_depth": "image_match"
+                }
+                metrics.incr("pipeline_completed", endpoint="verify_stream", outcome="image_match")
+                yield stream.event({'type': 'complete', 'result': result})
+                return
+            if prior:
+                yield stream.event({
+                    'type': 'reasoning',
+                    'agent': 'parser',
+                    'step': '图片检索',
+                    'content': f"🖼️ {_image_reuse_note(prior)}，继续核查本次说法"
+                })
+
+            pool = _search_pool(request.content)
             # ==================== Step 1: Parser Agent ====================
             parser_result_data = None
-            async for parser_event in parser_agent.parse_stream(request.content):
-                yield f"data: {json.dumps(parser_event, ensure_ascii=False)}\n\n"
+            async for parser_event in agents.parser.parse_stream(request.content, _query_handoff(pool, request.content)):
+                yield stream.event(parser_event)
                 if parser_event.get("type") == "result":
                     parser_result_data = parser_event.get("data")
-                await asyncio.sleep(0.05)
+                await _pace()
             
             # 检查是否需要澄清
             if parser_result_data and parser_result_data.get("needs_clarification"):
@@ -122,69 +483,59 @@ async def verify_content_stream(request: VerifyRequest):
                     'needs_clarification': True,
                     'clarification_prompt': parser_result_data.get('clarification_prompt')
                 }
-                yield f"data: {json.dumps(clarification_response, ensure_ascii=False)}\n\n"
+                metrics.incr("pipeline_completed", endpoint="verify_stream", outcome="clarification")
+                yield stream.event(clarification_response)
                 return
             
             if not parser_result_data:
-                yield f"data: {json.dumps({'type': 'error', 'message': '解析失败'}, ensure_ascii=False)}\n\n"
+                metrics.incr("pipeline_failed", endpoint="verify_stream", reason="parser")
+                yield stream.event({'type': 'error', 'message': '解析失败'})
                 return
             
-            # ==================== Step 2: Search Agent (深度搜索分析) ====================
+            # ==================== Step 2-3: Search Agent + Verdict Agent ====================
+            # 多主张时各主张并发搜索与鉴定，结束时产出合并的 search 结果和汇总的 verdict 结果
             search_result_data = None
-            async for search_event in search_agent.search_stream(parser_result_data, request.content):
-                yield f"data: {json.dumps(search_event, ensure_ascii=False)}\n\n"
-                if search_event.get("type") == "result":
-                    search_result_data = search_event.get("data")
-                await asyncio.sleep(0.05)
+            verdict_result_data = None
+            evidence_fragment = None
+            if len(parser_result_data.get("claims", [])) > 1:
+                progress["stage"] = "claims"
+                pipeline = agents.claims.verify_stream(parser_result_data, request.content, pool)
+            else:
+                progress["stage"] = "search"
+                pipeline = _single_claim_stream(parser_result_data, request.content, pool)
+            async for event in pipeline:
+                if event.get("type") == "result" and event.get("agent") == "search":
+                    search_result_data = event.get("data")
+                    # 信源在多个列表中重复出现，每个信源只编码一次
+                    event = {**event, "data": {
+                        **search_result_data,
+                        "key_sources": stream.fragment_list(search_result_data.get("key_sources", [])),
+                        "regular_sources": stream.fragment_list(search_result_data.get("regular_sources", [])),
+                        "all_sources": stream.fragment_list(search_result_data.get("all_sources", []))
+                    }}
+                    # 证据列表即全部信源，直接复用上面已编码的片段
+                    evidence_fragment = stream.fragment_list(search_result_data.get("all_sources", []))
+                    progress["stage"] = "verdict"
+                elif event.get("type") == "result" and event.get("agent") == "verdict":
+                    verdict_result_data = event.get("data")
+                yield stream.event(event)
+                await _pace()
             
             if not search_result_data:
-                yield f"data: {json.dumps({'type': 'error', 'message': '搜索失败'}, ensure_ascii=False)}\n\n"
+                yield stream.event({'type': 'error', 'message': '搜索失败'})
                 return
             
-            # ==================== Step 3: Verdict Agent (多维度鉴定) ====================
-            verdict_result_data = None
-            async for verdict_event in verdict_agent.verdict_stream(search_result_data, request.content):
-                yield f"data: {json.dumps(verdict_event, ensure_ascii=False)}\n\n"
-                if verdict_event.get("type") == "result":
-                    verdict_result_data = verdict_event.get("data")
-                await asyncio.sleep(0.05)
-            
             # ==================== 最终结果 ====================
             if verdict_result_data:
-                # 构建完整的证据列表
                 all_sources = search_result_data.get("all_sources", [])
                 
-                evidence_list = [
-                    {
-                        "evidence_id": s.get("evidence_id"),
-                        "source_url": s.get("source_url"),
-                        "source_domain": s.get("source_domain"),
-                        "source_credibility": s.get("source_credibility"),
-                        "source_category": s.get("source_category"),
-                        "publish_time": s.get("publish_time"),
-                        "title": s.get("title"),
-                        "content_snippet": s.get("content_snippet"),
-                        "relevance_score": s.get("relevance_score"),
-                        "evidence_type": s.get("evidence_type"),
-                        "is_key_source": s.get("is_key_source", False),
-                        "key_insight": s.get("key_insight", ""),
-                        "importance_note": s.get("importance_note", ""),
-                        "source_stance": s.get("source_stance", "neutral"),
-                        "potential_bias": s.get("potential_bias", ""),
-                        "deep_analysis": s.get("deep_analysis", ""),
-                        "unique_value": s.get("unique_value", ""),
-                        "supports": True
-                    }
-                    for s in all_sources
-                ]
-                
                 # 构建完整的最终结果
                 final_result = {
                     "verdict_id": verdict_result_data.get("verdict_id"),
                     "conclusion": verdict_result_data.get("conclusion"),
                     "confidence_score": verdict_result_data.get("confidence_score"),
                     "summary": verdict_result_data.get("conclusion_summary"),
-                    "evidence_list": evidence_list,
+                    "evidence_list": evidence_fragment,
                     "reasoning_chain": verdict_result_data.get("reasoning_chain", []),
                     
                     # Search Agent 的深度分析结果
@@ -211,6 +562,9 @@ async def verify_content_stream(request: VerifyRequest):
                     # 证据链
                     "evidence_chain": verdict_result_data.get("evidence_chain", []),
                     
+                    # 各主张的结论（多主张时）
+                    "claims": verdict_result_data.get("claims", []),
+                    
                     # 元数据
                     "metadata": {
                         "parser_task_id": parser_result_data.get("task_id"),
@@ -218,20 +572,83 @@ async def verify_content_stream(request: VerifyRequest):
                         "verdict_task_id": verdict_result_data.get("verdict_id"),
                         "total_sources": len(all_sources),
                         "key_sources_count": len(search_result_data.get("key_sources", [])),
-                        "analysis_depth": "deep"
+                        "claims_count": len(parser_result_data.get("claims", [])) or 1,
+                        "analysis_depth": search_result_data.get("search_metadata", {}).get("analysis_depth"),
+                        **_degradation("verify_stream")
                     }
                 }
+                if prior:
+                    final_result["image_match"] = _image_match(prior)
+                    final_result["reasoning_chain"] = [_image_reuse_note(prior)] + final_result["reasoning_chain"]
                 
-                yield f"data: {json.dumps({'type': 'complete', 'result': final_result}, ensure_ascii=False)}\n\n"
+                metrics.incr("pipeline_completed", endpoint="verify_stream", outcome="verdict")
+                if request.background:
+                    await _persist_result(request.content, final_result)
+                if image_hashes:
+                    await _index_image(request, image_hashes, final_result)
+                yield stream.event({'type': 'complete', 'result': final_result})
             else:
-                yield f"data: {json.dumps({'type': 'error', 'message': '鉴定过程未完成'}, ensure_ascii=False)}\n\n"
+                metrics.incr("pipeline_failed", endpoint="verify_stream", reason="incomplete")
+                yield stream.event({'type': 'error', 'message': '鉴定过程未完成'})
             
         except Exception as e:
             print(f"[Stream Error] {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False)}\n\n"
+            metrics.incr("pipeline_failed", endpoint="verify_stream", reason="error")
+            if request.background:
+                await _persist_result(request.content, None, str(e))
+            yield stream.event({'type': 'error', 'message': str(e)})
+        finally:
+            if pool:
+                pool.close()
+    
+    async def response_body():
+        # 流水线在独立任务中运行，响应端在等待期间可以发送心跳
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        # 名额在响应体开始迭代后才申请：响应在此之前被取消时不会占用名额
+        try:
+            ticket = admission.admit()
+        except AdmissionRejected as e:
+            yield stream.event({
+                'type': 'error',
+                'message': REJECTION_MESSAGES.get(e.reason, e.reason),
+                'retry_after': e.retry_after
+            })
+            return
+        if ticket.admitted:
+            progress["stage"] = "parser"
+
+        async def produce():
+            try:
+                async for chunk in event_generator(ticket):
+                    await queue.put(chunk)
+                progress["finished"] = True
+            finally:
+                queue.put_nowait(done)
+
+        async def watch():
+            # 断开后结束响应端；流水线的去留由下面的 finally 决定
+            await _wait_for_disconnect(http_request)
+            queue.put_nowait(done)
+
+        metrics.incr("pipeline_started", endpoint="verify_stream")
+        with deadline_scope(budget), priority_scope(_verify_priority(request, http_request)), \
+                mode_scope(request.mode):
+            producer = asyncio.create_task(produce())
+        # 无论流水线如何结束（包括开始执行前就被取消）都归还名额
+        producer.add_done_callback(lambda _: ticket.release())
+        watcher = asyncio.create_task(watch())
+        try:
+            async for chunk in with_heartbeat(queue, settings.SSE_HEARTBEAT_INTERVAL, done):
+                yield chunk
+        finally:
+            watcher.cancel()
+            if not progress["finished"] and not producer.done():
+                _abandon(producer, request.background, "verify_stream", progress["stage"])
     
     return StreamingResponse(
-        event_generator(),
+        response_body(),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -242,7 +659,7 @@ async def verify_content_stream(request: VerifyRequest):
 
 
 @router.post("/generate-article", response_model=ArticleResponse)
-async def generate_article(request: ArticleRequest):
+async def generate_article(request: ArticleRequest, http_request: Request):
     """
     基于鉴定结果生成新闻稿
     
@@ -250,15 +667,18 @@ async def generate_article(request: ArticleRequest):
     1. 接收鉴定结果和原始内容
     2. Article Agent 分析材料并生成新闻稿
     3. 返回新闻稿内容
+    
+    LLM 调用按 article 优先级排队，让位于在线鉴定。
     """
     try:
         print(f"[ArticleAPI] Generating article for verdict: {request.verify_result.get('conclusion')}")
         
         # 调用 Article Agent 生成新闻稿
-        result = await article_agent.generate_article(
-            verify_result=request.verify_result,
-            original_content=request.original_content
-        )
+        with priority_scope(_priority("article", http_request)):
+            result = await agents.article.generate_article(
+                verify_result=request.verify_result,
+                original_content=request.original_content
+            )
         
         return ArticleResponse(
             article_id=result['article_id'],
@@ -276,3 +696,18 @@ async def generate_article(request: ArticleRequest):
 async def health_check():
     """健康检查接口"""
     return {"status": "ok", "service": "aletheia"}
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """运行指标"""
+    snapshot = metrics.snapshot()
+    snapshot["gauges"]["background_tasks"] = len(_background_tasks)
+    snapshot["gauges"]["pipelines_running"] = admission.running
+    snapshot["gauges"]["pipelines_queued"] = admission.queued
+    snapshot["gauges"]["llm_concurrency_limit"] = llm_scheduler.limit
+    snapshot["breakers"] = breakers.snapshot()
+    snapshot["hedging"] = hedger.snapshot()
+    snapshot["scheduler"] = llm_scheduler.snapshot()
+    snapshot["api_keys"] = key_pool.snapshot()
+    return snapshot
@@ -0,0 +1,61 @@
+"""
+Server-Sent Events 编码
+
+负责为流中的每个事件分配递增的 id、按配置的序列化器编码，
+并在长时间没有事件时发送心跳注释，防止代理断开空闲连接。
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+from app.core.serialization import RawJSON, dumps, dumps_list
+
+
+HEARTBEAT = b": keep-alive\n\n"
+
+
+class SSEStream:
+    """单个 SSE 流的编码状态"""
+
+    def __init__(self):
+        self._last_id = 0
+        # 按对象身份缓存已编码的信源，同一信源在多个列表中只编码一次
+        self._fragments: Dict[int, bytes] = {}
+        self._pinned: List[Any] = []
+
+    def event(self, payload: Dict[str, Any]) -> bytes:
+        """编码一个事件，附带递增的 id"""
+        self._last_id += 1
+        return b"id: %d\ndata: " % self._last_id + dumps(payload) + b"\n\n"
+
+    def encode_once(self, item: Any) -> bytes:
+        key = id(item)
+        data = self._fragments.get(key)
+        if data is None:
+            data = self._fragments[key] = dumps(item)
+            self._pinned.append(item)
+        return data
+
+    def fragment_list(self, items: List[Any]) -> RawJSON:
+        """把一组对象编码为数组片段，复用已编码的元素"""
+        return dumps_list(items, self.encode_once)
+
+
+async def with_heartbeat(queue: "asyncio.Queue[bytes]", interval: float, done: object) -> AsyncIterator[bytes]:
+    """
+    从队列中取出已编码的事件逐个产出，等待超过 interval 秒时产出心跳
+
+    Args:
+        queue: 生产者写入已编码事件的队列
+        interval: 心跳间隔（秒），<= 0 时不发送心跳
+        done: 生产者结束时写入的哨兵对象
+    """
+    timeout = interval if interval and interval > 0 else None
+    while True:
+        try:
+            chunk = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            yield HEARTBEAT
+            continue
+        if chunk is done:
+            return
+        yield chunk
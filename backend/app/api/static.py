@@ -0,0 +1,133 @@
+"""
+生产环境的前端静态文件服务
+
+Next.js 静态导出（frontend/dist）与 API 由同一进程提供，前端通过同源的 /api 访问后端：
+- /_next/static/ 下的文件名带内容哈希，返回一年的 immutable 缓存；HTML 等其余文件每次按 ETag 协商
+- 客户端接受时优先返回构建时预压缩的 .br / .gz 文件
+- /about 这类路径先尝试 about.html，再按目录的 index.html 处理，找不到时返回 404.html
+
+预压缩文件用 python -m app.api.static compress <目录> 生成；brotli 为可选依赖，未安装时只生成 .gz。
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import stat
+from typing import List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+
+# 带内容哈希的构建产物
+IMMUTABLE_PREFIX = "_next/static/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# 按优先级排列
+ENCODINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".txt", ".xml", ".svg", ".map", ".ico", ".webmanifest"}
+# 太小的文件压缩后收益不抵额外的请求头
+MIN_COMPRESS_SIZE = 1024
+
+
+def _accepted_encodings(headers: Headers) -> List[str]:
+    accepted = []
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.append(name.strip().lower())
+    return accepted
+
+
+class FrontendFiles(StaticFiles):
+    """带缓存策略和预压缩文件的静态导出目录"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.html and path not in ("", ".") and not os.path.splitext(path)[1]:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + ".html")
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                return self.file_response(full_path, stat_result, scope)
+        return await super().get_response(path, scope)
+
+    def _precompressed(self, full_path: str, headers: Headers) -> Tuple[Optional[str], str, bool]:
+        """(Content-Encoding, 实际返回的文件, 是否存在预压缩版本)"""
+        accepted = _accepted_encodings(headers)
+        has_variants = False
+        for encoding, suffix in ENCODINGS:
+            if not os.path.isfile(full_path + suffix):
+                continue
+            has_variants = True
+            if encoding in accepted:
+                return encoding, full_path + suffix, True
+        return None, full_path, has_variants
+
+    def file_response(self, full_path: str, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        encoding, path, has_variants = self._precompressed(full_path, request_headers)
+        if encoding:
+            stat_result = os.stat(path)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        response = FileResponse(path, status_code=status_code, stat_result=stat_result, media_type=media_type)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if has_variants:
+            response.headers["Vary"] = "Accept-Encoding"
+        relative = os.path.relpath(full_path, str(self.directory)).replace(os.sep, "/")
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE if relative.startswith(IMMUTABLE_PREFIX) \
+            else REVALIDATE_CACHE
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def compress_directory(directory: str) -> int:
+    """为目录下可压缩的文件生成 .gz（以及安装了 brotli 时的 .br），返回生成的文件数"""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("[Static] brotli not installed, generating .gz only")
+
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                # 压缩后没有变小的不保存
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, "wb") as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="前端静态文件")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compress = subparsers.add_parser("compress", help="生成预压缩的 .br / .gz 文件")
+    compress.add_argument("directory", help="静态导出目录，例如 ../frontend/dist")
+
+    args = parser.parse_args()
+    written = compress_directory(args.directory)
+    print(f"[Static] Wrote {written} precompressed files under {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
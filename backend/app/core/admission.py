@@ -0,0 +1,209 @@
+"""
+鉴定流水线的准入控制
+
+每条鉴定流水线会发起约十次 LLM 调用，同时运行的流水线过多时所有请求一起变慢直至超时。
+- 全局最多 ADMISSION_MAX_CONCURRENT 条流水线同时运行，其余进入有界的等待队列（先到先得）
+- 队列已满时立即以 429 拒绝，并按近期流水线耗时估算 Retry-After
+- 每个客户端一个令牌桶，限制单个客户端的请求速率
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+# 最多保留的客户端令牌桶数，超出时淘汰最久未使用的
+MAX_TRACKED_CLIENTS = 10000
+
+
+class AdmissionRejected(Exception):
+    """请求未被准入"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """令牌桶：每秒补充 rate 个令牌，最多积累 burst 个"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """取一个令牌；成功返回 0，否则返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Ticket:
+    """一次准入申请；admitted 之前在队列中等待"""
+
+    def __init__(self, controller: "AdmissionController", future: Optional[asyncio.Future], tracked: bool = True):
+        self._controller = controller
+        self._future = future
+        # 关闭准入控制时不占用名额
+        self._released = not tracked
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = self.enqueued_at if future is None else None
+
+    @property
+    def admitted(self) -> bool:
+        return self._future is None or (self._future.done() and not self._future.cancelled())
+
+    @property
+    def position(self) -> int:
+        """在队列中的位置（从 1 开始），已准入时为 0"""
+        if self.admitted:
+            return 0
+        return self._controller.position(self._future)
+
+    async def positions(self, timeout: float) -> AsyncIterator[int]:
+        """等待准入，排队位置变化时产出新位置；超时未准入时抛出 AdmissionRejected"""
+        last = None
+        expires_at = self.enqueued_at + timeout
+        while not self.admitted:
+            position = self.position
+            if position != last:
+                last = position
+                yield position
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                self.release()
+                metrics.incr("admission_rejected", reason="queue_timeout")
+                raise AdmissionRejected("queue_timeout", self._controller.retry_after())
+            try:
+                await asyncio.wait_for(asyncio.shield(self._future),
+                                       min(remaining, settings.ADMISSION_POSITION_INTERVAL))
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self.release()
+                raise
+        if self.admitted_at is None:
+            self.admitted_at = time.monotonic()
+            metrics.observe("admission_wait_ms", (self.admitted_at - self.enqueued_at) * 1000)
+
+    async def wait(self, timeout: float):
+        async for _ in self.positions(timeout):
+            pass
+
+    def release(self):
+        """流水线结束（或放弃排队）时归还名额，可重复调用"""
+        if self._released:
+            return
+        self._released = True
+        if self.admitted:
+            started_at = self.admitted_at or self.enqueued_at
+            self._controller.finish(time.monotonic() - started_at)
+        else:
+            self._controller.abandon(self._future)
+
+
+class AdmissionController:
+    """全局并发上限 + 有界等待队列 + 按客户端限流"""
+
+    def __init__(self):
+        self.running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        # 流水线耗时的指数滑动平均，用于估算 Retry-After
+        self._avg_duration = 30.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def check_rate(self, client: str):
+        """按客户端令牌桶限流，超限时抛出 AdmissionRejected"""
+        if settings.ADMISSION_CLIENT_RATE <= 0:
+            return
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(settings.ADMISSION_CLIENT_RATE,
+                                                         settings.ADMISSION_CLIENT_BURST)
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        wait = bucket.take()
+        if wait > 0:
+            metrics.incr("admission_rejected", reason="rate_limited")
+            raise AdmissionRejected("rate_limited", max(1, math.ceil(wait)))
+
+    def check_capacity(self):
+        """不能立即准入且等待队列已满时抛出 AdmissionRejected（不占用名额）"""
+        if (self.running >= settings.ADMISSION_MAX_CONCURRENT or self._waiters) \
+                and len(self._waiters) >= settings.ADMISSION_MAX_QUEUE:
+            metrics.incr("admission_rejected", reason="queue_full")
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+    def enter(self, client: str) -> Ticket:
+        """
+        申请运行一条流水线
+
+        有空闲名额时立即准入；否则进入等待队列，队列已满时抛出 AdmissionRejected。
+        """
+        if not settings.ADMISSION_ENABLED:
+            return Ticket(self, None, tracked=False)
+        self.check_rate(client)
+        return self.admit()
+
+    def admit(self) -> Ticket:
+        """与 enter 相同但不按客户端限流（调用方已用 check_rate 检查过）"""
+        if not settings.ADMISSION_ENABLED:
+            return Ticket(self, None, tracked=False)
+        self.check_capacity()
+        if self.running < settings.ADMISSION_MAX_CONCURRENT and not self._waiters:
+            self.running += 1
+            metrics.incr("admission_admitted", queued="false")
+            return Ticket(self, None)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        metrics.incr("admission_admitted", queued="true")
+        return Ticket(self, future)
+
+    def position(self, future: asyncio.Future) -> int:
+        try:
+            return self._waiters.index(future) + 1
+        except ValueError:
+            return 0
+
+    def abandon(self, future: asyncio.Future):
+        """排队中的请求放弃等待"""
+        try:
+            self._waiters.remove(future)
+        except ValueError:
+            pass
+        future.cancel()
+
+    def finish(self, duration: float):
+        """一条流水线结束，名额交给队首的请求"""
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(True)
+                return
+        self.running = max(0, self.running - 1)
+
+    def retry_after(self) -> int:
+        """按排队长度和平均耗时估算多久后重试"""
+        slots = max(1, settings.ADMISSION_MAX_CONCURRENT)
+        return max(1, math.ceil(self._avg_duration * (len(self._waiters) + 1) / slots))
+
+
+admission = AdmissionController()
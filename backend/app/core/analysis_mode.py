@@ -0,0 +1,38 @@
+"""
+请求级分析模式
+
+VerifyRequest.mode（未指定时为 SEARCH_DEFAULT_MODE）决定 Search Agent 搜索完成后如何分析信源：
+- fast: 信源深度分析与关键发现合并为一次 LLM 调用，不开启联网搜索
+- standard: 深度分析与关键发现分两次调用，不开启联网搜索（只分析已收集到的信源）
+- deep: 两次调用均开启联网搜索，分析时可补充检索；证据充分时也不提前结束搜索、不跳过深度分析
+分析模式与截止时间、优先级一样经 contextvar 传递到各 Agent 及其派生的并发任务。
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from app.core.config import settings
+
+
+ANALYSIS_MODES = ("fast", "standard", "deep")
+
+
+_current: ContextVar[Optional[str]] = ContextVar("analysis_mode", default=None)
+
+
+def current_mode() -> str:
+    """当前请求的分析模式，未设置时使用配置的默认模式"""
+    mode = _current.get() or settings.SEARCH_DEFAULT_MODE
+    return mode if mode in ANALYSIS_MODES else "deep"
+
+
+@contextmanager
+def mode_scope(mode: Optional[str]) -> Iterator[str]:
+    """在当前上下文（及之后创建的子任务）中生效的分析模式，mode 为空时使用默认模式"""
+    if mode is not None and mode not in ANALYSIS_MODES:
+        raise ValueError(f"未知的分析模式: {mode}")
+    token = _current.set(mode)
+    try:
+        yield current_mode()
+    finally:
+        _current.reset(token)
@@ -0,0 +1,170 @@
+"""
+LLM 调用录制 / 回放
+
+record 模式下把每个 Agent 的 提示词 -> 响应 追加写入 gzip 压缩的 JSON Lines 文件
+（写文件在线程中进行，不阻塞事件循环），
+replay 模式下按提示词哈希回放，使流水线运行可复现且不产生 LLM 费用。
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from app.core.config import settings
+
+
+class CassetteMiss(KeyError):
+    """回放模式下找不到对应的录制记录"""
+
+
+class Cassette:
+    """
+    LLM 调用录像带
+
+    Args:
+        path: 录像带文件路径（.jsonl.gz）
+        mode: off | record | replay
+        simulate_latency: 回放时是否按录制时的耗时等待
+        latency_scale: 模拟耗时的缩放系数
+    """
+
+    MODES = ("off", "record", "replay")
+
+    def __init__(self, path: str, mode: str = "off", simulate_latency: bool = False, latency_scale: float = 1.0):
+        # 待写入的行；同一时间只有一个写入者，按录制顺序落盘
+        self._pending: List[str] = []
+        self._writing = False
+        self.configure(path=path, mode=mode, simulate_latency=simulate_latency, latency_scale=latency_scale)
+
+    def configure(self, path: Optional[str] = None, mode: Optional[str] = None,
+                  simulate_latency: Optional[bool] = None, latency_scale: Optional[float] = None):
+        """运行时调整配置，切换文件或模式时重新加载"""
+        if mode is not None and mode not in self.MODES:
+            raise ValueError(f"未知的录像带模式: {mode}")
+        self.path = path if path is not None else self.path
+        self.mode = mode if mode is not None else self.mode
+        if simulate_latency is not None:
+            self.simulate_latency = simulate_latency
+        if latency_scale is not None:
+            self.latency_scale = latency_scale
+        self._entries: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._cursors: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @staticmethod
+    def key(agent: str, prompt: str) -> str:
+        return hashlib.sha256(f"{agent}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._entries is not None:
+            return self._entries
+        entries: Dict[str, List[Dict[str, Any]]] = {}
+        if os.path.exists(self.path):
+            # 文件由多个 gzip 成员顺序追加而成，gzip 模块会连续读取
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    entries.setdefault(entry["key"], []).append(entry)
+        self._entries = entries
+        print(f"[Cassette] Loaded {sum(len(v) for v in entries.values())} entries from {self.path}")
+        return entries
+
+    async def replay(self, agent: str, prompt: str) -> str:
+        """回放一条记录；同一提示词录制了多次时按录制顺序轮流返回"""
+        key = self.key(agent, prompt)
+        candidates = self._load().get(key)
+        if not candidates:
+            self.misses += 1
+            raise CassetteMiss(f"{agent}:{key[:12]}")
+
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        entry = candidates[cursor % len(candidates)]
+        self.hits += 1
+
+        if self.simulate_latency and entry.get("latency_ms"):
+            await asyncio.sleep(entry["latency_ms"] * self.latency_scale / 1000.0)
+        return entry["response"]
+
+    def record(self, agent: str, prompt: str, response: str, latency_ms: float, model: Optional[str] = None):
+        """追加一条记录到内存和写入缓冲，由 flush 写入文件"""
+        entry = {
+            "key": self.key(agent, prompt),
+            "agent": agent,
+            "model": model,
+            "prompt": prompt,
+            "response": response,
+            "latency_ms": round(latency_ms, 1),
+            "recorded_at": time.time(),
+        }
+        self._pending.append(json.dumps(entry, ensure_ascii=False) + "\n")
+        if self._entries is not None:
+            self._entries.setdefault(entry["key"], []).append(entry)
+        self.recorded += 1
+
+    async def flush(self):
+        """在线程中把缓冲的记录写入文件；已有写入者时由它继续写完"""
+        if self._writing:
+            return
+        self._writing = True
+        try:
+            while self._pending:
+                lines, self._pending = self._pending, []
+                await asyncio.to_thread(self._append, self.path, lines)
+        finally:
+            self._writing = False
+
+    @staticmethod
+    def _append(path: str, lines: List[str]):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def call(self, agent: str, prompt: str, request: Callable[[], Awaitable[str]],
+                   model: Optional[str] = None) -> str:
+        """
+        经录像带执行一次 LLM 调用
+
+        replay 模式直接回放（缺失时抛出 CassetteMiss，不会访问真实 LLM）；
+        record 模式执行真实调用并记录成功的响应；off 模式直接调用。
+        """
+        if self.mode == "replay":
+            return await self.replay(agent, prompt)
+
+        started = time.perf_counter()
+        response = await request()
+        if self.mode == "record" and response:
+            self.record(agent, prompt, response, (time.perf_counter() - started) * 1000, model)
+            await self.flush()
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+cassette = Cassette(
+    path=settings.LLM_CASSETTE_PATH,
+    mode=settings.LLM_CASSETTE_MODE,
+    simulate_latency=settings.LLM_CASSETTE_SIMULATE_LATENCY,
+    latency_scale=settings.LLM_CASSETTE_LATENCY_SCALE,
+)
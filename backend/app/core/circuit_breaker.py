@@ -0,0 +1,120 @@
+"""
+LLM 提供商熔断
+
+每个 提供商 + 模型 一个熔断器，按最近一段时间内的失败率（超时、报错以及过慢的调用都算失败）决定是否熔断：
+- closed: 正常放行，失败率超过阈值时打开
+- open: 直接拒绝，调用改走备用提供商；经过冷却时间后进入 half_open
+- half_open: 只放行一个探测调用，成功则恢复 closed，失败则重新打开
+提供商故障期间，调用在毫秒级被拒绝并切换，而不是每次都等到超时。
+"""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """所有可用提供商的熔断器都处于打开状态"""
+
+
+class CircuitBreaker:
+    """单个 提供商 + 模型 的熔断器"""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        # (时间, 是否成功)
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+
+    def allow(self) -> bool:
+        """是否放行本次调用；half_open 状态下同一时间只放行一个探测"""
+        if not settings.LLM_BREAKER_ENABLED or self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < settings.LLM_BREAKER_OPEN_SECONDS:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record(self, ok: bool, latency: float = 0.0):
+        """记录一次调用结果；成功但耗时超过阈值的调用按失败计"""
+        ok = ok and latency < settings.LLM_BREAKER_SLOW_CALL_SECONDS
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if ok:
+                self._outcomes.clear()
+                self._transition(CLOSED)
+            else:
+                self._open()
+            return
+
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > settings.LLM_BREAKER_WINDOW_SECONDS:
+            self._outcomes.popleft()
+        if self.state == CLOSED and self.failure_rate() >= settings.LLM_BREAKER_FAILURE_RATE \
+                and len(self._outcomes) >= settings.LLM_BREAKER_MIN_CALLS:
+            self._open()
+
+    def release(self):
+        """调用既未成功也未失败（被取消或超出请求预算）时归还探测名额"""
+        self._probing = False
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        print(f"[CircuitBreaker] {self.provider}/{self.model}: {self.state} -> {state}")
+        metrics.incr("llm_breaker_transitions", provider=self.provider, to=state)
+        self.state = state
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "calls_in_window": len(self._outcomes)
+        }
+
+
+class BreakerRegistry:
+    """按 提供商 + 模型 管理熔断器"""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        key = (provider, model)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(provider, model)
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {f"{p}/{m}": b.to_dict() for (p, m), b in self._breakers.items()}
+
+    def reset(self):
+        self._breakers.clear()
+
+
+breakers = BreakerRegistry()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +8,15 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
+    
+    # 服务进程
+    PORT: int = 8000
+    # 生产模式（python main.py --production）的 worker 数，0 为可用 CPU 数。
+    # 准入控制、LLM 调度、Key 池、熔断、对冲预算和 /api/metrics 的状态都在进程内，多 worker 时各限额按 worker 计
+    WEB_CONCURRENCY: int = 1
+    SHUTDOWN_GRACE_SECONDS: float = 30.0  # 关闭或重启时等待进行中请求和后台任务的时间
+    SERVE_FRONTEND: bool = True  # 前端静态导出目录存在时由后端同源提供
+    FRONTEND_DIST_DIR: str = "../frontend/dist"  # 相对 backend 目录
     LOG_LEVEL: str = "INFO"
     
     # CORS
@@ -20,15 +29,93 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4"
     ANTHROPIC_API_KEY: Optional[str] = None
     ANTHROPIC_MODEL: str = "claude-3-5-sonnet-20241022"
+    # 额外的 API Key，与主 Key 组成 Key 池；可写成 "key@base_url" 使用不同的端点
+    OPENAI_API_KEYS: List[str] = []
+    ANTHROPIC_API_KEYS: List[str] = []
+    LLM_KEY_COOLDOWN_SECONDS: float = 30.0  # Key 返回 429 / 401 / 403 后的最长冷却时间
+    LLM_WARMUP_ENABLED: bool = True  # 启动后在后台创建 Agent 并预先建立到 LLM 端点的连接
+    LLM_WARMUP_TIMEOUT_SECONDS: float = 5.0
     
     # Verdict Agent 专用配置
     VERDICT_LLM_MODEL: Optional[str] = None
     VERDICT_LLM_TEMPERATURE: float = 0.1
+    VERDICT_FAST_PATH_ENABLED: bool = False  # 证据高度一致时不走多阶段 LLM 分析（默认关闭，开启后结论不再经 LLM 综合判断）
+    VERDICT_FAST_PATH_MARGIN: float = 0.7  # 立场一致度达到该值才直接判定
+    VERDICT_FAST_PATH_MIN_HIGH: int = 2  # 主导立场至少需要的高可信度信源数
+    VERDICT_FAST_PATH_SUMMARY: bool = False  # 快速判定时是否调用 LLM 生成结论摘要
     
     # Article Agent 专用配置
     ARTICLE_LLM_MODEL: Optional[str] = None
     ARTICLE_LLM_TEMPERATURE: float = 0.7
     
+    # 按阶段的模型路由
+    LLM_FAST_MODEL: Optional[str] = None  # 未设置时使用各 Agent 原来的模型
+    LLM_STRONG_MODEL: Optional[str] = None
+    LLM_STAGE_ROUTES: Dict[str, str] = {}  # 阶段 -> "tier[:max_tokens]"
+    LLM_ESCALATION_ENABLED: bool = True
+    LLM_ESCALATION_CONFIDENCE: float = 0.5  # fast 档置信度低于该值时升级
+    
+    # 提供商熔断与切换
+    LLM_FALLBACK_PROVIDER: str = "auto"  # auto（另一个已配置 API Key 的提供商）| openai | claude | none
+    LLM_FALLBACK_MODEL: Optional[str] = None  # 未设置时使用备用提供商的默认模型
+    LLM_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_WINDOW_SECONDS: float = 60.0  # 统计失败率的时间窗口
+    LLM_BREAKER_MIN_CALLS: int = 5  # 窗口内调用数达到该值才会熔断
+    LLM_BREAKER_FAILURE_RATE: float = 0.5  # 失败率达到该值时熔断
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 45.0  # 耗时超过该值的调用按失败计
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0  # 熔断后经过该时间放行一个探测调用
+    
+    # 对冲请求（按阶段开启）
+    LLM_HEDGE_STAGES: List[str] = []  # 例如 ["web_search"]
+    LLM_HEDGE_PERCENTILE: float = 0.95  # 超过该阶段近期耗时的该分位数仍未返回时对冲
+    LLM_HEDGE_BUDGET: float = 0.1  # 对冲请求数占该阶段调用数的上限
+    LLM_HEDGE_WINDOW: int = 200  # 参与分位数计算的近期调用数
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # 样本不足时不对冲
+    
+    # LLM 调用的优先级调度（interactive / article / batch / background）
+    LLM_MAX_CONCURRENT_CALLS: int = 16  # 同时进行的 LLM 调用上限（开启自适应时为初始值），<= 0 不限
+    LLM_PRIORITY_WEIGHTS: Dict[str, float] = {"interactive": 8, "article": 4, "batch": 2, "background": 1}
+    LLM_INTERACTIVE_RESERVED_CALLS: int = 2  # 只留给 interactive 调用的名额
+    LLM_SCHEDULER_MAX_WAIT_SECONDS: float = 20.0  # 排队超过该时间的调用优先放行，避免低优先级饿死
+    LLM_AIMD_ENABLED: bool = True  # 按限流、超时和延迟膨胀自动调整并发上限
+    LLM_AIMD_MIN_CONCURRENCY: int = 2
+    LLM_AIMD_MAX_CONCURRENCY: int = 64
+    LLM_AIMD_DECREASE_FACTOR: float = 0.7  # 遇到 429、过载、超时或延迟膨胀时上限乘以该值
+    LLM_AIMD_LATENCY_FACTOR: float = 2.0  # 耗时超过该阶段平均耗时的倍数时视为延迟膨胀
+    LLM_AIMD_COOLDOWN_SECONDS: float = 5.0  # 两次下调之间的最短间隔
+    
+    # 请求级时延预算（截止时间随请求传递到各 Agent）
+    REQUEST_DEADLINE_SECONDS: float = 0.0  # 请求未指定时的默认预算，<= 0 不限时（默认：只有请求指定时才降级）
+    REQUEST_DEADLINE_MAX_SECONDS: float = 300.0  # 请求可指定的最大预算
+    DEADLINE_MIN_CALL_SECONDS: float = 3.0  # 剩余时间不足该值时不再发起 LLM 调用
+    DEADLINE_OPTIONAL_STAGE_SECONDS: float = 30.0  # 剩余时间不足该值时跳过可选阶段（信源深度分析、多维度分析、证据评估、模型升级）
+    DEADLINE_VERDICT_RESERVE_SECONDS: float = 20.0  # 搜索阶段为后续分析与鉴定预留的时间，不足时停止追加搜索
+    DEADLINE_MIN_TOKENS: int = 500  # 按预算缩减 max_tokens 的下限
+    LLM_TOKENS_PER_SECOND: float = 40.0  # 估算的生成速度，用于按剩余时间缩减 max_tokens
+    
+    # LLM 调用录制/回放
+    LLM_CASSETTE_MODE: str = "off"  # off | record | replay
+    LLM_CASSETTE_PATH: str = "cassettes/llm.jsonl.gz"
+    LLM_CASSETTE_SIMULATE_LATENCY: bool = False
+    LLM_CASSETTE_LATENCY_SCALE: float = 1.0
+    
+    # 流式输出配置
+    JSON_SERIALIZER: str = "auto"  # auto | orjson | msgspec | json
+    SSE_HEARTBEAT_INTERVAL: float = 15.0  # 秒，<= 0 关闭心跳
+    SSE_EVENT_PACING_MS: int = 0  # 事件之间的人为间隔，0 为关闭
+    SEARCH_STREAM_PACING_MS: int = 0  # 每轮搜索之后的人为间隔，0 为关闭
+    DISCONNECT_POLL_INTERVAL: float = 0.5  # 秒，检测客户端断开的轮询间隔
+    
+    # 准入控制（限制同时运行的鉴定流水线数）
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 8  # 同时运行的流水线上限
+    ADMISSION_MAX_QUEUE: int = 32  # 等待队列长度上限，已满时返回 429
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 60.0  # 排队超过该时间仍未准入时返回 429
+    ADMISSION_POSITION_INTERVAL: float = 1.0  # 秒，排队位置的检查间隔
+    ADMISSION_CLIENT_RATE: float = 0.0  # 每个客户端每秒可发起的鉴定数，<= 0 不限（默认关闭：代理之后所有用户共用一个地址）
+    ADMISSION_CLIENT_BURST: float = 5.0  # 每个客户端可突发的鉴定数
+    ADMISSION_TRUST_FORWARDED_FOR: bool = False  # 部署在反向代理之后时按 X-Forwarded-For 识别客户端
+    
     # 搜索配置
     SEARCH_PROVIDER: str = "serpapi"  # serpapi | google | bing
     SERPAPI_KEY: Optional[str] = None
@@ -37,6 +124,57 @@ class Settings(BaseSettings):
     BING_SEARCH_API_KEY: Optional[str] = None
     NEWSAPI_KEY: Optional[str] = None
     
+    # 输入预分类（观点、提问、过短内容直接返回澄清提示，不调用 LLM）
+    PRECLASSIFIER_ENABLED: bool = True
+    PRECLASSIFIER_THRESHOLD: float = 0.85  # 低于该置信度时交给 LLM 判断
+    PRECLASSIFIER_MIN_LENGTH: int = 4
+    PRECLASSIFIER_MODEL_PATH: Optional[str] = None  # 未设置时用内置种子样本训练
+    
+    # 自适应搜索深度
+    SEARCH_ADAPTIVE: bool = False  # 默认关闭：固定执行 SEARCH_MAX_QUERIES 轮搜索和完整分析（与之前一致）
+    SEARCH_SUFFICIENCY_THRESHOLD: float = 0.8  # 充分度达到该值即停止追加搜索
+    SEARCH_MIN_QUERIES: int = 1
+    SEARCH_MAX_QUERIES: int = 4
+    SEARCH_EXPANDED_MAX_QUERIES: int = 6  # 说法存在争议时的搜索轮数上限
+    SEARCH_QUERY_CONCURRENCY: int = 1  # 每批并发的搜索数，越大延迟越低、可节省的调用越少
+    SEARCH_SPECULATIVE: bool = False  # Parser 分析的同时用原文预先搜索
+    SEARCH_SPECULATIVE_SIMILARITY: float = 0.6  # 与预测性查询相似度达到该值的 Parser 查询直接复用其结果
+    PARSER_STREAM_QUERIES: bool = True  # 流式读取 Parser 输出，查询一生成完就开始搜索
+    SEARCH_DEFAULT_MODE: str = "deep"  # 请求未指定 mode 时的分析模式：fast | standard | deep（deep 与引入 mode 之前的行为一致）
+    
+    # 多主张拆分（每个主张并发搜索与鉴定，再汇总为整体结论）
+    CLAIM_DECOMPOSITION_ENABLED: bool = True
+    CLAIM_MAX_COUNT: int = 4
+    CLAIM_DEDUP_SIMILARITY: float = 0.6  # 字符二元组相似度达到该值的主张视为重复
+    
+    # 信源链接可用性检查（深度分析之前）
+    LINK_CHECK_ENABLED: bool = False  # 默认关闭：开启后失效链接的信源按 LINK_CHECK_ACTION 丢弃或降级
+    LINK_CHECK_ACTION: str = "drop"  # drop（丢弃失效链接的信源）| flag（保留但降为低可信度）
+    LINK_CHECK_TIMEOUT_SECONDS: float = 3.0
+    LINK_CHECK_PER_HOST_CONNECTIONS: int = 4
+    LINK_CHECK_MAX_CONNECTIONS: int = 32
+    LINK_CHECK_CACHE_TTL_SECONDS: int = 86400  # 检查结果在数据库中的有效期
+    
+    # 关键信源的原文抓取（搜索结束后，正文摘录交给 Verdict）
+    PAGE_FETCH_ENABLED: bool = False
+    PAGE_FETCH_TOP_N: int = 3  # 抓取排名最靠前的几个关键信源
+    PAGE_FETCH_CONCURRENCY: int = 4
+    PAGE_FETCH_TIMEOUT_SECONDS: float = 5.0
+    PAGE_FETCH_MAX_BYTES: int = 524288  # 每个页面最多读取的字节数
+    PAGE_TEXT_MAX_CHARS: int = 3000  # 每个页面保留的正文字符数
+    PAGE_CACHE_DIR: str = "cache/pages"
+    PAGE_CACHE_TTL_SECONDS: int = 604800
+    PAGE_FETCH_FIXTURE_DIR: Optional[str] = None  # 设置后从本地目录读取页面，不访问网络
+    
+    # 已鉴定图片的感知哈希索引（请求带 image_url 时，相同图片直接沿用之前的结论；需要 Pillow）
+    IMAGE_INDEX_ENABLED: bool = False  # 默认关闭：开启后图片与说法都与之前一致的请求直接沿用之前的结论
+    IMAGE_FETCH_MAX_BYTES: int = 10485760
+    IMAGE_FETCH_TIMEOUT_SECONDS: float = 5.0
+    IMAGE_MATCH_MAX_DISTANCE: int = 6  # pHash 汉明距离不超过该值视为同一张图片
+    IMAGE_MATCH_MAX_DHASH_DISTANCE: int = 10  # 同时要求 dHash 的距离不超过该值
+    IMAGE_MATCH_MIN_TEXT_SIMILARITY: float = 0.6  # 文字内容也与之前一致（字符二元组相似度）才沿用之前的结论
+    IMAGE_INDEX_REFRESH_SECONDS: float = 10.0  # 增量载入其他 worker 登记的图片的间隔
+    
     # Embedding 配置
     EMBEDDING_PROVIDER: str = "openai"
     OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
@@ -0,0 +1,107 @@
+"""
+请求级时延预算
+
+鉴定请求可携带一个截止时间（X-Request-Deadline-Ms 请求头或 VerifyRequest.deadline_ms，
+未指定时为 REQUEST_DEADLINE_SECONDS，默认不限时），经 contextvar 传递到各 Agent 以及它们派生的并发任务。
+LLM 调用按剩余预算缩减 max_tokens 并以剩余时间为超时；各阶段据此跳过可选步骤，
+预算耗尽时返回已有的部分结果，跳过或超时的阶段记录在 degraded_stages 中。
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, List, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """请求的时延预算已耗尽"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"时延预算已耗尽: {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """单个请求的截止时间，以及因预算不足而降级的阶段"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        self.degraded_stages: List[str] = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+    def degrade(self, stage: str, reason: str):
+        """记录一个被跳过或被截断的阶段"""
+        if stage in self.degraded_stages:
+            return
+        self.degraded_stages.append(stage)
+        metrics.incr("deadline_degraded", stage=stage, reason=reason)
+        print(f"[Deadline] {stage} degraded ({reason}), {self.remaining():.1f}s left")
+
+    def cap_tokens(self, max_tokens: int) -> int:
+        """剩余时间内生成不完的 token 没有意义，按生成速度缩减 max_tokens"""
+        affordable = int(self.remaining() * settings.LLM_TOKENS_PER_SECOND)
+        return max(min(max_tokens, settings.DEADLINE_MIN_TOKENS), min(max_tokens, affordable))
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+def has_budget(seconds: float) -> bool:
+    """剩余预算是否还有 seconds 秒（未设截止时间时总是 True）"""
+    deadline = _current.get()
+    return deadline is None or deadline.remaining() >= seconds
+
+
+def skip_stage(stage: str, seconds: float) -> bool:
+    """剩余预算不足 seconds 秒时跳过该阶段并记为降级"""
+    if has_budget(seconds):
+        return False
+    _current.get().degrade(stage, "skipped")
+    return True
+
+
+async def within_deadline(awaitable: Awaitable[T], stage: str) -> T:
+    """以剩余预算为超时等待；剩余时间不足以发起一次调用时直接放弃"""
+    deadline = _current.get()
+    if deadline is None:
+        return await awaitable
+    if deadline.remaining() < settings.DEADLINE_MIN_CALL_SECONDS:
+        # 协程不再执行，关闭以免告警
+        close = getattr(awaitable, "close", None)
+        if close:
+            close()
+        deadline.degrade(stage, "skipped")
+        raise DeadlineExceeded(stage)
+    try:
+        return await asyncio.wait_for(awaitable, deadline.remaining())
+    except asyncio.TimeoutError:
+        deadline.degrade(stage, "timeout")
+        raise DeadlineExceeded(stage)
+
+
+@contextmanager
+def deadline_scope(budget_seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """在当前上下文（及之后创建的子任务）中生效的截止时间，budget_seconds 为空或 <= 0 时不限时"""
+    deadline = Deadline(budget_seconds) if budget_seconds and budget_seconds > 0 else None
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,94 @@
+"""
+LLM 对冲请求
+
+对开启对冲的阶段（LLM_HEDGE_STAGES），调用超过该阶段近期耗时的某个分位数仍未返回时，
+再向备用提供商（未配置时为同一模型）发出一份相同的请求，先返回的结果胜出，另一个立即取消。
+对冲请求数不超过该阶段调用数的 LLM_HEDGE_BUDGET 比例，避免故障时成倍放大负载。
+"""
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class StageHedging:
+    """单个阶段的耗时记录与对冲计数"""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=settings.LLM_HEDGE_WINDOW)
+        self.calls = 0
+        self.hedges = 0
+        self.wins = 0
+
+    def delay(self) -> Optional[float]:
+        """发出对冲请求前的等待时间；样本不足时不对冲"""
+        if len(self.latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, math.ceil(settings.LLM_HEDGE_PERCENTILE * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+
+class Hedger:
+    """各阶段的对冲策略"""
+
+    def __init__(self):
+        self._stages: Dict[str, StageHedging] = {}
+
+    def _stage(self, stage: str) -> StageHedging:
+        state = self._stages.get(stage)
+        if state is None:
+            state = self._stages[stage] = StageHedging()
+        return state
+
+    @staticmethod
+    def enabled_for(stage: str) -> bool:
+        return stage in settings.LLM_HEDGE_STAGES
+
+    def observe(self, stage: str, latency: float):
+        """记录一次成功调用的耗时"""
+        self._stage(stage).latencies.append(latency)
+
+    def start(self, stage: str) -> Optional[float]:
+        """登记一次可对冲的调用，返回对冲前的等待时间"""
+        state = self._stage(stage)
+        state.calls += 1
+        return state.delay()
+
+    def acquire(self, stage: str) -> bool:
+        """对冲预算内时占用一次对冲名额"""
+        state = self._stage(stage)
+        if state.hedges + 1 > settings.LLM_HEDGE_BUDGET * state.calls:
+            metrics.incr("llm_hedges_skipped", stage=stage, reason="budget")
+            return False
+        state.hedges += 1
+        metrics.incr("llm_hedges", stage=stage)
+        return True
+
+    def win(self, stage: str):
+        """对冲请求先于原请求返回"""
+        self._stage(stage).wins += 1
+        metrics.incr("llm_hedge_wins", stage=stage)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for stage, state in self._stages.items():
+            if not state.calls:
+                continue
+            delay = state.delay()
+            result[stage] = {
+                "calls": state.calls,
+                "hedges": state.hedges,
+                "wins": state.wins,
+                "hedge_rate": round(state.hedges / state.calls, 3),
+                "delay_ms": round(delay * 1000) if delay is not None else None
+            }
+        return result
+
+    def reset(self):
+        self._stages.clear()
+
+
+hedger = Hedger()
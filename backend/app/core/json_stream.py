@@ -0,0 +1,116 @@
+"""
+LLM 流式输出的增量 JSON 解析
+
+逐段喂入模型输出的文本，每个顶层字段的值完整后立即解析；指定数组字段中的每个元素
+完整后立即回调，不必等待整个 JSON 结束。第一个 "{" 之前的内容（如 markdown 代码块标记）被忽略。
+"""
+import json
+from typing import Any, Callable, Dict, Optional
+
+
+class JSONStreamExtractor:
+    """
+    增量解析顶层 JSON 对象
+
+    Args:
+        array_key: 需要逐个元素回调的顶层数组字段
+        on_item: on_item(元素, 目前已解析的顶层字段)
+    """
+
+    def __init__(self, array_key: str, on_item: Callable[[Any, Dict[str, Any]], None]):
+        self.array_key = array_key
+        self.on_item = on_item
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start = -1
+        self._key: Optional[str] = None
+        self._value_start = -1
+        self._in_array = False
+        self._item_start = -1
+
+    def feed(self, chunk: str):
+        """喂入一段新输出"""
+        if self.done or not chunk:
+            return
+        self._buffer += chunk
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start >= 0:
+                        self._key = self._loads(buffer[self._key_start:i + 1])
+                        self._key_start = -1
+                        self._expect_key = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+            elif ch in "{[":
+                if self._depth == 0:
+                    if ch == "{":
+                        self._depth = 1
+                        self._expect_key = True
+                    continue
+                self._depth += 1
+                if self._depth == 2 and ch == "[" and self._key == self.array_key:
+                    self._in_array = True
+                    self._item_start = i + 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    continue
+                if self._in_array and self._depth == 2 and ch == "]":
+                    self._emit_item(buffer[self._item_start:i])
+                    self._in_array = False
+                if self._depth == 1 and ch == "}":
+                    self._complete_value(buffer[self._value_start:i])
+                    self.done = True
+                    self._pos = i + 1
+                    return
+                self._depth -= 1
+            elif ch == ",":
+                if self._depth == 1:
+                    self._complete_value(buffer[self._value_start:i])
+                    self._expect_key = True
+                elif self._depth == 2 and self._in_array:
+                    self._emit_item(buffer[self._item_start:i])
+                    self._item_start = i + 1
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start < 0:
+                self._value_start = i + 1
+        self._pos = len(buffer)
+
+    def _complete_value(self, raw: str):
+        if self._key is not None and self._value_start >= 0:
+            value = self._loads(raw)
+            if value is not None:
+                self.fields[self._key] = value
+        self._key = None
+        self._value_start = -1
+
+    def _emit_item(self, raw: str):
+        item = self._loads(raw)
+        if item is not None:
+            self.on_item(item, self.fields)
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        raw = raw.strip()
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return None
@@ -0,0 +1,331 @@
+"""
+LLM API Key 池
+
+单个 Key 的 RPM/TPM 限额会成为整个部署的吞吐上限。每个提供商可以配置多个 Key（及各自的端点）：
+- 主 Key（OPENAI_API_KEY / ANTHROPIC_API_KEY）加上 OPENAI_API_KEYS / ANTHROPIC_API_KEYS 中的额外 Key
+- 每个 Key 的 HTTP 客户端经过统计传输层，记录进行中的请求数、近一分钟的请求数，
+  以及响应头中的剩余请求数 / token 数和重置时间
+- 每次调用选择未在冷却、已用额度比例最低的 Key（其次是进行中请求最少、最久未用的）
+- 返回 429（或 401/403）的 Key 按 Retry-After / 重置时间冷却，期间不再被选中
+Agent 持有的客户端是代理对象，每次访问 chat / messages 时重新选 Key，调用代码无需改动。
+
+openai / anthropic / httpx 在首次创建对应提供商的客户端时才导入，未使用的提供商不占启动时间和内存；
+warm_up() 在启动时为主提供商的每个 Key 预先建立连接。
+"""
+import asyncio
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+# 与 SDK 默认值一致
+MAX_CONNECTIONS = 1000
+MAX_KEEPALIVE_CONNECTIONS = 100
+
+# 未配置端点时各 SDK 使用的默认地址，用于预热连接
+DEFAULT_BASE_URLS = {"openai": "https://api.openai.com/v1", "claude": "https://api.anthropic.com"}
+
+# 响应头中的限额信息：(请求数上限, 剩余请求数, 请求数重置, token 上限, 剩余 token, token 重置)
+RATE_LIMIT_HEADERS = {
+    "openai": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests", "x-ratelimit-reset-requests",
+               "x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+    "claude": ("anthropic-ratelimit-requests-limit", "anthropic-ratelimit-requests-remaining",
+               "anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-limit",
+               "anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset"),
+}
+
+# 未给出重置时间时，响应头中的限额信息视为有效的时长
+HEADER_TTL_SECONDS = 60.0
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """解析重置时间，返回距现在的秒数；支持 "6m0s" / "20ms" 形式的时长、纯秒数和 RFC 3339 时间"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION.findall(value)
+    if parts and "".join(n + u for n, u in parts) == value:
+        return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, reset_at.timestamp() - time.time())
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(float(headers[name]))
+    except (KeyError, ValueError):
+        return None
+
+
+class RateWindow:
+    """响应头报告的一类限额（请求数或 token 数）"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.expires_at = 0.0
+
+    def update(self, limit: Optional[int], remaining: Optional[int], reset: Optional[float], now: float):
+        if remaining is None:
+            return
+        self.limit = limit or self.limit
+        self.remaining = remaining
+        self.expires_at = now + (reset if reset is not None else HEADER_TTL_SECONDS)
+
+    def used_fraction(self, now: float, pending: int = 0) -> Optional[float]:
+        """已用额度比例；没有信息或已过重置时间时返回 None"""
+        if not self.limit or self.remaining is None or now >= self.expires_at:
+            return None
+        return min(1.0, (self.limit - self.remaining + pending) / self.limit)
+
+
+class ApiKey:
+    """池中的一个 Key 及其负载"""
+
+    def __init__(self, provider: str, index: int, api_key: str, base_url: Optional[str]):
+        self.provider = provider
+        self.index = index
+        self.api_key = api_key
+        self.base_url = base_url
+        self.in_flight = 0
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.requests = RateWindow()
+        self.tokens = RateWindow()
+        # 上次收到限额响应头之后发出的请求数
+        self.sent_since_header = 0
+        self._sent: Deque[float] = deque()
+        self._clients: Dict[Optional[float], Any] = {}
+        self._transport = None
+
+    @property
+    def name(self) -> str:
+        host = urlparse(self.base_url).hostname if self.base_url else "default"
+        return f"{self.provider}#{self.index}@{host}"
+
+    @property
+    def transport(self):
+        """该 Key 所有客户端共用的传输层（连接池）"""
+        if self._transport is None:
+            self._transport = _tracking_transport(self)
+        return self._transport
+
+    def client(self, timeout: Optional[float]):
+        """该 Key 的 SDK 客户端，按超时设置缓存"""
+        client = self._clients.get(timeout)
+        if client is None:
+            if self.provider == "claude":
+                from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+                kwargs = {"base_url": self.base_url} if self.base_url else {}
+                if timeout is not None:
+                    kwargs["timeout"] = timeout
+                client = AsyncAnthropic(api_key=self.api_key, http_client=DefaultAsyncHttpxClient(transport=self.transport),
+                                        **kwargs)
+            else:
+                import openai
+                kwargs = {"timeout": timeout} if timeout is not None else {}
+                client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url,
+                                            http_client=openai.DefaultAsyncHttpxClient(transport=self.transport),
+                                            **kwargs)
+            self._clients[timeout] = client
+        return client
+
+    async def warm_up(self):
+        """预先建立到端点的连接（TCP + TLS），不发送 Key"""
+        url = self.base_url or DEFAULT_BASE_URLS[self.provider]
+        await self.transport.open_connection(url)
+
+    def utilization(self, now: float) -> float:
+        fractions = [f for f in (self.requests.used_fraction(now, self.sent_since_header),
+                                 self.tokens.used_fraction(now)) if f is not None]
+        return max(fractions, default=0.0)
+
+    def requests_per_minute(self, now: float) -> int:
+        while self._sent and now - self._sent[0] > 60:
+            self._sent.popleft()
+        return len(self._sent)
+
+    def started(self):
+        now = time.monotonic()
+        self.in_flight += 1
+        self.sent_since_header += 1
+        self._sent.append(now)
+
+    def finished(self, response: Optional[Any]):
+        """请求结束（收到响应头或连接失败）"""
+        self.in_flight = max(0, self.in_flight - 1)
+        if response is None:
+            return
+        now = time.monotonic()
+        headers = response.headers
+        names = RATE_LIMIT_HEADERS[self.provider]
+        if names[1] in headers:
+            self.sent_since_header = 0
+        self.requests.update(_int_header(headers, names[0]), _int_header(headers, names[1]),
+                             parse_reset(headers.get(names[2])), now)
+        self.tokens.update(_int_header(headers, names[3]), _int_header(headers, names[4]),
+                           parse_reset(headers.get(names[5])), now)
+        if response.status_code in (401, 403, 429):
+            self._cool_down(response, now)
+
+    def _cool_down(self, response: Any, now: float):
+        names = RATE_LIMIT_HEADERS[self.provider]
+        wait = parse_reset(response.headers.get("retry-after"))
+        if wait is None and response.status_code == 429:
+            resets = [parse_reset(response.headers.get(names[2])), parse_reset(response.headers.get(names[5]))]
+            wait = max((r for r in resets if r is not None), default=None)
+        wait = settings.LLM_KEY_COOLDOWN_SECONDS if wait is None else min(wait, settings.LLM_KEY_COOLDOWN_SECONDS)
+        self.cooldown_until = max(self.cooldown_until, now + wait)
+        reason = "throttled" if response.status_code == 429 else "unauthorized"
+        metrics.incr("llm_key_cooldowns", provider=self.provider, reason=reason)
+        print(f"[KeyPool] {self.name} returned {response.status_code}, cooling down for {wait:.1f}s")
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "requests_per_minute": self.requests_per_minute(now),
+            "remaining_requests": self.requests.remaining,
+            "remaining_tokens": self.tokens.remaining,
+            "utilization": round(self.utilization(now), 3),
+            "cooldown_seconds": round(max(0.0, self.cooldown_until - now), 1)
+        }
+
+
+def _tracking_transport(key: ApiKey):
+    """统计单个 Key 请求的传输层（httpx 在此时才导入）"""
+    import httpx
+
+    class TrackingTransport(httpx.AsyncBaseTransport):
+        def __init__(self):
+            self._transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+            )
+
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            key.started()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except BaseException:
+                key.finished(None)
+                raise
+            key.finished(response)
+            return response
+
+        async def open_connection(self, url: str):
+            # 直接走底层连接池，不计入该 Key 的请求统计；连接在响应读完后留在池中复用
+            response = await self._transport.handle_async_request(httpx.Request("HEAD", url))
+            await response.aread()
+            await response.aclose()
+
+        async def aclose(self):
+            await self._transport.aclose()
+
+    return TrackingTransport()
+
+
+class PooledClient:
+    """按调用选 Key 的客户端代理：访问 chat / messages 等属性时选出负载最低的 Key，转交给它的客户端"""
+
+    def __init__(self, pool: "KeyPool", provider: str, timeout: Optional[float]):
+        self._pool = pool
+        self._provider = provider
+        self._timeout = timeout
+
+    def __getattr__(self, name: str):
+        return getattr(self._pool.acquire(self._provider).client(self._timeout), name)
+
+
+class KeyPool:
+    """各提供商的 Key 池"""
+
+    def __init__(self):
+        self._keys: Optional[Dict[str, List[ApiKey]]] = None
+
+    @staticmethod
+    def _configured(provider: str) -> List[Tuple[str, Optional[str]]]:
+        """(Key, 端点) 列表；额外的 Key 可写成 "key@base_url" 使用不同的端点"""
+        if provider == "claude":
+            primary, extras, base_url = settings.ANTHROPIC_API_KEY, settings.ANTHROPIC_API_KEYS, None
+        else:
+            primary, extras, base_url = settings.OPENAI_API_KEY, settings.OPENAI_API_KEYS, settings.OPENAI_BASE_URL
+        entries = [(primary, base_url)] if primary else []
+        for entry in extras:
+            api_key, _, url = entry.partition("@")
+            if api_key.strip() and api_key.strip() != primary:
+                entries.append((api_key.strip(), url.strip() or base_url))
+        return entries
+
+    def _load(self) -> Dict[str, List[ApiKey]]:
+        if self._keys is None:
+            self._keys = {
+                provider: [ApiKey(provider, i, api_key, url) for i, (api_key, url) in enumerate(self._configured(provider))]
+                for provider in RATE_LIMIT_HEADERS
+            }
+        return self._keys
+
+    def has_keys(self, provider: str) -> bool:
+        return bool(self._load().get(provider))
+
+    def acquire(self, provider: str) -> ApiKey:
+        """选出本次调用使用的 Key：未冷却的 Key 中已用额度比例最低者；全部冷却时选最快恢复的"""
+        keys = self._load()[provider]
+        now = time.monotonic()
+        healthy = [k for k in keys if k.cooldown_until <= now]
+        if healthy:
+            key = min(healthy, key=lambda k: (round(k.utilization(now), 2), k.in_flight, k.last_used))
+        else:
+            key = min(keys, key=lambda k: k.cooldown_until)
+            metrics.incr("llm_key_exhausted", provider=provider)
+        key.last_used = now
+        return key
+
+    def client(self, provider: str, timeout: Optional[float] = None) -> Optional[PooledClient]:
+        """Agent 使用的客户端；该提供商未配置 Key 时返回 None"""
+        return PooledClient(self, provider, timeout) if self.has_keys(provider) else None
+
+    def prepare(self, providers: List[str]):
+        """导入各提供商的 SDK 并创建其 Key 的客户端"""
+        for provider in providers:
+            for key in self._load().get(provider, []):
+                key.client(None)
+
+    async def warm_up(self, providers: List[str], timeout: float):
+        """为各提供商的每个 Key 预先建立连接；失败只记录日志"""
+        keys = [key for provider in providers for key in self._load().get(provider, [])]
+        if not keys:
+            return
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(asyncio.wait_for(key.warm_up(), timeout) for key in keys), return_exceptions=True
+        )
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                print(f"[KeyPool] Warm-up failed for {key.name}: {type(result).__name__}")
+        warmed = sum(1 for r in results if not isinstance(r, BaseException))
+        print(f"[KeyPool] Warmed {warmed}/{len(keys)} keys in {(time.monotonic() - started) * 1000:.0f}ms")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {key.name: key.to_dict(now) for keys in self._load().values() for key in keys}
+
+    def reset(self):
+        self._keys = None
+
+
+key_pool = KeyPool()
@@ -0,0 +1,66 @@
+"""
+进程内运行指标
+
+轻量的计数器、仪表和耗时统计，通过 /api/metrics 暴露，
+用于观察流水线取消、LLM 调用次数等运行状况。
+"""
+import threading
+from typing import Dict, Any, Tuple
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """线程安全的指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Tuple[int, float, float]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any):
+        """计数器累加"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any):
+        """设置仪表当前值"""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """记录一次观测值（次数、总和、最大值）"""
+        key = _key(name, labels)
+        with self._lock:
+            count, total, peak = self._summaries.get(key, (0, 0.0, 0.0))
+            self._summaries[key] = (count + 1, total + value, max(peak, value))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "summaries": {
+                    key: {"count": count, "sum": round(total, 3), "avg": round(total / count, 3) if count else 0.0, "max": round(peak, 3)}
+                    for key, (count, total, peak) in self._summaries.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
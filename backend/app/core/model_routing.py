@@ -0,0 +1,279 @@
+"""
+按流水线阶段路由模型
+
+每个阶段（搜索前分析、联网搜索、信源分析……新闻稿）配置一个模型档位（fast / strong）
+和 max_tokens。fast 档的响应无法解析为 JSON，或置信度低于阈值时，自动用 strong 档重试一次。
+未配置 LLM_FAST_MODEL / LLM_STRONG_MODEL 时两个档位都使用各 Agent 原来的模型，不会升级。
+请求带有截止时间时，max_tokens 按剩余预算缩减，调用以剩余时间为超时，预算不足时不再升级。
+每次调用经过 提供商 + 模型 的熔断器；主提供商熔断或调用失败时切换到备用提供商（openai <-> claude）。
+开启对冲的阶段在调用迟迟未返回时向备用提供商发出重复请求，取先返回的结果。
+真实请求经优先级调度器占用调用名额，排队时间计入时延预算，但不计入熔断和对冲的耗时统计；
+每次调用的耗时与失败原因反馈给调度器，用于自适应调整并发上限。
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.cassette import cassette
+from app.core.circuit_breaker import CircuitOpenError, breakers
+from app.core.deadline import DeadlineExceeded, current_deadline, has_budget, within_deadline
+from app.core.hedging import hedger
+from app.core.key_pool import key_pool
+from app.core.metrics import metrics
+from app.core.scheduler import llm_scheduler
+
+
+TIERS = ("fast", "strong")
+
+# 各 Agent 都支持的提供商，互为备用
+PROVIDERS = ("openai", "claude")
+
+
+@dataclass(frozen=True)
+class StageRoute:
+    """单个阶段的路由配置"""
+    stage: str
+    tier: str
+    max_tokens: int
+    # 响应中表示置信度的字段，低于阈值时升级
+    confidence_key: Optional[str] = None
+
+
+DEFAULT_ROUTES: Dict[str, StageRoute] = {
+    "query_analysis": StageRoute("query_analysis", "fast", 2000),
+    "web_search": StageRoute("web_search", "fast", 4000),
+    "source_analysis": StageRoute("source_analysis", "fast", 4000),
+    "findings": StageRoute("findings", "fast", 4000),
+    "combined_analysis": StageRoute("combined_analysis", "fast", 6000),
+    "dimensions": StageRoute("dimensions", "fast", 3000),
+    "evidence_evaluation": StageRoute("evidence_evaluation", "fast", 3000),
+    "synthesis": StageRoute("synthesis", "fast", 3000, "confidence_score"),
+    "summary": StageRoute("summary", "fast", 300),
+    "article": StageRoute("article", "strong", 4000),
+}
+
+
+def parse_json_object(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """宽松解析 LLM 返回的 JSON 对象（去除 markdown 代码块，截取首尾花括号），失败返回 None"""
+    if not text or not text.strip():
+        return None
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    elif text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    text = text.strip()
+    try:
+        result = json.loads(text)
+    except json.JSONDecodeError:
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start < 0 or end <= start:
+            return None
+        try:
+            result = json.loads(text[start:end])
+        except json.JSONDecodeError:
+            return None
+    return result if isinstance(result, dict) else None
+
+
+class ModelRouter:
+    """阶段 -> 模型档位 / max_tokens 的路由，以及 fast 档失败时的升级"""
+
+    def __init__(self, routes: Dict[str, StageRoute], overrides: Optional[Dict[str, str]] = None):
+        self.routes = dict(routes)
+        for stage, spec in (overrides or {}).items():
+            self.routes[stage] = self._apply_override(self.routes.get(stage) or StageRoute(stage, "fast", 2000), spec)
+
+    @staticmethod
+    def _apply_override(route: StageRoute, spec: str) -> StageRoute:
+        """覆盖格式: "tier" 或 "tier:max_tokens"，例如 "strong:3000" """
+        tier, _, max_tokens = spec.partition(":")
+        tier = tier.strip() or route.tier
+        if tier not in TIERS:
+            raise ValueError(f"未知的模型档位: {spec}")
+        return replace(route, tier=tier, max_tokens=int(max_tokens) if max_tokens else route.max_tokens)
+
+    def route(self, stage: str) -> StageRoute:
+        return self.routes.get(stage) or StageRoute(stage, "fast", 2000)
+
+    @staticmethod
+    def model_for(tier: str, default_model: str) -> str:
+        if tier == "strong":
+            return settings.LLM_STRONG_MODEL or default_model
+        return settings.LLM_FAST_MODEL or default_model
+
+    def escalation_reason(self, route: StageRoute, text: str) -> Optional[str]:
+        """判断 fast 档响应是否需要升级"""
+        parsed = parse_json_object(text)
+        if parsed is None:
+            return "unparseable"
+        if route.confidence_key:
+            confidence = parsed.get(route.confidence_key)
+            if isinstance(confidence, (int, float)) and confidence < settings.LLM_ESCALATION_CONFIDENCE:
+                return "low_confidence"
+        return None
+
+    @staticmethod
+    def _max_tokens(route: StageRoute) -> int:
+        """按剩余时延预算缩减 max_tokens"""
+        deadline = current_deadline()
+        if deadline is None:
+            return route.max_tokens
+        max_tokens = deadline.cap_tokens(route.max_tokens)
+        if max_tokens < route.max_tokens:
+            metrics.incr("deadline_tokens_reduced", stage=route.stage)
+        return max_tokens
+
+    @staticmethod
+    def fallback_provider() -> Optional[str]:
+        """主提供商不可用时切换的备用提供商，需已配置对应的 API Key"""
+        primary = settings.LLM_PROVIDER
+        choice = settings.LLM_FALLBACK_PROVIDER
+        if choice == "auto":
+            choice = "claude" if primary == "openai" else "openai"
+        if choice == primary or choice not in PROVIDERS:
+            return None
+        return choice if key_pool.has_keys(choice) else None
+
+    @staticmethod
+    def fallback_model(provider: str) -> str:
+        if settings.LLM_FALLBACK_MODEL:
+            return settings.LLM_FALLBACK_MODEL
+        return settings.ANTHROPIC_MODEL if provider == "claude" else settings.OPENAI_MODEL
+
+    async def _attempt(self, key: str, stage: str, prompt: str, request: Callable[[str, int, str], Awaitable[str]],
+                       provider: str, model: str, max_tokens: int) -> str:
+        """经熔断器发起一次调用；熔断中直接拒绝"""
+        breaker = breakers.get(provider, model)
+        if not breaker.allow():
+            metrics.incr("llm_breaker_rejected", provider=provider, stage=stage)
+            raise CircuitOpenError(f"{provider}/{model} 熔断中")
+        started = time.monotonic()
+
+        async def send() -> str:
+            nonlocal started
+            async with llm_scheduler.slot():
+                started = time.monotonic()
+                return await request(model, max_tokens, provider)
+
+        try:
+            text = await cassette.call(key, prompt, lambda: within_deadline(send(), stage), model)
+        except (DeadlineExceeded, asyncio.CancelledError):
+            # 请求预算耗尽或被取消，不能说明提供商有问题
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record(False)
+            llm_scheduler.record(stage, time.monotonic() - started, e)
+            raise
+        latency = time.monotonic() - started
+        breaker.record(True, latency)
+        llm_scheduler.record(stage, latency)
+        hedger.observe(stage, latency)
+        return text
+
+    async def _hedged_attempt(self, key: str, stage: str, prompt: str,
+                              request: Callable[[str, int, str], Awaitable[str]],
+                              provider: str, model: str, max_tokens: int) -> str:
+        """
+        可对冲的调用：超过近期耗时分位数仍未返回时向备用提供商（或同一模型）再发一份，先返回者胜出
+
+        一方失败时等待另一方；两者都失败时抛出原请求的异常。
+        """
+        if not hedger.enabled_for(stage) or cassette.enabled:
+            return await self._attempt(key, stage, prompt, request, provider, model, max_tokens)
+        delay = hedger.start(stage)
+        primary = asyncio.ensure_future(self._attempt(key, stage, prompt, request, provider, model, max_tokens))
+        pending = {primary}
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done or not hedger.acquire(stage):
+                return await primary
+
+            hedge_provider = self.fallback_provider() or provider
+            hedge_model = self.fallback_model(hedge_provider) if hedge_provider != provider else model
+            print(f"[ModelRouter] {stage} slower than {delay:.1f}s, hedging with {hedge_provider}/{hedge_model}")
+            hedge = asyncio.ensure_future(
+                self._attempt(key, stage, prompt, request, hedge_provider, hedge_model, max_tokens)
+            )
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            hedger.win(stage)
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, agent: str, stage: str, prompt: str,
+                   request: Callable[[str, int, str], Awaitable[str]], default_model: str) -> str:
+        """
+        按阶段路由执行一次 LLM 调用（经录像带录制/回放）
+
+        Args:
+            agent: Agent 名称，用作录像带的键前缀
+            stage: 流水线阶段
+            prompt: 提示词
+            request: request(model, max_tokens, provider) 发起真实请求
+            default_model: Agent 原本使用的模型，档位未单独配置时使用
+        """
+        route = self.route(stage)
+        provider = settings.LLM_PROVIDER
+        model = self.model_for(route.tier, default_model)
+        try:
+            text = await self._hedged_attempt(agent, stage, prompt, request, provider, model, self._max_tokens(route))
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            fallback = self.fallback_provider()
+            if fallback is None:
+                raise
+            fallback_model = self.fallback_model(fallback)
+            print(f"[ModelRouter] {provider}/{model} failed for {stage} ({e}), "
+                  f"failing over to {fallback}/{fallback_model}")
+            metrics.incr("llm_failovers", stage=stage, provider=fallback)
+            text = await self._attempt(agent, stage, prompt, request, fallback, fallback_model,
+                                       self._max_tokens(route))
+            metrics.incr("llm_calls", stage=stage, tier=route.tier)
+            # 档位模型属于主提供商，备用提供商的响应不再升级
+            return text
+        metrics.incr("llm_calls", stage=stage, tier=route.tier)
+
+        if route.tier == "strong" or not settings.LLM_ESCALATION_ENABLED:
+            return text
+        strong_model = self.model_for("strong", default_model)
+        if strong_model == model:
+            return text
+        reason = self.escalation_reason(route, text)
+        if not reason:
+            return text
+        if not has_budget(settings.DEADLINE_OPTIONAL_STAGE_SECONDS):
+            # 剩余预算不够再调用一次 strong 档
+            metrics.incr("llm_escalations_skipped", stage=stage, reason="deadline")
+            return text
+
+        print(f"[ModelRouter] Escalating {stage} from {model} to {strong_model}: {reason}")
+        metrics.incr("llm_escalations", stage=stage, reason=reason)
+        try:
+            escalated = await self._attempt(f"{agent}:strong", stage, prompt, request, provider, strong_model,
+                                            self._max_tokens(route))
+            metrics.incr("llm_calls", stage=stage, tier="strong")
+            return escalated
+        except Exception as e:
+            print(f"[ModelRouter] Escalation failed, keeping fast tier response: {e}")
+            return text
+
+
+model_router = ModelRouter(DEFAULT_ROUTES, settings.LLM_STAGE_ROUTES)
@@ -0,0 +1,241 @@
+"""
+LLM 调用的优先级调度
+
+所有 LLM 调用共享同一份提供商配额。调用按请求的优先级分类：
+- interactive: 用户正在等待的鉴定（/api/verify、/api/verify/stream）
+- article: 新闻稿生成
+- batch: 批量任务（客户端通过 X-Request-Priority 请求头自行降级）
+- background: 客户端断开后继续执行的后台鉴定
+同时进行的调用数超过 LLM_MAX_CONCURRENT_CALLS 时排队，各类别按权重加权公平排队（虚拟时间），
+并为 interactive 预留名额；排队超过 LLM_SCHEDULER_MAX_WAIT_SECONDS 的调用优先放行，避免低优先级饿死。
+优先级与截止时间一样经 contextvar 传递到各 Agent 及其派生的并发任务。
+
+并发上限按 AIMD 自适应（LLM_AIMD_ENABLED）：名额用满且调用健康时每轮加一，
+遇到 429、过载、超时或耗时明显高于该阶段平均值时乘以 LLM_AIMD_DECREASE_FACTOR。
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+# 按重要程度排列
+PRIORITY_CLASSES = ("interactive", "article", "batch", "background")
+INTERACTIVE = PRIORITY_CLASSES[0]
+
+# 表示提供商限流或过载的 HTTP 状态码
+THROTTLE_STATUS = {429: "throttled", 503: "overloaded", 529: "overloaded"}
+
+
+_current: ContextVar[str] = ContextVar("priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _current.get()
+
+
+@contextmanager
+def priority_scope(priority: str) -> Iterator[str]:
+    """在当前上下文（及之后创建的子任务）中生效的优先级"""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"未知的优先级: {priority}")
+    token = _current.set(priority)
+    try:
+        yield priority
+    finally:
+        _current.reset(token)
+
+
+def lower_priority(default: str, requested: Optional[str]) -> str:
+    """客户端只能把请求降到更低的优先级，不能提升"""
+    if requested not in PRIORITY_CLASSES:
+        return default
+    return max(default, requested, key=PRIORITY_CLASSES.index)
+
+
+def congestion_reason(error: BaseException) -> Optional[str]:
+    """调用失败是否说明并发过高（限流、过载、超时）；请求本身的错误返回 None"""
+    status = getattr(error, "status_code", None)
+    if status in THROTTLE_STATUS:
+        return THROTTLE_STATUS[status]
+    if isinstance(error, asyncio.TimeoutError) or "Timeout" in type(error).__name__:
+        return "timeout"
+    return None
+
+
+class LLMScheduler:
+    """全局 LLM 调用并发上限 + 按优先级加权公平排队"""
+
+    def __init__(self):
+        self.running: Dict[str, int] = {c: 0 for c in PRIORITY_CLASSES}
+        self._queues: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {c: deque() for c in PRIORITY_CLASSES}
+        # 各类别的虚拟完成时间，每放行一次增加 1 / 权重
+        self._vtime: Dict[str, float] = {c: 0.0 for c in PRIORITY_CLASSES}
+        self._clock = 0.0
+        # AIMD 调整的并发上限，首次使用时按配置初始化
+        self._limit: Optional[float] = None
+        self._last_decrease = 0.0
+        # 各阶段调用耗时的滑动平均，用于判断延迟膨胀
+        self._latency: Dict[str, float] = {}
+
+    @staticmethod
+    def _weight(priority: str) -> float:
+        return max(settings.LLM_PRIORITY_WEIGHTS.get(priority, 1.0), 0.01)
+
+    @property
+    def total_running(self) -> int:
+        return sum(self.running.values())
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def limit(self) -> int:
+        """当前的并发上限"""
+        if not settings.LLM_AIMD_ENABLED:
+            return settings.LLM_MAX_CONCURRENT_CALLS
+        if self._limit is None:
+            self._limit = float(min(max(settings.LLM_MAX_CONCURRENT_CALLS, settings.LLM_AIMD_MIN_CONCURRENCY),
+                                    settings.LLM_AIMD_MAX_CONCURRENCY))
+        return max(1, int(self._limit))
+
+    def _charge(self, priority: str):
+        """放行一次调用：占用名额并推进该类别的虚拟时间"""
+        # 空闲后重新排队的类别从当前虚拟时间开始计，不能靠之前积攒的份额独占
+        start = max(self._vtime[priority], self._clock)
+        self._clock = start
+        self._vtime[priority] = start + 1 / self._weight(priority)
+        self.running[priority] += 1
+
+    def _has_capacity(self, priority: str) -> bool:
+        limit = self.limit
+        if self.total_running >= limit:
+            return False
+        if priority == INTERACTIVE:
+            return True
+        # 非交互调用不能占用为 interactive 预留的名额
+        shared = limit - max(0, min(settings.LLM_INTERACTIVE_RESERVED_CALLS, limit - 1))
+        return self.total_running - self.running[INTERACTIVE] < shared
+
+    def _next(self) -> Optional[str]:
+        """选出下一个放行的类别：先放行等待过久的调用，其余按虚拟时间最小者"""
+        candidates = [c for c in PRIORITY_CLASSES if self._queues[c] and self._has_capacity(c)]
+        if not candidates:
+            return None
+        now = time.monotonic()
+        oldest = min(candidates, key=lambda c: self._queues[c][0][0])
+        if now - self._queues[oldest][0][0] >= settings.LLM_SCHEDULER_MAX_WAIT_SECONDS:
+            metrics.incr("llm_scheduler_promoted", priority=oldest)
+            return oldest
+        return min(candidates, key=lambda c: (max(self._vtime[c], self._clock), PRIORITY_CLASSES.index(c)))
+
+    def _dispatch(self):
+        while True:
+            priority = self._next()
+            if priority is None:
+                return
+            _, future = self._queues[priority].popleft()
+            if future.done():
+                continue
+            self._charge(priority)
+            future.set_result(True)
+
+    async def _acquire(self, priority: str):
+        if self._has_capacity(priority) and not self.queued:
+            self._charge(priority)
+            metrics.observe("llm_queue_wait_ms", 0.0, priority=priority)
+            return
+        enqueued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append((enqueued_at, future))
+        # 预留名额空闲时 interactive 可以越过排在前面的低优先级调用
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 名额已经交给本调用，归还给下一个
+                self._release(priority)
+            else:
+                future.cancel()
+                try:
+                    self._queues[priority].remove((enqueued_at, future))
+                except ValueError:
+                    pass
+            raise
+        metrics.observe("llm_queue_wait_ms", (time.monotonic() - enqueued_at) * 1000, priority=priority)
+
+    def _release(self, priority: str):
+        self.running[priority] = max(0, self.running[priority] - 1)
+        self._dispatch()
+
+    def record(self, stage: str, latency: float, error: Optional[BaseException] = None):
+        """根据一次调用的结果调整并发上限"""
+        if not settings.LLM_AIMD_ENABLED or settings.LLM_MAX_CONCURRENT_CALLS <= 0:
+            return
+        if error is not None:
+            reason = congestion_reason(error)
+            if reason:
+                self._decrease(reason)
+            return
+        average = self._latency.get(stage)
+        self._latency[stage] = latency if average is None else 0.9 * average + 0.1 * latency
+        if average is not None and latency > average * settings.LLM_AIMD_LATENCY_FACTOR:
+            self._decrease("latency")
+        else:
+            self._increase()
+
+    def _increase(self):
+        limit = self.limit
+        # 名额没有用满时提高上限没有意义
+        if self.total_running + 1 < limit and not self.queued:
+            return
+        self._limit = min(float(settings.LLM_AIMD_MAX_CONCURRENCY), self._limit + 1 / self._limit)
+        if self.limit > limit:
+            metrics.set_gauge("llm_concurrency_limit", self.limit)
+            self._dispatch()
+
+    def _decrease(self, reason: str):
+        limit = self.limit
+        now = time.monotonic()
+        # 同一波失败只降一次
+        if now - self._last_decrease < settings.LLM_AIMD_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self._limit = max(float(settings.LLM_AIMD_MIN_CONCURRENCY), self._limit * settings.LLM_AIMD_DECREASE_FACTOR)
+        metrics.incr("llm_concurrency_decreased", reason=reason)
+        metrics.set_gauge("llm_concurrency_limit", self.limit)
+        print(f"[Scheduler] LLM concurrency {limit} -> {self.limit} ({reason})")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[str]:
+        """占用一个 LLM 调用名额（按当前上下文的优先级排队），LLM_MAX_CONCURRENT_CALLS <= 0 时不限"""
+        priority = current_priority()
+        if settings.LLM_MAX_CONCURRENT_CALLS <= 0:
+            yield priority
+            return
+        await self._acquire(priority)
+        try:
+            yield priority
+        finally:
+            self._release(priority)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "running": self.total_running,
+            "queued": self.queued,
+            "classes": {
+                c: {"running": self.running[c], "queued": len(self._queues[c]), "weight": self._weight(c)}
+                for c in PRIORITY_CLASSES
+            }
+        }
+
+
+llm_scheduler = LLMScheduler()
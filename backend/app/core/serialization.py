@@ -0,0 +1,120 @@
+"""
+JSON 序列化
+
+按 JSON_SERIALIZER 配置选择实现：auto 时依次尝试 orjson、msgspec，
+都不可用时退回标准库 json。输出统一为 UTF-8 字节串（不转义中文）。
+带 to_dict 的对象（包括 dataclass）经 to_dict 编码，由它决定对外输出哪些字段。
+msgspec 直接编码 dataclass 的全部字段、不经过 enc_hook，因此顶层对象由 dumps 先行转换；
+信源经 SSEStream.fragment_list 逐个作为顶层对象编码，各后端的输出一致。
+
+用到的 orjson 功能只有 default、OPT_NON_STR_KEYS 和 OPT_PASSTHROUGH_DATACLASS，3.x 的版本都支持；
+RawJSON 片段用占位字符串嵌入，不依赖 3.9 起才有的 orjson.Fragment。
+"""
+import json
+import secrets
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class RawJSON:
+    """已编码好的 JSON 片段，序列化时原样嵌入，避免重复编码"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def _default(obj: Any) -> Any:
+    """标准类型之外的对象转换"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_backend() -> Callable[[Any], bytes]:
+    def dumps(obj: Any, default: Callable[[Any], Any] = _default) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+    return dumps
+
+
+def _orjson_backend() -> Callable[[Any], bytes]:
+    import orjson
+
+    def dumps(obj: Any, default: Callable[[Any], Any] = _default) -> bytes:
+        # dataclass 交给 default（to_dict），不由 orjson 直接编码全部字段
+        return orjson.dumps(obj, default=default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+    return dumps
+
+
+def _msgspec_backend() -> Callable[[Any], bytes]:
+    import msgspec
+
+    encoders: Dict[Any, Any] = {}
+
+    def dumps(obj: Any, default: Callable[[Any], Any] = _default) -> bytes:
+        encoder = encoders.get(default)
+        if encoder is None:
+            encoder = encoders[default] = msgspec.json.Encoder(enc_hook=default)
+        return encoder.encode(obj)
+    return dumps
+
+
+_BACKENDS = {
+    "orjson": _orjson_backend,
+    "msgspec": _msgspec_backend,
+    "json": _json_backend,
+}
+
+
+def _select_backend(name: str):
+    candidates = ["orjson", "msgspec", "json"] if name == "auto" else [name]
+    for candidate in candidates:
+        try:
+            return candidate, _BACKENDS[candidate]()
+        except ImportError:
+            continue
+    return "json", _json_backend()
+
+
+backend_name, _dumps = _select_backend(settings.JSON_SERIALIZER)
+
+
+def dumps(obj: Any) -> bytes:
+    """序列化为 UTF-8 JSON 字节串，RawJSON 片段原样嵌入"""
+    if hasattr(obj, "to_dict"):
+        obj = obj.to_dict()
+    fragments: list = []
+    # 占位字符串带每次调用随机生成的标记，内容中即使出现同样格式的文本也不会被误替换
+    nonce = secrets.token_hex(8)
+
+    def default(value: Any) -> Any:
+        if isinstance(value, RawJSON):
+            # 先以占位字符串编码，再整体替换为片段
+            fragments.append(value.data)
+            return f"\x00raw:{nonce}:{len(fragments) - 1}\x00"
+        return _default(value)
+
+    encoded = _dumps(obj, default)
+    if not fragments:
+        return encoded
+    for index, data in enumerate(fragments):
+        placeholder = b'"\\u0000raw:%s:%d\\u0000"' % (nonce.encode(), index)
+        encoded = encoded.replace(placeholder, data, 1)
+    return encoded
+
+
+def dumps_list(items: list, encode: Optional[Callable[[Any], bytes]] = None) -> RawJSON:
+    """逐项编码后拼接为 JSON 数组片段"""
+    encode = encode or dumps
+    return RawJSON(b"[" + b",".join(encode(item) for item in items) + b"]")
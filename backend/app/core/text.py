@@ -0,0 +1,22 @@
+"""
+文本比较工具
+"""
+import re
+
+
+def normalize_text(text: str) -> str:
+    """去除空白和标点并转为小写，用于比较"""
+    return re.sub(r"[\W_]+", "", text).lower()
+
+
+def bigram_similarity(a: str, b: str) -> float:
+    """
+    两段已规范化文本的字符二元组 Jaccard 相似度
+
+    一方包含另一方时不视为相同：“公司破产”与“公司破产导致数千名员工失业”是两个主张
+    """
+    if not a or not b:
+        return 0.0
+    grams_a = {a[i:i + 2] for i in range(len(a) - 1)} or {a}
+    grams_b = {b[i:i + 2] for i in range(len(b) - 1)} or {b}
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
@@ -0,0 +1,116 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.db.database import SessionLocal
+from app.db.models import VerificationTask, LinkCheck, ImageHash
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def save_verification_result(content: str, result: Optional[Dict[str, Any]], error: Optional[str] = None) -> str:
+    """
+    保存鉴定结果到任务表（同步调用，由调用方放入线程执行）
+
+    Args:
+        content: 原始鉴定内容
+        result: 最终结果，失败时为 None
+        error: 失败原因
+
+    Returns:
+        任务ID
+    """
+    db = SessionLocal()
+    try:
+        task = VerificationTask(
+            content=content,
+            content_hash=content_hash(content),
+            status="completed" if result else "failed",
+            error_message=error,
+            completed_at=datetime.now(timezone.utc)
+        )
+        if result:
+            if result.get("verdict_id"):
+                task.id = result["verdict_id"]
+            task.conclusion = result.get("conclusion")
+            task.confidence_score = result.get("confidence_score")
+            task.summary = result.get("summary")
+            task.reasoning_chain = result.get("reasoning_chain", [])
+        db.add(task)
+        db.commit()
+        return task.id
+    finally:
+        db.close()
+
+
+def load_link_checks(urls: List[str], max_age_seconds: float) -> Dict[str, Tuple[str, Optional[int]]]:
+    """读取未过期的链接检查结果：url -> (status, status_code)（同步调用）"""
+    if not urls:
+        return {}
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    db = SessionLocal()
+    try:
+        rows = db.query(LinkCheck).filter(LinkCheck.url.in_(urls), LinkCheck.checked_at >= cutoff).all()
+        return {row.url: (row.status, row.status_code) for row in rows}
+    finally:
+        db.close()
+
+
+def save_link_checks(results: Dict[str, Tuple[str, Optional[int]]]):
+    """写入或覆盖链接检查结果（同步调用）"""
+    if not results:
+        return
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        for url, (status, status_code) in results.items():
+            db.merge(LinkCheck(url=url, status=status, status_code=status_code, checked_at=now))
+        db.commit()
+    finally:
+        db.close()
+
+
+def load_image_hashes(after_id: int = 0) -> List[Tuple[int, int, int]]:
+    """读取 ID 大于 after_id 的图片哈希：[(id, phash, dhash)]（同步调用）"""
+    db = SessionLocal()
+    try:
+        rows = db.query(ImageHash.id, ImageHash.phash, ImageHash.dhash) \
+            .filter(ImageHash.id > after_id).order_by(ImageHash.id).all()
+        return [tuple(row) for row in rows]
+    finally:
+        db.close()
+
+
+def save_image_hash(phash: int, dhash: int, task_id: str, image_url: str) -> int:
+    """登记已鉴定图片的哈希，返回记录ID（同步调用）"""
+    db = SessionLocal()
+    try:
+        record = ImageHash(phash=phash, dhash=dhash, task_id=task_id, image_url=image_url)
+        db.add(record)
+        db.commit()
+        return record.id
+    finally:
+        db.close()
+
+
+def get_image_verdict(image_id: int) -> Optional[Dict[str, Any]]:
+    """图片记录对应的已完成鉴定结果（同步调用）"""
+    db = SessionLocal()
+    try:
+        task = db.query(VerificationTask).join(ImageHash, ImageHash.task_id == VerificationTask.id) \
+            .filter(ImageHash.id == image_id, VerificationTask.status == "completed").first()
+        if task is None:
+            return None
+        return {
+            "verdict_id": task.id,
+            "conclusion": task.conclusion,
+            "confidence_score": task.confidence_score,
+            "summary": task.summary,
+            "reasoning_chain": task.reasoning_chain or [],
+            "content": task.content,
+            "completed_at": task.completed_at,
+        }
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Text, JSON, Integer
+from sqlalchemy import Column, String, Float, DateTime, Text, JSON, Integer, BigInteger
 from sqlalchemy.sql import func
 from app.db.database import Base
 import uuid
@@ -77,3 +77,25 @@ class AgentLog(Base):
     error_message = Column(Text, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class LinkCheck(Base):
+    """信源链接检查结果缓存表"""
+    __tablename__ = "link_checks"
+
+    url = Column(String(2048), primary_key=True)
+    status = Column(String(20), comment="alive/dead")
+    status_code = Column(Integer, nullable=True, comment="最终的 HTTP 状态码，无法连接时为空")
+    checked_at = Column(DateTime(timezone=True), index=True)
+
+
+class ImageHash(Base):
+    """已鉴定图片的感知哈希表"""
+    __tablename__ = "image_hashes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    phash = Column(BigInteger, nullable=False, comment="pHash（按有符号 64 位存储）")
+    dhash = Column(BigInteger, nullable=False, comment="dHash（按有符号 64 位存储）")
+    task_id = Column(String, index=True, comment="关联的鉴定任务ID")
+    image_url = Column(String(2048))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
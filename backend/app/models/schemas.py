@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Literal, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -35,9 +35,17 @@ class SourceStance(str, Enum):
 class VerifyRequest(BaseModel):
     content: str = Field(..., min_length=1, max_length=5000, description="待鉴定的舆情内容")
     image_url: Optional[str] = Field(None, description="图片URL（可选）")
+    background: bool = Field(False, description="作为后台任务提交：客户端断开后继续执行，结果写入数据库")
+    deadline_ms: Optional[int] = Field(None, gt=0, description="本次鉴定的时延预算（毫秒），未指定时使用服务端默认值")
+    mode: Optional[Literal["fast", "standard", "deep"]] = Field(
+        None, description="分析模式：fast 合并为一次不联网的分析调用，deep 分析时开启联网搜索；未指定时使用服务端默认值"
+    )
 
 
 class Evidence(BaseModel):
+    # 允许直接由 Source 等对象按属性构造
+    model_config = ConfigDict(from_attributes=True)
+
     evidence_id: str
     source_url: str
     source_domain: str
@@ -58,6 +66,7 @@ class Evidence(BaseModel):
     potential_bias: str = Field(default="", description="潜在偏见")
     deep_analysis: str = Field(default="", description="深度分析")
     unique_value: str = Field(default="", description="独特价值")
+    link_status: str = Field(default="", description="链接检查结果：alive/dead/unknown，未检查时为空")
 
 
 class KeySourceCited(BaseModel):
@@ -95,12 +104,31 @@ class SearchAnalysis(BaseModel):
     search_reasoning_chain: List[Dict[str, str]] = Field(default_factory=list, description="搜索推理链")
 
 
+class ClaimResult(BaseModel):
+    """单个主张的鉴定结果"""
+    claim_id: str = Field(..., description="主张编号，对应证据链中的 claim_ref")
+    claim_text: str = Field(..., description="主张内容")
+    conclusion: ConclusionType
+    confidence_score: float = Field(..., ge=0, le=1)
+    summary: str = Field(default="", description="结论摘要")
+
+
 class ReasoningStep(BaseModel):
     step_id: int
     reasoning: str
     basis: List[str]
 
 
+class ImageMatch(BaseModel):
+    """请求中的图片与此前鉴定过的图片相同"""
+    verdict_id: str = Field(..., description="之前的鉴定ID")
+    distance: int = Field(..., description="pHash 汉明距离")
+    original_content: str = Field(default="", description="之前鉴定的内容")
+    original_conclusion: Optional[str] = Field(None, description="之前的鉴定结论")
+    content_similarity: float = Field(default=1.0, description="本次内容与之前鉴定的内容的相似度")
+    reused: bool = Field(default=True, description="是否直接沿用了之前的结论（文字内容不同时照常鉴定）")
+
+
 class VerifyResponse(BaseModel):
     verdict_id: str
     conclusion: ConclusionType
@@ -115,6 +143,11 @@ class VerifyResponse(BaseModel):
     multi_angle_reasoning: Optional[Dict[str, str]] = None
     key_sources_cited: Optional[List[KeySourceCited]] = None
     search_analysis: Optional[SearchAnalysis] = None
+    claims: Optional[List[ClaimResult]] = None  # 内容包含多个主张时各主张的结论
+    analysis_depth: Optional[str] = None  # 实际执行的信源分析方式：fast / standard / deep，跳过深度分析时为 basic
+    degraded: bool = False  # 时延预算不足，部分阶段被跳过或超时
+    degraded_stages: Optional[List[str]] = None
+    image_match: Optional[ImageMatch] = None  # 图片命中已鉴定图片：内容一致时沿用之前的结论，否则作为参考
 
 
 class LoadingStep(BaseModel):
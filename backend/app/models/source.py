@@ -0,0 +1,118 @@
+"""
+信源记录
+
+Search Agent 产出、Verdict Agent 与接口层消费的统一信源结构。
+LLM 返回的原始字典只在 from_llm 中做一次规范化，之后按属性访问。
+"""
+import uuid
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Dict, Any, Optional
+
+from app.models.schemas import Evidence
+
+
+CREDIBILITY_LEVELS = ("high", "medium", "low")
+EVIDENCE_TYPES = ("primary", "secondary", "hearsay")
+STANCES = ("neutral", "supportive", "opposing", "unclear")
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _choice(value: Any, allowed: tuple, default: str) -> str:
+    value = _text(value).strip().lower()
+    return value if value in allowed else default
+
+
+def _score(value: Any, default: float) -> float:
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not score:
+        return default
+    return min(1.0, max(0.0, score))
+
+
+@dataclass(slots=True)
+class Source:
+    """单个信源"""
+    evidence_id: str
+    title: str = ""
+    source_url: str = ""
+    source_domain: str = ""
+    publish_time: Optional[str] = None
+    content_snippet: str = ""
+    source_credibility: str = "medium"
+    credibility_reason: str = ""
+    source_category: str = "news"
+    source_stance: str = "neutral"
+    potential_bias: str = ""
+    relevance_score: float = 0.8
+    evidence_type: str = "primary"
+    key_insight: str = ""
+    importance_note: str = ""
+
+    # 深度分析阶段补充
+    deep_analysis: str = ""
+    reliability_concerns: str = ""
+    unique_value: str = ""
+
+    # 排序阶段补充
+    is_key_source: bool = False
+    importance_score: float = 0.0
+
+    # 证据是否支持待鉴定内容
+    supports: bool = True
+
+    # 链接检查结果：alive / dead / unknown，未检查时为空
+    link_status: str = ""
+
+    # 原文抓取阶段补充的正文摘录
+    page_text: str = ""
+
+    @classmethod
+    def from_llm(cls, raw: Dict[str, Any]) -> "Source":
+        """由 LLM 返回的信源字典构造，缺失或非法的字段取默认值"""
+        publish_time = raw.get("publish_time")
+        return cls(
+            evidence_id=_text(raw.get("evidence_id")) or str(uuid.uuid4()),
+            title=_text(raw.get("title")),
+            source_url=_text(raw.get("source_url")),
+            source_domain=_text(raw.get("source_domain")),
+            publish_time=_text(publish_time) if publish_time else None,
+            content_snippet=_text(raw.get("content_snippet")),
+            source_credibility=_choice(raw.get("source_credibility"), CREDIBILITY_LEVELS, "medium"),
+            credibility_reason=_text(raw.get("credibility_reason")),
+            source_category=_text(raw.get("source_category")) or "news",
+            source_stance=_choice(raw.get("source_stance"), STANCES, "neutral"),
+            potential_bias=_text(raw.get("potential_bias")),
+            relevance_score=_score(raw.get("relevance_score"), 0.8),
+            evidence_type=_choice(raw.get("evidence_type"), EVIDENCE_TYPES, "primary"),
+            key_insight=_text(raw.get("key_insight")),
+            importance_note=_text(raw.get("importance_note")),
+        )
+
+    def completeness(self) -> int:
+        """非空字段数，去重时保留信息更完整的版本"""
+        return sum(map(bool, _field_values(self)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """对外输出的字段（发给客户端、写入结果），不含抓取的页面正文"""
+        return dict(zip(_PUBLIC_FIELD_NAMES, _public_values(self)))
+
+    def to_evidence(self) -> Evidence:
+        """按属性直接校验为响应中的 Evidence，不经过中间字典"""
+        return Evidence.model_validate(self)
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(Source))
+_field_values = attrgetter(*_FIELD_NAMES)
+# page_text 来自服务端抓取的任意网页，只交给 Verdict，不随结果返回
+PRIVATE_FIELDS = ("page_text",)
+_PUBLIC_FIELD_NAMES = tuple(name for name in _FIELD_NAMES if name not in PRIVATE_FIELDS)
+_public_values = attrgetter(*_PUBLIC_FIELD_NAMES)
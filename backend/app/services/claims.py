@@ -0,0 +1,276 @@
+"""
+多主张核查
+
+内容包含多个可独立核实的主张时（如“公司破产”与“数千名员工失业”），
+每个主张各自执行搜索与鉴定，主张之间并发进行，总耗时接近最慢的单个主张。
+各主张共享同一个搜索结果池，相同查询只搜索一次；最后合并信源并汇总为整体结论，
+证据链中的 claim_ref 指向各自的主张。
+"""
+import asyncio
+import uuid
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from app.agents.search import SearchAgent, SearchPool
+from app.agents.verdict import VerdictAgent, CONCLUSION_LABELS
+from app.core.metrics import metrics
+from app.models.source import Source
+
+
+SUPPORTING_CONCLUSIONS = ("true", "partially_true")
+REFUTING_CONCLUSIONS = ("false", "misleading")
+
+
+def combine_conclusions(conclusions: List[str]) -> str:
+    """
+    由各主张的结论得出整体结论
+
+    全部一致时沿用；既有成立的主张又有被否定的主张时为部分真实；
+    只有被否定的主张（其余无法确认）时为误导性；其余情况为存疑。
+    """
+    unique = set(conclusions)
+    if len(unique) == 1:
+        return conclusions[0]
+    supported = bool(unique & set(SUPPORTING_CONCLUSIONS))
+    refuted = bool(unique & set(REFUTING_CONCLUSIONS))
+    if supported and refuted:
+        return "partially_true"
+    if refuted:
+        return "misleading"
+    return "uncertain"
+
+
+def merge_search_results(parser_result: Dict[str, Any], original_content: str,
+                         results: List[Dict[str, Any]], pool: SearchPool) -> Dict[str, Any]:
+    """合并各主张的搜索结果，信源按 URL 去重后重新排序"""
+    merged: Dict[str, Source] = {}
+    for result in results:
+        for source in result.get("all_sources", []):
+            key = source.source_url or source.evidence_id
+            existing = merged.get(key)
+            if existing is None or source.importance_score > existing.importance_score:
+                merged[key] = source
+    ranked = sorted(merged.values(), key=lambda s: -s.importance_score)
+
+    def collect(field: str) -> List[Any]:
+        items: List[Any] = []
+        for result in results:
+            for item in result.get("analysis", {}).get(field, []):
+                if item not in items:
+                    items.append(item)
+        return items
+
+    metadata = [result.get("search_metadata", {}) for result in results]
+    depths = {m.get("analysis_depth") for m in metadata}
+    return {
+        "search_id": str(uuid.uuid4()),
+        "parser_task_ref": parser_result.get("task_id"),
+        "original_query": original_content,
+        "query_analysis": parser_result.get("analysis", {}),
+        "key_sources": [s for s in ranked if s.is_key_source][:8],
+        "regular_sources": [s for s in ranked if not s.is_key_source][:12],
+        "all_sources": ranked[:20],
+        "analysis": {
+            "search_reasoning_chain": collect("search_reasoning_chain"),
+            "key_findings": collect("key_findings"),
+            "conflict_points": collect("conflict_points"),
+            "evidence_gaps": collect("evidence_gaps"),
+            "analysis_reasoning": "\n".join(
+                r.get("analysis", {}).get("analysis_reasoning", "") for r in results
+            ).strip(),
+            "perspectives": results[0].get("analysis", {}).get("perspectives", {}) if results else {}
+        },
+        "search_metadata": {
+            "claims_count": len(results),
+            "total_queries": sum(m.get("total_queries", 0) for m in metadata),
+            "executed_queries": sum(m.get("executed_queries", 0) for m in metadata),
+            "shared_queries": pool.shared,
+            "sources_found": sum(m.get("sources_found", 0) for m in metadata),
+            "sources_after_dedup": len(ranked),
+            "key_sources_count": sum(1 for s in ranked if s.is_key_source),
+            "llm_calls": sum(m.get("llm_calls", 0) for m in metadata) - pool.shared,
+            # 各主张的分析方式不一致时（部分主张跳过了深度分析）记为 mixed
+            "analysis_depth": depths.pop() if len(depths) == 1 else "mixed" if depths else None,
+            "search_duration_ms": max((m.get("search_duration_ms", 0) for m in metadata), default=0)
+        }
+    }
+
+
+def aggregate_verdicts(claims: List[Dict[str, Any]],
+                       outcomes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+    """汇总各主张的鉴定结果为整体结论；核查失败的主张记为无法核实"""
+    claim_results = []
+    verdicts = []
+    for claim in claims:
+        search_result, verdict = outcomes.get(claim["claim_id"], (None, None))
+        verdict = verdict or {}
+        verdicts.append((claim, verdict))
+        claim_results.append({
+            "claim_id": claim["claim_id"],
+            "claim_text": claim["claim_text"],
+            "conclusion": verdict.get("conclusion", "unverifiable"),
+            "confidence_score": verdict.get("confidence_score", 0.0),
+            "summary": verdict.get("conclusion_summary", "该主张核查失败"),
+            "search_task_id": (search_result or {}).get("search_id"),
+            "verdict_task_id": verdict.get("verdict_id"),
+            "sources_count": len((search_result or {}).get("all_sources", []))
+        })
+
+    conclusion = combine_conclusions([c["conclusion"] for c in claim_results])
+    confidence = sum(c["confidence_score"] for c in claim_results) / len(claim_results)
+    summary = f"内容包含 {len(claim_results)} 个主张，整体{CONCLUSION_LABELS.get(conclusion, conclusion)}：" + "；".join(
+        f"“{c['claim_text']}”{CONCLUSION_LABELS.get(c['conclusion'], c['conclusion'])}" for c in claim_results
+    ) + "。"
+
+    primary = verdicts[0][1]
+    findings: Dict[str, List[Any]] = {}
+    key_sources_cited: List[Dict[str, Any]] = []
+    for claim, verdict in verdicts:
+        for field, items in verdict.get("findings", {}).items():
+            findings.setdefault(field, []).extend(items)
+        for cited in verdict.get("key_sources_cited", []):
+            if all(cited.get("evidence_id") != c.get("evidence_id") for c in key_sources_cited):
+                key_sources_cited.append(cited)
+
+    return {
+        "verdict_id": str(uuid.uuid4()),
+        "conclusion": conclusion,
+        "confidence_score": round(confidence, 3),
+        "conclusion_summary": summary,
+        "claims": claim_results,
+        "dimensional_analysis": primary.get("dimensional_analysis", {}),
+        "reasoning_chain": [
+            f"[{claim['claim_id']}] {step}" for claim, verdict in verdicts
+            for step in verdict.get("reasoning_chain", [])
+        ],
+        "multi_angle_reasoning": primary.get("multi_angle_reasoning", {}),
+        "evidence_evaluation": primary.get("evidence_evaluation", {}),
+        "evidence_chain": [item for _, verdict in verdicts for item in verdict.get("evidence_chain", [])],
+        "findings": findings,
+        "key_sources_cited": key_sources_cited[:5],
+        "traceability_log": {
+            "agent_version": "2.0",
+            "processing_steps": ["claim_decomposition", "per_claim_verdict", "claim_aggregation"],
+            "decision_points": [
+                {"step": "claim_aggregation", "claim_id": c["claim_id"], "decision": c["conclusion"]}
+                for c in claim_results
+            ],
+            "confidence_breakdown": {c["claim_id"]: c["confidence_score"] for c in claim_results}
+        }
+    }
+
+
+class ClaimVerifier:
+    """并发核查多个主张并汇总结论"""
+
+    def __init__(self, search_agent: SearchAgent, verdict_agent: VerdictAgent):
+        self.search_agent = search_agent
+        self.verdict_agent = verdict_agent
+
+    async def verify(self, parser_result: Dict[str, Any], original_content: str,
+                     pool: Optional[SearchPool] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """返回 (合并后的搜索结果, 汇总后的鉴定结果)"""
+        results: Dict[str, Dict[str, Any]] = {}
+        async for event in self.verify_stream(parser_result, original_content, pool):
+            if event.get("type") == "result":
+                results[event["agent"]] = event["data"]
+        return results["search"], results["verdict"]
+
+    async def verify_stream(self, parser_result: Dict[str, Any], original_content: str,
+                            pool: Optional[SearchPool] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        流式核查，各主张的推理事件按到达顺序交错输出（step 带主张编号前缀）
+
+        结束时依次产出合并后的 search 结果和汇总后的 verdict 结果，结构与单主张流程一致。
+        pool 为已发起预测性搜索的搜索池，未提供时新建。
+        """
+        claims = parser_result.get("claims", [])
+        pool = pool or SearchPool()
+        queue: asyncio.Queue = asyncio.Queue()
+        outcomes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+
+        metrics.incr("claim_pipelines")
+        metrics.observe("claims_per_request", len(claims))
+        print(f"[ClaimVerifier] Verifying {len(claims)} claims concurrently")
+
+        tasks = [
+            asyncio.create_task(self._run_claim(parser_result, claim, pool, queue, outcomes))
+            for claim in claims
+        ]
+        running = len(tasks)
+        try:
+            while running:
+                event = await queue.get()
+                if event is None:
+                    running -= 1
+                    continue
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+            pool.close()
+
+        if not any(verdict for _, verdict in outcomes.values()):
+            raise RuntimeError("所有主张的核查均未完成")
+
+        search_results = [outcomes[c["claim_id"]][0] for c in claims if outcomes.get(c["claim_id"], (None,))[0]]
+        merged_search = merge_search_results(parser_result, original_content, search_results, pool)
+        aggregated = aggregate_verdicts(claims, outcomes)
+        aggregated["search_task_ref"] = merged_search["search_id"]
+
+        yield {"type": "result", "agent": "search", "data": merged_search}
+        yield {
+            "type": "reasoning",
+            "agent": "verdict",
+            "step": "汇总结论",
+            "content": f"🧩 多主张汇总:\n" +
+                       "\n".join([
+                           f"   {c['claim_id']}. {c['claim_text']} → "
+                           f"{CONCLUSION_LABELS.get(c['conclusion'], c['conclusion'])} ({c['confidence_score']:.0%})"
+                           for c in aggregated["claims"]
+                       ]) +
+                       f"\n\n   整体结论: {CONCLUSION_LABELS.get(aggregated['conclusion'], aggregated['conclusion'])}"
+        }
+        yield {"type": "result", "agent": "verdict", "data": aggregated}
+
+    async def _run_claim(self, parser_result: Dict[str, Any], claim: Dict[str, Any], pool: SearchPool,
+                         queue: asyncio.Queue, outcomes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]):
+        """单个主张的搜索 + 鉴定，推理事件写入队列，结束时写入 None"""
+        claim_id = claim["claim_id"]
+        claim_text = claim["claim_text"]
+        claim_parser_result = {
+            **parser_result,
+            "original_query": claim_text,
+            "analysis": {**parser_result.get("analysis", {}), "core_question": claim_text},
+            "search_queries": claim["search_queries"]
+        }
+        search_result = None
+        verdict_result = None
+        try:
+            async for event in self.search_agent.search_stream(claim_parser_result, claim_text, pool):
+                if event.get("type") == "result":
+                    search_result = event["data"]
+                else:
+                    await queue.put(self._tag(event, claim_id))
+            if search_result:
+                async for event in self.verdict_agent.verdict_stream(search_result, claim_text, claim_id):
+                    if event.get("type") == "result":
+                        verdict_result = event["data"]
+                    else:
+                        await queue.put(self._tag(event, claim_id))
+        except Exception as e:
+            print(f"[ClaimVerifier] Claim {claim_id} failed: {e}")
+            metrics.incr("claim_failed")
+            await queue.put({
+                "type": "reasoning",
+                "agent": "verdict",
+                "step": f"[{claim_id}] 核查失败",
+                "claim_id": claim_id,
+                "content": f"⚠️ 主张“{claim_text}”核查失败，按无法核实处理"
+            })
+        finally:
+            outcomes[claim_id] = (search_result, verdict_result)
+            queue.put_nowait(None)
+
+    @staticmethod
+    def _tag(event: Dict[str, Any], claim_id: str) -> Dict[str, Any]:
+        return {**event, "step": f"[{claim_id}] {event.get('step', '')}", "claim_id": claim_id}
@@ -0,0 +1,220 @@
+"""
+信源链接可用性检查
+
+联网搜索返回的 source_url 由 LLM 生成，可能是编造的或已失效的。在深度分析之前并发检查
+全部候选链接：先发 HEAD，服务器拒绝 HEAD 时改用只取首字节的 Range GET。
+
+- 每个主机同时打开的连接数有上限，单次请求超时很短
+- 检查结果写入数据库，在 TTL 内直接复用；同一链接的并发检查只请求一次
+- 只访问解析到公网地址的链接，每一跳重定向都重新检查（见 app.services.net）
+- 404/410、指向内网或不是 http(s) 的链接为 dead；无法连接、域名解析失败、超时、被反爬拦截等
+  无法确定的为 unknown，不缓存（无外网或网络抖动时不会因此丢弃信源）
+"""
+import asyncio
+import socket
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.crud import load_link_checks, save_link_checks
+from app.models.source import Source
+from app.services.net import UnsafeAddress, public_stream
+
+
+ALIVE = "alive"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+# 明确表示页面不存在的状态码
+DEAD_STATUS_CODES = {404, 410}
+# 416 说明资源存在，只是不支持请求的字节范围
+ALIVE_STATUS_CODES = {416}
+
+USER_AGENT = "Mozilla/5.0 (compatible; AletheiaLinkCheck/1.0)"
+MAX_REDIRECTS = 5
+# 进程内缓存的链接数
+MEMORY_CACHE_SIZE = 10000
+
+
+def _classify(status_code: int) -> str:
+    if status_code < 400 or status_code in ALIVE_STATUS_CODES:
+        return ALIVE
+    if status_code in DEAD_STATUS_CODES:
+        return DEAD
+    return UNKNOWN
+
+
+class LinkChecker:
+    """
+    并发的链接检查器
+
+    httpx 客户端和按主机的信号量与事件循环绑定，在首次检查时（或事件循环变化后）创建。
+    """
+
+    def __init__(self):
+        self._client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # url -> (status, status_code, 过期时间)
+        self._cache: "OrderedDict[str, Tuple[str, Optional[int], float]]" = OrderedDict()
+        self.transport: Any = None
+        self.persist = True
+
+    def configure(self, transport: Any = None, persist: Optional[bool] = None):
+        """替换底层传输（基准测试用模拟传输）、切换是否读写数据库，并清空缓存"""
+        self.transport = transport
+        if persist is not None:
+            self.persist = persist
+        self._client = None
+        self._loop = None
+        self._cache.clear()
+
+    def _ensure_client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return self._client
+        import httpx
+
+        # 只判断链接是否存在、不读取内容，不校验证书（部分站点的证书链不完整）；
+        # 重定向由 public_stream 逐跳检查目标地址后再跟随
+        self._client = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=httpx.Timeout(settings.LINK_CHECK_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=settings.LINK_CHECK_MAX_CONNECTIONS,
+                                max_keepalive_connections=settings.LINK_CHECK_MAX_CONNECTIONS),
+            follow_redirects=False,
+            verify=False,
+            headers={"User-Agent": USER_AGENT},
+        )
+        self._loop = loop
+        self._hosts = {}
+        self._inflight = {}
+        return self._client
+
+    def _cached(self, url: str) -> Optional[Tuple[str, Optional[int]]]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        if entry[2] < time.monotonic():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return entry[0], entry[1]
+
+    def _remember(self, url: str, status: str, status_code: Optional[int]):
+        self._cache[url] = (status, status_code, time.monotonic() + settings.LINK_CHECK_CACHE_TTL_SECONDS)
+        self._cache.move_to_end(url)
+        while len(self._cache) > MEMORY_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _status_code(self, client: Any, url: str) -> int:
+        # 模拟传输（基准测试）不访问网络，不需要解析地址
+        resolve = self.transport is None
+        async with public_stream(client, "HEAD", url, MAX_REDIRECTS, resolve=resolve) as (_, response):
+            status_code = response.status_code
+        if status_code >= 400:
+            # 不少服务器对 HEAD 返回 403 / 405 等，改用只取首字节的 GET 再确认
+            async with public_stream(client, "GET", url, MAX_REDIRECTS, headers={"Range": "bytes=0-0"},
+                                     resolve=resolve) as (_, response):
+                status_code = response.status_code
+        return status_code
+
+    async def _request(self, url: str) -> Tuple[str, Optional[int]]:
+        """(status, status_code)"""
+        import httpx
+
+        client = self._ensure_client()
+        host = urlsplit(url).hostname or ""
+        semaphore = self._hosts.get(host)
+        if semaphore is None:
+            semaphore = self._hosts[host] = asyncio.Semaphore(max(1, settings.LINK_CHECK_PER_HOST_CONNECTIONS))
+        async with semaphore:
+            try:
+                # 单次请求的超时之外再限制 HEAD + GET 的总耗时（含重定向）
+                status_code = await asyncio.wait_for(self._status_code(client, url),
+                                                     settings.LINK_CHECK_TIMEOUT_SECONDS * 2)
+                return _classify(status_code), status_code
+            except (UnsafeAddress, httpx.UnsupportedProtocol, httpx.InvalidURL) as e:
+                print(f"[LinkChecker] {url}: {e}")
+                return DEAD, None
+            except (httpx.HTTPError, socket.gaierror, ValueError, asyncio.TimeoutError) as e:
+                # 连接失败、域名解析失败也可能是本机网络的问题，不能据此判定链接失效
+                print(f"[LinkChecker] {url}: {type(e).__name__}")
+                return UNKNOWN, None
+
+    async def _check_one(self, url: str) -> Tuple[str, Optional[int]]:
+        # 同一链接的并发检查共用一次请求
+        future = self._inflight.get(url)
+        if future is None:
+            future = self._inflight[url] = asyncio.ensure_future(self._request(url))
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(future)
+
+    async def check(self, urls: List[str]) -> Dict[str, str]:
+        """并发检查一批链接，返回 url -> alive / dead / unknown"""
+        results: Dict[str, str] = {}
+        pending = []
+        hits = 0
+        for url in dict.fromkeys(urls):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                results[url] = DEAD
+                continue
+            cached = self._cached(url)
+            if cached is not None:
+                results[url] = cached[0]
+                hits += 1
+            else:
+                pending.append(url)
+
+        if pending and self.persist:
+            stored = await asyncio.to_thread(load_link_checks, pending, settings.LINK_CHECK_CACHE_TTL_SECONDS)
+            for url, (status, status_code) in stored.items():
+                self._remember(url, status, status_code)
+                results[url] = status
+            hits += len(stored)
+            pending = [url for url in pending if url not in stored]
+        metrics.incr("link_check_cache_hits", hits)
+        if not pending:
+            return results
+
+        started = time.monotonic()
+        self._ensure_client()
+        checked = await asyncio.gather(*[self._check_one(url) for url in pending])
+        metrics.observe("link_check_batch_seconds", time.monotonic() - started)
+
+        fresh: Dict[str, Tuple[str, Optional[int]]] = {}
+        for url, (status, status_code) in zip(pending, checked):
+            results[url] = status
+            metrics.incr("link_checks", status=status)
+            if status != UNKNOWN:
+                self._remember(url, status, status_code)
+                fresh[url] = (status, status_code)
+        if fresh and self.persist:
+            await asyncio.to_thread(save_link_checks, fresh)
+        return results
+
+    async def annotate(self, sources: List[Source]) -> int:
+        """为信源填写 link_status，返回失效的链接数"""
+        urls = [s.source_url for s in sources if s.source_url]
+        if not urls:
+            return 0
+        statuses = await self.check(urls)
+        dead = 0
+        for source in sources:
+            if source.source_url:
+                source.link_status = statuses[source.source_url]
+                dead += source.link_status == DEAD
+        return dead
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+link_checker = LinkChecker()
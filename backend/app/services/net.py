@@ -0,0 +1,81 @@
+"""
+出站请求的地址防护
+
+信源链接、信源页面和图片地址来自 LLM 或用户，服务端直接访问时可能被引向云元数据接口
+或内网服务（SSRF）。这里的请求只访问解析到公网地址的 http(s) 链接：
+
+- 解析域名并要求全部地址都是公网地址，然后直接连接校验过的 IP，
+  避免 httpx 再次解析域名时被 DNS 重绑定指向内网；Host 请求头与 TLS 的 SNI 仍使用原主机名
+- 不让 httpx 自动跟随重定向，每一跳都重新校验
+"""
+import asyncio
+import ipaddress
+import socket
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class UnsafeAddress(ValueError):
+    """地址不是 http(s) 链接或指向内网"""
+
+
+class TooManyRedirects(ValueError):
+    """重定向次数超过上限"""
+
+
+def resolve_public(url: str) -> str:
+    """
+    解析 URL 的主机名，只允许全部解析到公网地址的 http(s) 链接（同步调用）
+
+    返回校验过的 IP 地址；域名无法解析时抛出 socket.gaierror。
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise UnsafeAddress(f"不支持的地址: {url}")
+    port = parts.port or DEFAULT_PORTS[parts.scheme]
+    addresses = [ipaddress.ip_address(info[4][0])
+                 for info in socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)]
+    if not addresses:
+        raise socket.gaierror(f"无法解析地址: {parts.hostname}")
+    for address in addresses:
+        if not address.is_global:
+            raise UnsafeAddress(f"地址指向内网: {parts.hostname}")
+    return str(addresses[0])
+
+
+def pinned_request(url: str, address: str) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """把 URL 中的主机名换成已校验的 IP，Host 请求头与 TLS 的 SNI/证书校验仍使用原主机名"""
+    parts = urlsplit(url)
+    host = f"[{address}]" if ":" in address else address
+    port = f":{parts.port}" if parts.port else ""
+    pinned = parts._replace(netloc=f"{host}{port}").geturl()
+    headers = {"Host": f"{parts.hostname}{port}"}
+    extensions = {"sni_hostname": parts.hostname} if parts.scheme == "https" else {}
+    return pinned, headers, extensions
+
+
+@asynccontextmanager
+async def public_stream(client: Any, method: str, url: str, max_redirects: int,
+                        headers: Optional[Dict[str, str]] = None,
+                        resolve: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    只访问公网地址的流式请求，手动跟随重定向并逐跳校验，产出 (最终 URL, 响应)
+
+    client 须关闭 follow_redirects。resolve 为 False 时不解析校验（仅用于不访问网络的本地或模拟传输）。
+    """
+    for _ in range(max_redirects + 1):
+        target, extra_headers, extensions = url, {}, {}
+        if resolve:
+            address = await asyncio.to_thread(resolve_public, url)
+            target, extra_headers, extensions = pinned_request(url, address)
+        async with client.stream(method, target, headers={**(headers or {}), **extra_headers},
+                                 extensions=extensions) as response:
+            if not response.is_redirect:
+                yield url, response
+                return
+            url = urljoin(url, response.headers["location"])
+    raise TooManyRedirects(f"重定向次数过多: {url}")
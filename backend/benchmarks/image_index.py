@@ -0,0 +1,82 @@
+"""
+图片哈希索引基准
+
+向 HammingIndex 插入随机的 64 位哈希，再分别查询已插入哈希的近似副本（随机翻转不超过阈值的位）
+和不存在的哈希，统计构建耗时、内存、查找延迟分位数和近似副本的召回率。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.image_index --size 1000000 --queries 2000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.images import HammingIndex, HASH_BITS
+from benchmarks.run import peak_rss_mb, percentile
+
+
+def _flip(value: int, bits: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(HASH_BITS), bits):
+        value ^= 1 << bit
+    return value
+
+
+def _timed_lookups(index: HammingIndex, queries: List[int], max_distance: int) -> Dict[str, Any]:
+    samples = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(index.search(query, max_distance))
+        samples.append(time.perf_counter() - started)
+    return {
+        "p50_us": round(percentile(samples, 50) * 1e6, 1),
+        "p99_us": round(percentile(samples, 99) * 1e6, 1),
+        "max_us": round(max(samples) * 1e6, 1),
+        "results": results,
+    }
+
+
+def run(size: int, queries: int, max_distance: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    baseline_rss = peak_rss_mb()
+    index = HammingIndex()
+    started = time.perf_counter()
+    for payload in range(size):
+        index.add(rng.getrandbits(HASH_BITS), payload)
+    build_seconds = time.perf_counter() - started
+
+    targets = [rng.randrange(size) for _ in range(queries)]
+    near = [_flip(index.hashes[t], rng.randint(0, max_distance), rng) for t in targets]
+    near_result = _timed_lookups(index, near, max_distance)
+    found = sum(any(payload == target for _, payload in matches)
+                for target, matches in zip(targets, near_result.pop("results")))
+    miss_result = _timed_lookups(index, [rng.getrandbits(HASH_BITS) for _ in range(queries)], max_distance)
+    miss_result.pop("results")
+
+    return {
+        "size": size,
+        "max_distance": max_distance,
+        "build_seconds": round(build_seconds, 3),
+        "index_rss_mb": round(peak_rss_mb() - baseline_rss, 1),
+        "near_duplicate": {**near_result, "recall": round(found / queries, 4)},
+        "miss": miss_result,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="图片哈希索引基准")
+    parser.add_argument("--size", type=int, default=1000000, help="索引中的哈希数")
+    parser.add_argument("--queries", type=int, default=2000, help="每类查询的次数")
+    parser.add_argument("--max-distance", type=int, default=6, help="查找的汉明距离阈值")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.size, args.queries, args.max_distance, args.seed), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
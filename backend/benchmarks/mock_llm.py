@@ -0,0 +1,287 @@
+"""
+基准测试用的模拟 LLM
+
+按提示词识别所属阶段，返回结构完整的固定响应，并模拟可配置的调用延迟，
+使整条流水线可以在不访问真实 LLM 的情况下被压测。
+"""
+import asyncio
+import hashlib
+import json
+import random
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+
+from app.agents.parser import ParserAgent
+from app.agents.search import SearchAgent
+from app.agents.verdict import VerdictAgent
+from app.agents.article import ArticleAgent
+from app.services.links import link_checker
+
+
+# 阶段识别：提示词中的特征片段 -> 阶段名（按顺序匹配）
+STAGE_MARKERS = [
+    ("搜索前分析", "query_analysis"),
+    ("请使用联网搜索功能", "web_search"),
+    ("一次完成信源综合分析与关键发现提炼", "combined_analysis"),
+    ("请对以下信源集合进行深度分析", "source_analysis"),
+    ("基于收集到的信源", "findings"),
+    ("多维度分析专家", "dimensions"),
+    ("证据评估专家", "evidence_evaluation"),
+    ("生成最终的综合判断", "synthesis"),
+    ("一句话结论摘要", "summary"),
+    ("资深新闻工作者", "article"),
+]
+
+# 流式输出时每段的字符数
+STREAM_CHUNK_CHARS = 16
+
+SOURCE_TEMPLATES = [
+    ("gov.cn", "government", "high", "opposing", "primary", "官方通报"),
+    ("xinhuanet.com", "news", "high", "opposing", "primary", "新华社报道"),
+    ("people.com.cn", "news", "high", "neutral", "secondary", "人民网综述"),
+    ("thepaper.cn", "news", "medium", "opposing", "secondary", "澎湃新闻调查"),
+    ("weibo.com", "social", "low", "supportive", "hearsay", "微博用户爆料"),
+    ("zhihu.com", "social", "medium", "unclear", "secondary", "知乎讨论"),
+]
+
+
+def detect_stage(prompt: str) -> str:
+    """根据提示词识别调用阶段"""
+    for marker, stage in STAGE_MARKERS:
+        if marker in prompt:
+            return stage
+    return "unknown"
+
+
+def _extract_query(prompt: str) -> str:
+    """从联网搜索提示词中取出当前搜索查询"""
+    marker = "【当前搜索策略】"
+    start = prompt.find(marker)
+    if start < 0:
+        return ""
+    return prompt[start + len(marker):].strip().split("\n", 1)[0]
+
+
+def build_response(stage: str, prompt: str) -> str:
+    """构造指定阶段的固定响应"""
+    if stage == "query_analysis":
+        return json.dumps({
+            "core_entities": ["某科技公司", "员工"],
+            "core_question": "某知名科技公司是否宣布破产",
+            "query_intent": "核实公司破产传闻是否属实",
+            "info_types": ["事实验证", "背景信息"],
+            "need_cross_validation": True,
+            "search_strategy": "先查官方公告，再查权威媒体报道，最后查社交平台传播情况",
+            "search_queries": [
+                "某科技公司 破产 官方公告",
+                "某科技公司 裁员 最新消息",
+                "某科技公司 破产 辟谣",
+                "tech company bankruptcy rumor"
+            ],
+            # 第三条与第一条重复，用于覆盖主张去重；两个主张共用一条查询，用于覆盖共享搜索
+            "claims": [
+                {"claim_id": "c1", "claim_text": "某知名科技公司宣布破产",
+                 "search_queries": ["某科技公司 破产 官方公告", "某科技公司 破产 辟谣"]},
+                {"claim_id": "c2", "claim_text": "数千名员工失业",
+                 "search_queries": ["某科技公司 裁员 最新消息", "某科技公司 破产 官方公告"]},
+                {"claim_id": "c3", "claim_text": "某科技公司宣布破产",
+                 "search_queries": ["tech company bankruptcy rumor"]}
+            ]
+        }, ensure_ascii=False)
+
+    if stage == "web_search":
+        query = _extract_query(prompt)
+        digest = hashlib.md5(query.encode()).hexdigest()[:8]
+        sources = []
+        for i, (domain, category, credibility, stance, evidence_type, label) in enumerate(SOURCE_TEMPLATES):
+            sources.append({
+                "evidence_id": f"ev-{digest}-{i}",
+                "title": f"{label}：关于{query}的说明",
+                "source_url": f"https://www.{domain}/article/{digest}/{i}",
+                "source_domain": domain,
+                "publish_time": "2025-01-15",
+                "content_snippet": f"{label}显示，{query}相关传闻与事实不符，公司运营正常。" * 3,
+                "source_credibility": credibility,
+                "credibility_reason": f"{domain} 属于{category}类信源",
+                "source_category": category,
+                "source_stance": stance,
+                "potential_bias": "社交平台信息未经核实" if category == "social" else "",
+                "relevance_score": round(0.95 - i * 0.08, 2),
+                "evidence_type": evidence_type,
+                "key_insight": f"{label}称公司并未破产，仅进行了业务调整",
+                "importance_note": f"{label}是判断传闻真伪的重要依据"
+            })
+        return json.dumps({
+            "search_reasoning": f"围绕“{query}”优先检索官方与权威媒体信源",
+            "sources": sources
+        }, ensure_ascii=False)
+
+    if stage == "combined_analysis":
+        return json.dumps({
+            **json.loads(build_response("source_analysis", prompt)),
+            **json.loads(build_response("findings", prompt))
+        }, ensure_ascii=False)
+
+    if stage == "source_analysis":
+        return json.dumps({
+            "source_analysis": [
+                {
+                    "index": i,
+                    "analysis": f"信源{i}与其他权威信源的说法一致",
+                    "reliability_concerns": "" if i < 3 else "信息来源未注明",
+                    "unique_value": f"提供了第{i}个独立视角"
+                }
+                for i in range(10)
+            ],
+            "cross_source_patterns": "权威信源一致否认破产传闻，社交平台信源传播未经核实的说法",
+            "recommended_focus": [0, 1, 3]
+        }, ensure_ascii=False)
+
+    if stage == "findings":
+        return json.dumps({
+            "findings": [
+                "官方通报明确否认公司破产",
+                "权威媒体报道公司仅进行业务调整",
+                "破产传闻最早来自社交平台的匿名帖子"
+            ],
+            "conflict_points": ["社交平台称公司已破产，官方通报称运营正常"],
+            "evidence_gaps": ["缺少公司财报数据"],
+            "analysis_reasoning": "高可信度信源一致否认，低可信度信源缺乏依据",
+            "perspectives": {
+                "supporting": "部分网友认为公司已破产",
+                "opposing": "官方和权威媒体否认破产",
+                "neutral": "行业分析人士认为公司处于调整期"
+            },
+            "key_source_indices": [0, 1, 3]
+        }, ensure_ascii=False)
+
+    if stage == "dimensions":
+        return json.dumps({
+            name: {
+                "analysis": f"{name} 维度的分析结论",
+                "key_points": [f"{name} 要点1", f"{name} 要点2"],
+                "confidence": 0.8
+            }
+            for name in ("factual", "contextual", "motivational", "impact")
+        }, ensure_ascii=False)
+
+    if stage == "evidence_evaluation":
+        return json.dumps({
+            "key_sources_assessment": [
+                {"domain": "gov.cn", "assessment": "官方信源，权威可靠", "weight": 0.95, "reliability_concerns": ""}
+            ],
+            "conflict_resolution": "以高可信度官方信源为准",
+            "weight_analysis": ["官方通报权重最高", "社交平台信息权重最低"],
+            "evidence_strength": 0.85,
+            "coverage_assessment": "覆盖官方、媒体和社交平台",
+            "overall_quality": "证据质量较高"
+        }, ensure_ascii=False)
+
+    if stage == "synthesis":
+        return json.dumps({
+            "conclusion": "false",
+            "confidence_score": 0.88,
+            "summary": "官方通报和权威媒体均否认该公司破产，传闻不实。",
+            "reasoning_chain": ["官方否认", "媒体佐证", "传闻来源不可靠", "综合判定为虚假"],
+            "multi_angle_reasoning": {
+                "literal_meaning": "传闻称公司破产",
+                "deep_implication": "传闻可能影响公司声誉",
+                "direct_evidence": "官方通报",
+                "indirect_evidence": "媒体报道",
+                "short_term": "引发员工恐慌",
+                "long_term": "影响行业信心"
+            },
+            "verified_claims": [],
+            "refuted_claims": ["公司宣布破产"],
+            "uncertain_claims": [],
+            "nuanced_claims": [],
+            "supporting_sources": [],
+            "decision_points": [{"step": "证据评估", "decision": "高可信度信源占主导"}],
+            "confidence_breakdown": {"factual_basis": 0.9, "evidence_quality": 0.85}
+        }, ensure_ascii=False)
+
+    if stage == "summary":
+        return json.dumps({"summary": "官方通报和权威媒体一致否认该公司破产，传闻不实。"}, ensure_ascii=False)
+
+    if stage == "article":
+        return json.dumps({
+            "headline": "网传某科技公司破产消息不实",
+            "lead": "近日网传某知名科技公司宣布破产，经核实该消息不实。",
+            "body": "据了解，该公司官方已发布通报否认相关传闻。" * 5,
+            "conclusion": "经核实，相关传闻不实。",
+            "sources": "官方通报；新华社"
+        }, ensure_ascii=False)
+
+    return "{}"
+
+
+class MockLLM:
+    """
+    模拟 LLM，替换各 Agent 的 LLM 调用方法
+
+    Args:
+        latency_ms: 每次调用的平均延迟（毫秒）
+        jitter: 延迟抖动系数，按对数正态分布产生长尾
+        seed: 随机种子，保证多次运行的延迟序列一致
+    """
+
+    def __init__(self, latency_ms: float = 0.0, jitter: float = 0.3, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+
+    def _sample_latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        factor = self._random.lognormvariate(0, self.jitter) if self.jitter > 0 else 1.0
+        return self.latency_ms * factor / 1000.0
+
+    async def complete(self, prompt: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """返回固定响应；给定 on_delta 时把响应切成小段，在延迟时间内均匀地流式输出"""
+        stage = detect_stage(prompt)
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        delay = self._sample_latency()
+        response = build_response(stage, prompt)
+        if on_delta is None:
+            if delay:
+                await asyncio.sleep(delay)
+            return response
+
+        chunks = [response[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(response), STREAM_CHUNK_CHARS)]
+        for chunk in chunks:
+            if delay:
+                await asyncio.sleep(delay / len(chunks))
+            on_delta(chunk)
+        return response
+
+    @contextmanager
+    def installed(self):
+        """在上下文内替换四个 Agent 的 LLM 调用；信源链接检查改为访问模拟传输，全部可用且不写数据库"""
+        import httpx
+
+        mock = self
+
+        async def call(agent_self: Any, prompt: str, *args: Any, **kwargs: Any) -> str:
+            return await mock.complete(prompt, kwargs.get("on_delta"))
+
+        targets = [
+            (ParserAgent, "_request_llm"),
+            (SearchAgent, "_request_llm_with_search"),
+            (VerdictAgent, "_request_llm"),
+            (ArticleAgent, "_request_llm"),
+        ]
+        originals: Dict[Any, Optional[Any]] = {}
+        for cls, name in targets:
+            originals[(cls, name)] = cls.__dict__.get(name)
+            setattr(cls, name, call)
+        link_checker.configure(transport=httpx.MockTransport(lambda request: httpx.Response(200)), persist=False)
+        try:
+            yield self
+        finally:
+            for (cls, name), original in originals.items():
+                setattr(cls, name, original)
+            link_checker.configure(persist=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls_by_stage": dict(self.calls), "total_calls": sum(self.calls.values())}
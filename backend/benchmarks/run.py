@@ -0,0 +1,436 @@
+"""
+端到端性能基准
+
+在模拟 LLM 下驱动 /api/verify、/api/verify/stream 以及各 Agent，
+按场景统计延迟分位数、首个 SSE 事件耗时、吞吐量、事件循环延迟和峰值内存，
+并把结果保存为 JSON，便于不同提交之间对比。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.run --concurrency 8 --requests 64 --llm-latency-ms 50 --output bench.json
+    python -m benchmarks.run --scenario api_verify_stream --compare bench.json
+
+使用录制的真实流量（见 app/core/cassette.py）代替模拟 LLM：
+    python -m benchmarks.run --cassette cassettes/llm.jsonl.gz --content-file cases.txt --simulate-latency
+
+开启关键信源原文抓取（页面从 benchmarks/fixtures/pages 读取）：
+    python -m benchmarks.run --scenario search --fetch-pages
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
+
+from benchmarks.mock_llm import MockLLM
+
+
+DEFAULT_CONTENT = "近日网传消息称，某知名科技公司宣布破产，数千名员工失业。这一消息在社交媒体上迅速传播，引发广泛关注。"
+
+SCENARIOS = ["parser", "search", "verdict", "api_verify", "api_verify_stream"]
+
+# 原文抓取的离线页面
+PAGE_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """线性插值计算分位数，q 取值 0-100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """汇总一组耗时（秒）为毫秒分位数"""
+    if not values:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "max_ms": 0.0}
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存（MB）"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        return round(usage / (1024 * 1024), 2)
+    return round(usage / 1024, 2)
+
+
+class LoopLagMonitor:
+    """周期性休眠，记录实际唤醒时间相对预期的偏差，即事件循环延迟"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "p50_ms": round(percentile(self.samples, 50) * 1000, 3),
+            "p99_ms": round(percentile(self.samples, 99) * 1000, 3),
+            "max_ms": round(max(self.samples, default=0.0) * 1000, 3),
+        }
+
+
+async def asgi_post(app: Any, path: str, payload: Dict[str, Any], client_port: int = 50000) -> Tuple[int, bytes, Optional[float]]:
+    """
+    直接以 ASGI 协议调用应用，逐块接收响应体
+
+    Returns:
+        (状态码, 响应体, 首个 SSE data 块到达的时间戳)
+    """
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"benchmark"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        # 每个请求模拟不同的客户端地址，压测不受按客户端的准入限流影响
+        "client": (f"10.{client_port >> 16 & 255}.{client_port >> 8 & 255}.{client_port & 255}", client_port),
+        "server": ("benchmark", 80),
+    }
+    request_sent = False
+    finished = asyncio.Event()
+    status = 0
+    chunks: List[bytes] = []
+    first_event_at: Optional[float] = None
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, first_event_at
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunk = message.get("body", b"")
+            if chunk:
+                if first_event_at is None and b"data:" in chunk:
+                    first_event_at = time.perf_counter()
+                chunks.append(chunk)
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return status, b"".join(chunks), first_event_at
+
+
+async def _drive(operation: Callable[[int], Awaitable[Optional[float]]], total: int, concurrency: int) -> Dict[str, Any]:
+    """以固定并发执行 total 次操作，操作返回首事件耗时（可选）"""
+    latencies: List[float] = []
+    first_events: List[float] = []
+    errors: List[str] = []
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                first_event = await operation(index)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                continue
+            latencies.append(time.perf_counter() - started)
+            if first_event is not None:
+                first_events.append(first_event - started)
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - wall_start
+    await monitor.stop()
+
+    result = {
+        "requests": total,
+        "completed": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "latency": summarize(latencies),
+        "event_loop_lag": monitor.summary(),
+    }
+    if first_events:
+        result["time_to_first_event"] = summarize(first_events)
+    return result
+
+
+async def _build_operation(scenario: str, contents: List[str]) -> Callable[[int], Awaitable[Optional[float]]]:
+    """构造场景对应的单次操作；多条内容按请求序号轮流使用"""
+    from app.agents.parser import ParserAgent
+    from app.api import routes
+
+    content = contents[0]
+
+    def fresh_parser_cache():
+        # Parser 结果按内容缓存，压测时清空以覆盖完整解析路径
+        ParserAgent._cache.clear()
+
+    if scenario == "parser":
+        async def operation(index: int) -> None:
+            fresh_parser_cache()
+            await routes.agents.parser.parse(contents[index % len(contents)])
+        return operation
+
+    if scenario in ("search", "verdict"):
+        fresh_parser_cache()
+        parser_result = await routes.agents.parser.parse(content)
+        if scenario == "search":
+            async def operation(index: int) -> None:
+                await routes.agents.search.search(parser_result, content)
+            return operation
+
+        search_result = await routes.agents.search.search(parser_result, content)
+
+        async def operation(index: int) -> None:
+            await routes.agents.verdict.verdict(search_result, content)
+        return operation
+
+    from main import app
+
+    if scenario == "api_verify":
+        async def operation(index: int) -> None:
+            fresh_parser_cache()
+            payload = {"content": contents[index % len(contents)]}
+            status, body, _ = await asgi_post(app, "/api/verify", payload, 50000 + index)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}: {body[:200]!r}")
+        return operation
+
+    if scenario == "api_verify_stream":
+        async def operation(index: int) -> Optional[float]:
+            fresh_parser_cache()
+            payload = {"content": contents[index % len(contents)]}
+            status, body, first_event_at = await asgi_post(app, "/api/verify/stream", payload, 50000 + index)
+            if status != 200 or b'"type": "complete"' not in body and b'"type":"complete"' not in body:
+                raise RuntimeError(f"HTTP {status}: stream did not complete")
+            return first_event_at
+        return operation
+
+    raise ValueError(f"未知场景: {scenario}")
+
+
+async def run_scenario(scenario: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """在模拟 LLM（或录像带回放）下运行单个场景"""
+    from app.core.cassette import cassette
+    from app.core.config import settings
+
+    if config.get("mode"):
+        settings.SEARCH_DEFAULT_MODE = config["mode"]
+    if config.get("fetch_pages"):
+        settings.PAGE_FETCH_ENABLED = True
+        settings.PAGE_FETCH_FIXTURE_DIR = PAGE_FIXTURE_DIR
+        settings.PAGE_CACHE_DIR = tempfile.mkdtemp(prefix="aletheia-pages-")
+
+    mock = MockLLM(latency_ms=config["llm_latency_ms"], jitter=config["llm_jitter"], seed=config["seed"])
+    if config.get("cassette"):
+        # 回放录制的真实响应，不安装模拟 LLM
+        cassette.configure(path=config["cassette"], mode="replay",
+                           simulate_latency=config["simulate_latency"])
+        installed = contextlib.nullcontext(mock)
+    else:
+        if config.get("record_cassette"):
+            cassette.configure(path=config["record_cassette"], mode="record")
+        installed = mock.installed()
+
+    with installed:
+        operation = await _build_operation(scenario, config["contents"])
+        if config["warmup"]:
+            await _drive(operation, config["warmup"], min(config["concurrency"], config["warmup"]))
+        mock.calls.clear()
+        result = await _drive(operation, config["requests"], config["concurrency"])
+    result["llm"] = cassette.stats() if config.get("cassette") else mock.stats()
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def _run_scenario_sync(scenario: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """同步入口，可在子进程中调用；默认屏蔽 Agent 的日志输出"""
+    sink = contextlib.nullcontext() if config["verbose"] else contextlib.redirect_stdout(io.StringIO())
+    with sink:
+        return asyncio.run(run_scenario(scenario, config))
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """对比两次基准结果，返回可打印的行"""
+    lines = [f"{'scenario':<20} {'metric':<26} {'baseline':>12} {'current':>12} {'change':>9}"]
+    metrics = [
+        ("latency.p50_ms", ("latency", "p50_ms")),
+        ("latency.p95_ms", ("latency", "p95_ms")),
+        ("latency.p99_ms", ("latency", "p99_ms")),
+        ("time_to_first_event.p50_ms", ("time_to_first_event", "p50_ms")),
+        ("requests_per_s", ("requests_per_s",)),
+        ("event_loop_lag.p99_ms", ("event_loop_lag", "p99_ms")),
+        ("peak_rss_mb", ("peak_rss_mb",)),
+    ]
+    for name, result in current.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for label, path in metrics:
+            new_value: Any = result
+            old_value: Any = base
+            for key in path:
+                new_value = new_value.get(key) if isinstance(new_value, dict) else None
+                old_value = old_value.get(key) if isinstance(old_value, dict) else None
+            if new_value is None or old_value is None:
+                continue
+            change = f"{(new_value - old_value) / old_value * 100:+.1f}%" if old_value else "n/a"
+            lines.append(f"{name:<20} {label:<26} {old_value:>12.3f} {new_value:>12.3f} {change:>9}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aletheia 端到端性能基准")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="要运行的场景，可重复指定；默认运行全部")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发数")
+    parser.add_argument("--requests", type=int, default=32, help="每个场景的请求数")
+    parser.add_argument("--warmup", type=int, default=2, help="预热请求数（不计入统计）")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0, help="模拟 LLM 的平均延迟")
+    parser.add_argument("--llm-jitter", type=float, default=0.3, help="模拟延迟的对数正态抖动")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--content", default=DEFAULT_CONTENT, help="待鉴定内容")
+    parser.add_argument("--content-file", help="待鉴定内容文件，每行一条，按请求轮流使用")
+    parser.add_argument("--cassette", help="回放指定录像带中的 LLM 响应，代替模拟 LLM")
+    parser.add_argument("--simulate-latency", action="store_true", help="回放时按录制耗时等待")
+    parser.add_argument("--record-cassette", help="把模拟 LLM 的响应录制到指定录像带")
+    parser.add_argument("--fetch-pages", action="store_true", help="开启关键信源原文抓取，页面从离线目录读取")
+    parser.add_argument("--mode", choices=("fast", "standard", "deep"), help="搜索后的信源分析模式，默认使用配置值")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--no-isolate", action="store_true", help="在当前进程中运行所有场景（峰值内存不再按场景区分）")
+    parser.add_argument("--verbose", action="store_true", help="保留 Agent 日志输出")
+    args = parser.parse_args(argv)
+
+    contents = [args.content]
+    if args.content_file:
+        with open(args.content_file, encoding="utf-8") as f:
+            contents = [line.strip() for line in f if line.strip()]
+
+    config = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "llm_latency_ms": args.llm_latency_ms,
+        "llm_jitter": args.llm_jitter,
+        "seed": args.seed,
+        "contents": contents,
+        "cassette": args.cassette,
+        "simulate_latency": args.simulate_latency,
+        "record_cassette": args.record_cassette,
+        "fetch_pages": args.fetch_pages,
+        "mode": args.mode,
+        "verbose": args.verbose,
+    }
+    scenarios = args.scenario or SCENARIOS
+
+    results: Dict[str, Any] = {}
+    for scenario in scenarios:
+        print(f"[Benchmark] Running {scenario} ...", file=sys.stderr)
+        if args.no_isolate:
+            results[scenario] = _run_scenario_sync(scenario, config)
+        else:
+            # 每个场景单独一个进程，峰值内存互不干扰
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[scenario] = pool.submit(_run_scenario_sync, scenario, config).result()
+        latency = results[scenario]["latency"]
+        print(f"[Benchmark] {scenario}: p50={latency['p50_ms']}ms p99={latency['p99_ms']}ms "
+              f"rps={results[scenario]['requests_per_s']} errors={results[scenario]['errors']}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: v for k, v in config.items() if k != "verbose"},
+        },
+        "scenarios": results,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[Benchmark] Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+
+    return 0 if all(r["errors"] == 0 for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+冷启动基准
+
+在全新的子进程中多次测量：导入 main 的耗时、应用启动（lifespan）耗时、
+启动后第一个和第二个 /api/verify 请求的耗时（模拟 LLM）、已加载的模块数和峰值内存，取中位数。
+--first-request-delay-ms 模拟启动完成到第一个请求到达之间的间隔（后台预热在此期间进行）。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.startup --runs 5 --output startup.json
+    python -m benchmarks.startup --runs 5 --compare startup.json
+    python -m benchmarks.startup --runs 5 --first-request-delay-ms 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.run import DEFAULT_CONTENT, _git_revision, peak_rss_mb, percentile
+
+
+METRICS = ["import_ms", "startup_ms", "first_request_ms", "second_request_ms", "modules", "peak_rss_mb"]
+
+
+async def _lifespan(app: Any):
+    """手动驱动 ASGI lifespan 完成启动，返回触发关闭的协程函数"""
+    events: asyncio.Queue = asyncio.Queue()
+    started = asyncio.Event()
+    await events.put({"type": "lifespan.startup"})
+
+    async def receive():
+        return await events.get()
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.complete":
+            started.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+    await started.wait()
+
+    async def shutdown():
+        await events.put({"type": "lifespan.shutdown"})
+        await task
+    return shutdown
+
+
+async def _measure_child(llm_latency_ms: float, first_request_delay_ms: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    from benchmarks.mock_llm import MockLLM
+    from benchmarks.run import asgi_post
+
+    shutdown = await _lifespan(main.app)
+    ready = time.perf_counter()
+    await asyncio.sleep(first_request_delay_ms / 1000)
+    timings = []
+    with MockLLM(latency_ms=llm_latency_ms, jitter=0).installed():
+        for index in range(2):
+            request_started = time.perf_counter()
+            status, body, _ = await asgi_post(main.app, "/api/verify", {"content": DEFAULT_CONTENT}, 50000 + index)
+            if status != 200:
+                raise RuntimeError(f"HTTP {status}: {body[:200]!r}")
+            timings.append(time.perf_counter() - request_started)
+    await shutdown()
+    return {
+        "import_ms": round((imported - started) * 1000, 3),
+        "startup_ms": round((ready - imported) * 1000, 3),
+        "first_request_ms": round(timings[0] * 1000, 3),
+        "second_request_ms": round(timings[1] * 1000, 3),
+        "modules": len(sys.modules),
+        "peak_rss_mb": peak_rss_mb(),
+        "provider_sdks_loaded": [name for name in ("openai", "anthropic") if name in sys.modules],
+    }
+
+
+def _run_child(llm_latency_ms: float, first_request_delay_ms: float, verbose: bool) -> Dict[str, Any]:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", "--llm-latency-ms", str(llm_latency_ms),
+         "--first-request-delay-ms", str(first_request_delay_ms)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    if verbose:
+        print(result.stdout, file=sys.stderr)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    # 最后一行是结果，之前是 Agent 的日志
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = [f"{'metric':<20} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for name in METRICS:
+        new_value = current["median"].get(name)
+        old_value = baseline.get("median", {}).get(name)
+        if new_value is None or old_value is None:
+            continue
+        change = f"{(new_value - old_value) / old_value * 100:+.1f}%" if old_value else "n/a"
+        lines.append(f"{name:<20} {old_value:>12.3f} {new_value:>12.3f} {change:>9}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Aletheia 冷启动基准")
+    parser.add_argument("--runs", type=int, default=5, help="子进程次数")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0, help="模拟 LLM 的延迟")
+    parser.add_argument("--first-request-delay-ms", type=float, default=0.0, help="启动完成后等待多久发出第一个请求")
+    parser.add_argument("--output", help="结果 JSON 输出路径")
+    parser.add_argument("--compare", help="与之前保存的结果 JSON 对比")
+    parser.add_argument("--verbose", action="store_true", help="保留子进程的日志输出")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(asyncio.run(_measure_child(args.llm_latency_ms, args.first_request_delay_ms))))
+        return 0
+
+    runs = []
+    for index in range(args.runs):
+        runs.append(_run_child(args.llm_latency_ms, args.first_request_delay_ms, args.verbose))
+        print(f"[Startup] run {index + 1}: import={runs[-1]['import_ms']}ms startup={runs[-1]['startup_ms']}ms "
+              f"first_request={runs[-1]['first_request_ms']}ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "runs": args.runs,
+            "llm_latency_ms": args.llm_latency_ms,
+            "first_request_delay_ms": args.first_request_delay_ms,
+        },
+        "median": {name: round(percentile([run[name] for run in runs], 50), 3) for name in METRICS},
+        "provider_sdks_loaded": runs[-1]["provider_sdks_loaded"],
+        "runs": runs,
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"[Startup] Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare(report, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,41 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import argparse
+import asyncio
+import os
 import uvicorn
 
 from app.core.config import settings
-from app.api.routes import router
+from app.agents.registry import agents
+from app.services.links import link_checker
+from app.services.pages import page_fetcher
+from app.services.images import image_index
+from app.api.routes import router, drain_background_tasks
+from app.api.static import FrontendFiles
 from app.db.database import init_db
 
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.join(BASE_DIR, settings.FRONTEND_DIST_DIR)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时初始化数据库
     init_db()
     print("✅ 数据库初始化完成")
+    # 后台预热 Agent 与 LLM 连接，不阻塞启动
+    warm_up = asyncio.create_task(agents.warm_up()) if settings.LLM_WARMUP_ENABLED else None
     yield
-    # 关闭时的清理工作
+    if warm_up and not warm_up.done():
+        warm_up.cancel()
+    # 关闭时（包括平滑重启）等待客户端断开后转入后台的鉴定完成
+    await drain_background_tasks(settings.SHUTDOWN_GRACE_SECONDS)
+    await link_checker.close()
+    await page_fetcher.close()
+    await image_index.close()
 
 
 # 创建 FastAPI 应用
@@ -41,19 +61,48 @@ app.add_middleware(
 app.include_router(router, prefix="/api")
 
 
-@app.get("/")
-async def root():
-    return {
-        "name": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "docs": "/docs"
-    }
+if settings.SERVE_FRONTEND and os.path.isdir(FRONTEND_DIR):
+    # 前端静态导出与 API 同源提供，放在最后以免遮住 /api 和 /docs
+    app.mount("/", FrontendFiles(directory=FRONTEND_DIR, html=True), name="frontend")
+    print(f"✅ 前端静态文件: {FRONTEND_DIR}")
+else:
+    @app.get("/")
+    async def root():
+        return {
+            "name": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+            "docs": "/docs"
+        }
+
+
+def worker_count() -> int:
+    """生产模式的 worker 数，WEB_CONCURRENCY 为 0 时按本进程可用的 CPU 数"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return os.cpu_count() or 1
 
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG
-    )
+    parser = argparse.ArgumentParser(description=settings.APP_NAME)
+    parser.add_argument("--production", action="store_true",
+                        help="多 worker 运行并同源提供前端静态文件；SIGHUP 逐个平滑重启 worker")
+    args = parser.parse_args()
+    if args.production:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=settings.PORT,
+            workers=worker_count(),
+            timeout_graceful_shutdown=int(settings.SHUTDOWN_GRACE_SECONDS),
+            log_level="info"
+        )
+    else:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=settings.PORT,
+            reload=settings.DEBUG
+        )
@@ -0,0 +1,79 @@
+"""准入控制：流式响应在开始前或排队中被取消时都要归还名额"""
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.api import routes
+from app.core.admission import AdmissionController
+from app.core.config import settings
+from app.models.schemas import VerifyRequest
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController()
+    monkeypatch.setattr(routes, "admission", controller)
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONCURRENT", 1)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE", 4)
+    return controller
+
+
+def _http_request() -> Request:
+    async def receive():
+        await asyncio.Event().wait()
+    scope = {"type": "http", "method": "POST", "path": "/api/verify/stream",
+             "headers": [], "client": ("203.0.113.7", 50000)}
+    return Request(scope, receive)
+
+
+def test_stream_never_started_holds_no_slot(controller):
+    async def run():
+        response = await routes.verify_content_stream(VerifyRequest(content="某地发生地震"), _http_request())
+        # 响应体从未开始迭代（例如客户端在响应头发出前断开）
+        del response
+        return controller.running, controller.queued
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+def test_stream_closed_while_queued_leaves_the_queue(controller):
+    async def run():
+        controller.running = 1
+        response = await routes.verify_content_stream(VerifyRequest(content="某地发生地震"), _http_request())
+        body = response.body_iterator
+        first = await body.__anext__()
+        assert controller.queued == 1
+        await body.aclose()
+        await asyncio.sleep(0.05)
+        return first, controller.running, controller.queued
+
+    first, running, queued = asyncio.run(run())
+    assert b'"queued"' in first
+    assert (running, queued) == (1, 0)
+
+
+def test_task_cancelled_before_it_runs_releases_its_ticket(controller):
+    async def run():
+        ticket = controller.enter("203.0.113.7")
+        assert controller.running == 1
+        task = asyncio.create_task(asyncio.sleep(10))
+        task.add_done_callback(lambda _: ticket.release())
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return controller.running
+
+    assert asyncio.run(run()) == 0
+
+
+def test_full_queue_is_rejected_before_the_response_starts(controller, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE", 0)
+
+    async def run():
+        controller.running = 1
+        with pytest.raises(routes.HTTPException) as error:
+            await routes.verify_content_stream(VerifyRequest(content="某地发生地震"), _http_request())
+        return error.value.status_code
+
+    assert asyncio.run(run()) == 429
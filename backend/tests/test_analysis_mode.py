@@ -0,0 +1,20 @@
+"""分析模式：默认值与请求级覆盖"""
+import pytest
+
+from app.core.analysis_mode import current_mode, mode_scope
+
+
+def test_default_mode_keeps_web_search_analysis():
+    assert current_mode() == "deep"
+
+
+def test_mode_scope_overrides_and_restores():
+    with mode_scope("fast") as mode:
+        assert mode == current_mode() == "fast"
+    assert current_mode() == "deep"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        with mode_scope("turbo"):
+            pass
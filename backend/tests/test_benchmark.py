@@ -0,0 +1,33 @@
+"""基准工具：分位数插值、结果对比，以及在模拟 LLM 下完整跑通流式接口"""
+import json
+
+from benchmarks.run import compare, main, percentile, summarize
+
+
+def test_percentile_interpolates_between_samples():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+    assert percentile([4.0, 1.0, 3.0, 2.0], 100) == 4.0
+    assert summarize([0.001, 0.003])["mean_ms"] == 2.0
+
+
+def test_compare_reports_relative_change():
+    baseline = {"scenarios": {"parser": {"latency": {"p50_ms": 10.0}, "requests_per_s": 0.0}}}
+    current = {"scenarios": {"parser": {"latency": {"p50_ms": 12.0}, "requests_per_s": 5.0}},
+               "other": {}}
+    lines = compare(current, baseline)
+    assert any("latency.p50_ms" in line and "+20.0%" in line for line in lines)
+    assert any("requests_per_s" in line and "n/a" in line for line in lines)
+
+
+def test_stream_scenario_completes_under_the_mock_llm(tmp_path):
+    output = tmp_path / "bench.json"
+    code = main(["--scenario", "api_verify_stream", "--requests", "2", "--concurrency", "2",
+                 "--warmup", "0", "--llm-latency-ms", "0", "--no-isolate", "--output", str(output)])
+    report = json.loads(output.read_text(encoding="utf-8"))
+    result = report["scenarios"]["api_verify_stream"]
+    assert code == 0
+    assert result["completed"] == 2
+    assert result["time_to_first_event"]["p50_ms"] > 0
+    assert result["llm"]["total_calls"] > 0
@@ -0,0 +1,73 @@
+"""LLM 录像带：录制后回放、重复提示词轮流返回、并发录制按顺序落盘、回放缺失时不访问真实 LLM"""
+import asyncio
+
+import pytest
+
+from app.core.cassette import Cassette, CassetteMiss
+
+
+def _request(response, calls):
+    async def request():
+        calls.append(response)
+        return response
+    return request
+
+
+def test_recorded_calls_replay_in_order(tmp_path):
+    path = str(tmp_path / "llm.jsonl.gz")
+    calls = []
+
+    async def record():
+        recorder = Cassette(path, mode="record")
+        await recorder.call("parser", "提示词 A", _request("响应 1", calls))
+        await recorder.call("parser", "提示词 A", _request("响应 2", calls))
+        await recorder.call("verdict", "提示词 A", _request("判定", calls))
+        return recorder.recorded
+
+    assert asyncio.run(record()) == 3
+
+    async def replay():
+        player = Cassette(path, mode="replay")
+        never = _request("真实调用", calls)
+        responses = [await player.call("parser", "提示词 A", never) for _ in range(3)]
+        responses.append(await player.call("verdict", "提示词 A", never))
+        return responses, player.stats()
+
+    responses, stats = asyncio.run(replay())
+    assert responses == ["响应 1", "响应 2", "响应 1", "判定"]
+    assert stats["hits"] == 4
+    assert calls == ["响应 1", "响应 2", "判定"]
+
+
+def test_concurrent_recordings_are_written_in_order(tmp_path):
+    path = str(tmp_path / "llm.jsonl.gz")
+    calls = []
+
+    async def record():
+        recorder = Cassette(path, mode="record")
+        await asyncio.gather(*(recorder.call("parser", "提示词", _request(f"响应 {i}", calls))
+                               for i in range(20)))
+        return recorder
+
+    recorder = asyncio.run(record())
+    assert recorder._pending == []
+
+    async def replay():
+        player = Cassette(path, mode="replay")
+        return [await player.call("parser", "提示词", _request("真实调用", calls)) for _ in range(20)]
+
+    assert asyncio.run(replay()) == [f"响应 {i}" for i in range(20)]
+
+
+def test_replay_miss_never_calls_the_provider(tmp_path):
+    calls = []
+    player = Cassette(str(tmp_path / "empty.jsonl.gz"), mode="replay")
+    with pytest.raises(CassetteMiss):
+        asyncio.run(player.call("search", "未录制的提示词", _request("真实调用", calls)))
+    assert calls == []
+    assert player.stats()["misses"] == 1
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "x.jsonl.gz"), mode="live")
@@ -0,0 +1,108 @@
+"""熔断：失败率达到阈值后打开、冷却后只放行一个探测、主提供商失败或熔断时切换到备用提供商"""
+import asyncio
+
+import pytest
+
+from app.core import model_routing
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, breakers
+from app.core.config import settings
+from app.core.model_routing import DEFAULT_ROUTES, ModelRouter
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_RATE", 0.5)
+    monkeypatch.setattr(settings, "LLM_BREAKER_OPEN_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "LLM_BREAKER_SLOW_CALL_SECONDS", 45.0)
+    breakers.reset()
+    yield
+    breakers.reset()
+
+
+def _open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("openai", "model")
+    for ok in (True, False, True, False):
+        breaker.record(ok)
+    return breaker
+
+
+def test_opens_only_after_enough_calls():
+    breaker = CircuitBreaker("openai", "model")
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+    assert _open_breaker().state == OPEN
+    assert not _open_breaker().allow()
+
+
+def test_slow_successes_count_as_failures():
+    breaker = CircuitBreaker("openai", "model")
+    for _ in range(4):
+        breaker.record(True, latency=60.0)
+    assert breaker.state == OPEN
+
+
+@pytest.mark.parametrize("probe_ok, state", [(True, CLOSED), (False, OPEN)])
+def test_half_open_allows_a_single_probe(monkeypatch, probe_ok, state):
+    breaker = _open_breaker()
+    monkeypatch.setattr(settings, "LLM_BREAKER_OPEN_SECONDS", 0.0)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record(probe_ok)
+    assert breaker.state == state
+
+
+def test_released_probe_can_be_retried(monkeypatch):
+    breaker = _open_breaker()
+    monkeypatch.setattr(settings, "LLM_BREAKER_OPEN_SECONDS", 0.0)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_PROVIDER", "auto")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODEL", "backup-model")
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "primary-model")
+    monkeypatch.setattr(settings, "LLM_STRONG_MODEL", None)
+    monkeypatch.setattr(settings, "LLM_HEDGE_STAGES", [])
+    monkeypatch.setattr(model_routing.key_pool, "has_keys", lambda provider: True)
+    return ModelRouter(DEFAULT_ROUTES)
+
+
+def _call(router, fail_primary):
+    calls = []
+
+    async def request(model, max_tokens, provider):
+        calls.append(provider)
+        if provider == "openai" and fail_primary:
+            raise ConnectionError("upstream down")
+        return '{"summary": "ok"}'
+
+    text = asyncio.run(router.call("verdict", "summary", "提示词", request, "default-model"))
+    return text, calls
+
+
+def test_failure_fails_over_to_the_other_provider(router):
+    text, calls = _call(router, fail_primary=True)
+    assert text == '{"summary": "ok"}'
+    assert calls == ["openai", "claude"]
+
+
+def test_open_breaker_skips_the_primary(router):
+    for _ in range(4):
+        _call(router, fail_primary=True)
+    assert breakers.get("openai", "primary-model").state == OPEN
+    _, calls = _call(router, fail_primary=True)
+    assert calls == ["claude"]
+
+
+def test_no_fallback_reraises(router, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FALLBACK_PROVIDER", "none")
+    with pytest.raises(ConnectionError):
+        _call(router, fail_primary=True)
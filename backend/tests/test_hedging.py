@@ -0,0 +1,87 @@
+"""对冲请求：超过近期耗时分位数时向备用提供商再发一份，先返回者胜出，另一份被取消；受对冲预算限制"""
+import asyncio
+
+import pytest
+
+from app.core import model_routing
+from app.core.circuit_breaker import breakers
+from app.core.config import settings
+from app.core.hedging import Hedger, hedger
+from app.core.model_routing import DEFAULT_ROUTES, ModelRouter
+
+
+@pytest.fixture(autouse=True)
+def hedging(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_PROVIDER", "auto")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_MODEL", "backup-model")
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "primary-model")
+    monkeypatch.setattr(settings, "LLM_STRONG_MODEL", None)
+    monkeypatch.setattr(settings, "LLM_HEDGE_STAGES", ["summary"])
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "LLM_HEDGE_PERCENTILE", 0.95)
+    monkeypatch.setattr(settings, "LLM_HEDGE_BUDGET", 1.0)
+    monkeypatch.setattr(model_routing.key_pool, "has_keys", lambda provider: True)
+    breakers.reset()
+    hedger.reset()
+    for _ in range(3):
+        hedger.observe("summary", 0.01)
+    yield
+    breakers.reset()
+    hedger.reset()
+
+
+def _call(delays):
+    """各提供商按 delays 中的耗时返回，记录被取消的提供商"""
+    cancelled = []
+
+    async def request(model, max_tokens, provider):
+        try:
+            await asyncio.sleep(delays[provider])
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        return f'{{"summary": "{provider}"}}'
+
+    async def run():
+        text = await ModelRouter(DEFAULT_ROUTES).call("verdict", "summary", "提示词", request, "default-model")
+        await asyncio.sleep(0)
+        return text
+
+    return asyncio.run(run()), cancelled
+
+
+def test_slow_primary_loses_to_the_hedge():
+    text, cancelled = _call({"openai": 5.0, "claude": 0.0})
+    assert text == '{"summary": "claude"}'
+    assert cancelled == ["openai"]
+    assert hedger.snapshot()["summary"]["wins"] == 1
+
+
+def test_primary_that_answers_in_time_is_not_hedged():
+    text, _ = _call({"openai": 0.0, "claude": 0.0})
+    assert text == '{"summary": "openai"}'
+    assert hedger.snapshot()["summary"]["hedges"] == 0
+
+
+def test_hedge_is_cancelled_when_the_primary_wins():
+    text, cancelled = _call({"openai": 0.05, "claude": 5.0})
+    assert text == '{"summary": "openai"}'
+    assert cancelled == ["claude"]
+    stats = hedger.snapshot()["summary"]
+    assert (stats["hedges"], stats["wins"]) == (1, 0)
+
+
+def test_budget_limits_hedges(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_BUDGET", 0.5)
+    state = Hedger()
+    for _ in range(2):
+        state.start("summary")
+    assert state.acquire("summary")
+    assert not state.acquire("summary")
+
+
+def test_no_delay_until_enough_samples():
+    state = Hedger()
+    state.observe("summary", 1.0)
+    assert state.start("summary") is None
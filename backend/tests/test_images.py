@@ -0,0 +1,149 @@
+"""图片哈希索引：多索引查找、下载时的内网地址防护、命中后是否沿用之前的结论"""
+import asyncio
+import json
+import random
+import socket
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.models.schemas import VerifyRequest
+from app.services import images, net
+from app.services.images import HASH_BITS, HammingIndex, ImageIndex
+
+
+def _fake_dns(monkeypatch, address):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))]
+    monkeypatch.setattr(net.socket, "getaddrinfo", getaddrinfo)
+
+
+def test_hamming_index_matches_brute_force():
+    rng = random.Random(7)
+    index = HammingIndex()
+    values = [rng.getrandbits(HASH_BITS) for _ in range(5000)]
+    for payload, value in enumerate(values):
+        index.add(value, payload)
+    queries = [values[rng.randrange(len(values))] ^ (1 << rng.randrange(HASH_BITS)) for _ in range(50)]
+    queries += [rng.getrandbits(HASH_BITS) for _ in range(50)]
+    for query in queries:
+        expected = sorted(((query ^ value).bit_count(), payload) for payload, value in enumerate(values)
+                          if (query ^ value).bit_count() <= 6)
+        assert index.search(query, 6) == expected
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1"])
+def test_private_addresses_are_rejected(monkeypatch, address):
+    _fake_dns(monkeypatch, address)
+    with pytest.raises(ValueError):
+        net.resolve_public("http://images.example.com/a.jpg")
+
+
+def test_download_connects_to_the_validated_address(monkeypatch):
+    _fake_dns(monkeypatch, "93.184.216.34")
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=b"jpeg")
+
+    async def run():
+        index = ImageIndex()
+        index._ensure_loop_state()
+        index._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await index._download("https://images.example.com:8443/a.jpg")
+        finally:
+            await index.close()
+
+    assert asyncio.run(run()) == b"jpeg"
+    request = seen[0]
+    assert request.url.host == "93.184.216.34"
+    assert request.url.port == 8443
+    assert request.headers["host"] == "images.example.com:8443"
+    assert request.extensions["sni_hostname"] == "images.example.com"
+
+
+def test_redirect_to_private_address_is_rejected(monkeypatch):
+    def getaddrinfo(host, port, *args, **kwargs):
+        address = "10.0.0.1" if host == "internal.example.com" else "93.184.216.34"
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))]
+    monkeypatch.setattr(net.socket, "getaddrinfo", getaddrinfo)
+
+    def handler(request):
+        return httpx.Response(302, headers={"location": "http://internal.example.com/secret"})
+
+    async def run():
+        index = ImageIndex()
+        index._ensure_loop_state()
+        index._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            await index._download("http://images.example.com/a.jpg")
+        finally:
+            await index.close()
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+
+def _prior(content, conclusion="true"):
+    return {"verdict_id": "v1", "conclusion": conclusion, "confidence_score": 0.9, "summary": "",
+            "reasoning_chain": [], "content": content, "distance": 2}
+
+
+@pytest.fixture
+def indexed_image(monkeypatch):
+    async def hash_url(url):
+        return 1, 2
+
+    def install(prior):
+        async def lookup(hashes):
+            return dict(prior)
+        monkeypatch.setattr(routes.image_index, "hash_url", hash_url)
+        monkeypatch.setattr(routes.image_index, "lookup", lookup)
+        monkeypatch.setattr(ImageIndex, "available", property(lambda self: True))
+    return install
+
+
+def test_same_image_and_claim_reuses_verdict(indexed_image):
+    indexed_image(_prior("网传2020年武汉发生洪水"))
+    request = VerifyRequest(content="网传2020年武汉发生洪水！", image_url="https://images.example.com/a.jpg")
+    _, prior = asyncio.run(routes._image_lookup(request))
+    assert routes._reuses_verdict(prior)
+
+
+def test_reused_image_with_new_claim_is_verified_again(indexed_image, monkeypatch):
+    from benchmarks.mock_llm import MockLLM
+    from benchmarks.run import asgi_post
+    from main import app
+
+    indexed_image(_prior("2020年武汉洪水"))
+
+    async def index_image(*args):
+        return None
+    monkeypatch.setattr(routes, "_index_image", index_image)
+
+    payload = {"content": "今天北京发生特大洪水", "image_url": "https://images.example.com/a.jpg"}
+
+    async def run():
+        with MockLLM().installed():
+            return await asgi_post(app, "/api/verify", payload, 54000)
+
+    status, body, _ = asyncio.run(run())
+    assert status == 200
+    result = json.loads(body)
+    assert result["image_match"]["reused"] is False
+    assert result["image_match"]["original_conclusion"] == "true"
+    assert result["verdict_id"] != "v1"
+    assert "旧图新用" in result["reasoning_chain"][0]
+
+
+def test_importing_the_app_does_not_load_pillow():
+    import os
+    import subprocess
+    import sys
+
+    code = "import sys, main; sys.exit('PIL' in sys.modules)"
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True).returncode == 0
@@ -0,0 +1,55 @@
+"""增量 JSON 解析：任意切分喂入时结果与整体解析一致，数组元素完整后立即回调"""
+import json
+import random
+
+import pytest
+
+from app.core.json_stream import JSONStreamExtractor
+
+DOCUMENT = {
+    "core_claim": "某市地铁 {3号线} 停运, \"全线\" 关闭",
+    "entities": ["某市", "地铁\\3号线"],
+    "search_queries": ["某市 地铁 停运", "地铁3号线, 关闭 [通告]", {"q": "官方 通报", "lang": "zh"}],
+    "claims": [{"text": "3号线停运", "weight": 1.0}],
+    "confidence": 0.8,
+    "needs_clarification": False,
+}
+OUTPUT = "```json\n" + json.dumps(DOCUMENT, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _feed(chunks):
+    items = []
+    extractor = JSONStreamExtractor("search_queries", lambda item, fields: items.append((item, set(fields))))
+    for chunk in chunks:
+        extractor.feed(chunk)
+    return extractor, items
+
+
+def _split(text: str, seed: int):
+    rng = random.Random(seed)
+    cuts = sorted(rng.sample(range(1, len(text)), 20))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+@pytest.mark.parametrize("chunks", [[OUTPUT], list(OUTPUT)] + [_split(OUTPUT, seed) for seed in range(5)])
+def test_partial_feeds_match_whole_document(chunks):
+    extractor, items = _feed(chunks)
+    assert extractor.done
+    assert extractor.fields == DOCUMENT
+    assert [item for item, _ in items] == DOCUMENT["search_queries"]
+    # 元素回调时已能看到之前完成的字段
+    assert all({"core_claim", "entities"} <= fields for _, fields in items)
+
+
+def test_items_are_emitted_before_the_array_closes():
+    extractor, items = _feed(['{"core_claim": "停运", "search_queries": ["第一条", "第二'])
+    assert [item for item, _ in items] == ["第一条"]
+    assert not extractor.done
+    extractor.feed('条"]}')
+    assert [item for item, _ in items] == ["第一条", "第二条"]
+    assert extractor.fields["search_queries"] == ["第一条", "第二条"]
+
+
+def test_text_after_the_object_is_ignored():
+    extractor, _ = _feed(['{"confidence": 1}', ' {"confidence": 2}'])
+    assert extractor.fields == {"confidence": 1}
@@ -0,0 +1,62 @@
+"""API Key 池：限额响应头解析、429 / 401 后冷却、按已用额度选 Key"""
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.key_pool import KeyPool, parse_reset
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test-a")
+    monkeypatch.setattr(settings, "OPENAI_API_KEYS", ["sk-test-b", "sk-test-c@https://proxy.example.com/v1"])
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", None)
+    monkeypatch.setattr(settings, "LLM_KEY_COOLDOWN_SECONDS", 30.0)
+    return KeyPool()
+
+
+def _respond(key, status, headers=None):
+    key.started()
+    key.finished(httpx.Response(status, headers=headers or {}))
+
+
+@pytest.mark.parametrize("value, seconds", [("20ms", 0.02), ("6m0s", 360.0), ("1.5", 1.5), ("soon", None), (None, None)])
+def test_parse_reset(value, seconds):
+    assert parse_reset(value) == seconds
+
+
+def test_extra_keys_keep_their_own_endpoint(pool):
+    keys = pool._load()["openai"]
+    assert [k.api_key for k in keys] == ["sk-test-a", "sk-test-b", "sk-test-c"]
+    assert keys[2].base_url == "https://proxy.example.com/v1"
+
+
+@pytest.mark.parametrize("status, headers, cooldown", [
+    (429, {"retry-after": "5"}, 5.0),
+    (429, {"x-ratelimit-reset-requests": "2s", "x-ratelimit-reset-tokens": "8s"}, 8.0),
+    (429, {"retry-after": "600"}, 30.0),
+    (401, {}, 30.0),
+])
+def test_rejected_key_cools_down(pool, status, headers, cooldown):
+    first = pool.acquire("openai")
+    now = time.monotonic()
+    _respond(first, status, headers)
+    assert first.cooldown_until - now == pytest.approx(cooldown, abs=0.5)
+    assert all(pool.acquire("openai") is not first for _ in range(5))
+
+
+def test_least_used_key_is_chosen(pool):
+    keys = pool._load()["openai"]
+    _respond(keys[0], 200, {"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "10"})
+    _respond(keys[1], 200, {"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "90"})
+    _respond(keys[2], 200, {"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "50"})
+    assert pool.acquire("openai") is keys[1]
+
+
+def test_all_keys_cooling_picks_the_first_to_recover(pool):
+    keys = pool._load()["openai"]
+    for key, wait in zip(keys, ("20", "3", "9")):
+        _respond(key, 429, {"retry-after": wait})
+    assert pool.acquire("openai") is keys[1]
@@ -0,0 +1,103 @@
+"""信源链接检查：状态判定、HEAD 被拒时改用 GET、并发去重、连接失败时保留信源、不访问内网地址"""
+import asyncio
+import socket
+
+import httpx
+
+from app.services import net
+from app.services.links import ALIVE, DEAD, UNKNOWN, LinkChecker
+
+
+def _checker(handler) -> LinkChecker:
+    checker = LinkChecker()
+    checker.configure(transport=httpx.MockTransport(handler), persist=False)
+    return checker
+
+
+def test_statuses_and_head_fallback():
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        path = request.url.path
+        if path == "/gone":
+            return httpx.Response(404)
+        if path == "/no-head":
+            return httpx.Response(405 if request.method == "HEAD" else 206)
+        if path == "/blocked":
+            return httpx.Response(403)
+        return httpx.Response(200)
+
+    urls = ["https://a.example.com/ok", "https://a.example.com/gone", "https://b.example.com/no-head",
+            "https://c.example.com/blocked", "ftp://a.example.com/file"]
+    results = asyncio.run(_checker(handler).check(urls))
+    assert results == {urls[0]: ALIVE, urls[1]: DEAD, urls[2]: ALIVE, urls[3]: UNKNOWN, urls[4]: DEAD}
+    assert ("GET", "/no-head") in requests
+    assert ("GET", "/ok") not in requests
+
+
+def test_concurrent_checks_of_the_same_link_share_one_request():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200)
+
+    checker = _checker(handler)
+
+    async def run():
+        url = "https://a.example.com/news"
+        return await asyncio.gather(checker.check([url]), checker.check([url, url]))
+
+    first, second = asyncio.run(run())
+    assert first == second == {"https://a.example.com/news": ALIVE}
+    assert calls == ["HEAD"]
+
+
+def test_connection_failures_keep_sources():
+    def handler(request):
+        raise httpx.ConnectError("unreachable", request=request)
+
+    urls = [f"https://host{i}.example.com/" for i in range(3)]
+    results = asyncio.run(_checker(handler).check(urls[:1]))
+    assert results == {urls[0]: UNKNOWN}
+    results = asyncio.run(_checker(handler).check(urls))
+    assert set(results.values()) == {UNKNOWN}
+
+
+def _real_checker(monkeypatch, addresses):
+    """不使用模拟传输的检查器，DNS 解析结果由 addresses 给出"""
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host not in addresses:
+            raise socket.gaierror("Name or service not known")
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (addresses[host], port))]
+    monkeypatch.setattr(net.socket, "getaddrinfo", getaddrinfo)
+    checker = LinkChecker()
+    checker.configure(persist=False)
+    return checker
+
+
+def test_internal_addresses_are_never_requested(monkeypatch):
+    checker = _real_checker(monkeypatch, {"metadata.example.com": "169.254.169.254", "localhost": "127.0.0.1"})
+    urls = ["http://metadata.example.com/latest/meta-data/", "http://localhost:8000/api/metrics"]
+
+    async def run():
+        try:
+            return await checker.check(urls)
+        finally:
+            await checker.close()
+
+    assert asyncio.run(run()) == {url: DEAD for url in urls}
+
+
+def test_unresolvable_host_is_unknown(monkeypatch):
+    checker = _real_checker(monkeypatch, {})
+
+    async def run():
+        try:
+            return await checker.check(["https://no-such-host.example.com/a"])
+        finally:
+            await checker.close()
+
+    assert asyncio.run(run()) == {"https://no-such-host.example.com/a": UNKNOWN}
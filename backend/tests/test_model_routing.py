@@ -0,0 +1,74 @@
+"""阶段路由：覆盖配置的解析、fast 档响应无法解析或置信度过低时升级到 strong 档"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.circuit_breaker import breakers
+from app.core.config import settings
+from app.core.model_routing import DEFAULT_ROUTES, ModelRouter, StageRoute
+
+
+@pytest.fixture(autouse=True)
+def tiers(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_PROVIDER", "none")
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "fast-model")
+    monkeypatch.setattr(settings, "LLM_STRONG_MODEL", "strong-model")
+    monkeypatch.setattr(settings, "LLM_ESCALATION_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_STAGES", [])
+    breakers.reset()
+    yield
+    breakers.reset()
+
+
+def _call(router, stage, responses):
+    calls = []
+
+    async def request(model, max_tokens, provider):
+        calls.append((model, max_tokens, provider))
+        return responses[model]
+
+    text = asyncio.run(router.call("verdict", stage, "提示词", request, "default-model"))
+    return text, calls
+
+
+def test_overrides_change_tier_and_max_tokens():
+    router = ModelRouter(DEFAULT_ROUTES, {"summary": "strong:800", "synthesis": ":1200", "custom": "strong"})
+    assert router.route("summary") == StageRoute("summary", "strong", 800)
+    assert router.route("synthesis").tier == "fast"
+    assert router.route("synthesis").max_tokens == 1200
+    assert router.route("synthesis").confidence_key == "confidence_score"
+    assert router.route("custom") == StageRoute("custom", "strong", 2000)
+
+
+def test_unknown_tier_is_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter(DEFAULT_ROUTES, {"summary": "huge:800"})
+
+
+def test_unparseable_fast_response_is_escalated():
+    router = ModelRouter(DEFAULT_ROUTES)
+    text, calls = _call(router, "summary", {"fast-model": "不是 JSON", "strong-model": '{"summary": "ok"}'})
+    assert text == '{"summary": "ok"}'
+    assert [model for model, _, _ in calls] == ["fast-model", "strong-model"]
+
+
+@pytest.mark.parametrize("confidence, escalated", [(0.2, True), (0.9, False)])
+def test_low_confidence_is_escalated(confidence, escalated):
+    router = ModelRouter(DEFAULT_ROUTES)
+    fast = json.dumps({"confidence_score": confidence})
+    text, calls = _call(router, "synthesis", {"fast-model": fast, "strong-model": '{"confidence_score": 0.95}'})
+    assert len(calls) == (2 if escalated else 1)
+    assert (text != fast) == escalated
+
+
+def test_strong_stage_and_shared_model_are_not_escalated(monkeypatch):
+    router = ModelRouter(DEFAULT_ROUTES)
+    _, calls = _call(router, "article", {"strong-model": "不是 JSON"})
+    assert calls == [("strong-model", 4000, "openai")]
+
+    monkeypatch.setattr(settings, "LLM_STRONG_MODEL", None)
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", None)
+    _, calls = _call(router, "summary", {"default-model": "不是 JSON"})
+    assert calls == [("default-model", 300, "openai")]
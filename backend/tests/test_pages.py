@@ -0,0 +1,112 @@
+"""网页正文提取：编码识别、TextExtractor 对常见页面结构的处理、只访问公网地址、正文不返回客户端"""
+import asyncio
+import json
+import os
+import socket
+
+import httpx
+import pytest
+
+from app.api.sse import SSEStream
+from app.core import serialization
+from app.models.source import Source
+from app.services import net
+from app.services.pages import PageFetcher, TextExtractor, detect_encoding
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "pages")
+BODY = "<p>经核查，该公司生产经营正常，未向法院提出破产申请，相关信息不实。</p>"
+
+
+def _extract(html: str) -> TextExtractor:
+    extractor = TextExtractor(2000)
+    extractor.feed(html)
+    extractor.close()
+    return extractor
+
+
+def test_gbk_fixture_is_detected_and_extracted():
+    with open(os.path.join(FIXTURES, "www.gov.cn", "zhengce", "notice.html"), "rb") as f:
+        raw = f.read()
+    encoding = detect_encoding(raw[:1024], "text/html")
+    assert encoding == "gb18030"
+    extractor = _extract(raw.decode(encoding))
+    assert extractor.title == "关于网传“某科技公司破产”信息的情况通报"
+    assert "未向法院提出破产申请" in extractor.text()
+    assert "首页" not in extractor.text()
+
+
+def test_gbk_without_charset_falls_back_to_gb18030():
+    raw = f"<html><body>{BODY}</body></html>".encode("gbk")
+    assert detect_encoding(raw) == "gb18030"
+    assert detect_encoding(raw, "text/html; charset=utf-8") == "utf-8"
+
+
+def test_page_wrapped_in_form_keeps_its_text():
+    html = f'<html><head><title>通报</title></head><body><form runat="server">{BODY}</form></body></html>'
+    assert "未向法院提出破产申请" in _extract(html).text()
+
+
+def test_missing_head_end_tag_does_not_hide_the_body():
+    html = f"<html><head><title>通报</title><meta charset=\"utf-8\"><body>{BODY}</body></html>"
+    extractor = _extract(html)
+    assert extractor.title == "通报"
+    assert "未向法院提出破产申请" in extractor.text()
+
+
+def _fake_dns(monkeypatch, addresses):
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (addresses[host], port))]
+    monkeypatch.setattr(net.socket, "getaddrinfo", getaddrinfo)
+
+
+def _download(url, handler):
+    async def run():
+        fetcher = PageFetcher()
+        fetcher._ensure_client()
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await fetcher._download(url)
+        finally:
+            await fetcher.close()
+    return asyncio.run(run())
+
+
+def test_fetch_connects_to_the_validated_address(monkeypatch):
+    _fake_dns(monkeypatch, {"news.example.com": "93.184.216.34"})
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, headers={"content-type": "text/html; charset=utf-8"},
+                              content=f"<html><body>{BODY}</body></html>".encode())
+
+    page = _download("https://news.example.com/a.html", handler)
+    assert "未向法院提出破产申请" in page["text"]
+    assert page["url"] == "https://news.example.com/a.html"
+    assert seen[0].url.host == "93.184.216.34"
+    assert seen[0].headers["host"] == "news.example.com"
+
+
+@pytest.mark.parametrize("location", ["http://metadata.example.com/latest/meta-data/", "file:///etc/passwd"])
+def test_redirect_to_internal_address_is_not_followed(monkeypatch, location):
+    _fake_dns(monkeypatch, {"news.example.com": "93.184.216.34", "metadata.example.com": "169.254.169.254"})
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.host)
+        return httpx.Response(302, headers={"location": location})
+
+    with pytest.raises(net.UnsafeAddress):
+        _download("http://news.example.com/a.html", handler)
+    assert seen == ["93.184.216.34"]
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_page_text_is_not_sent_to_clients(monkeypatch, backend):
+    monkeypatch.setattr(serialization, "_dumps", serialization._BACKENDS[backend]())
+    source = Source(evidence_id="e1", title="通报", page_text="内网页面内容")
+    encoded = SSEStream().event({"type": "result", "data": {"all_sources": SSEStream().fragment_list([source])}})
+    payload = json.loads(encoded.split(b"data: ", 1)[1])
+    assert payload["data"]["all_sources"][0]["title"] == "通报"
+    assert "page_text" not in payload["data"]["all_sources"][0]
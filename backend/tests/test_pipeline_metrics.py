@@ -0,0 +1,41 @@
+"""流水线指标：每个开始的流水线都以完成、失败、取消或转入后台之一结束"""
+import asyncio
+
+import pytest
+
+from app.agents.parser import ParserAgent
+from app.core.metrics import metrics
+
+CLARIFICATION = {"needs_clarification": True, "clarification_prompt": "请说明具体的时间和地点"}
+
+
+@pytest.fixture
+def vague_parser(monkeypatch):
+    async def parse(self, content, handoff=None):
+        return CLARIFICATION
+
+    async def parse_stream(self, content, handoff=None):
+        yield {"type": "result", "agent": "parser", "data": CLARIFICATION}
+
+    monkeypatch.setattr(ParserAgent, "parse", parse)
+    monkeypatch.setattr(ParserAgent, "parse_stream", parse_stream)
+
+
+def _counter(name: str, endpoint: str, **labels) -> float:
+    labels = {"endpoint": endpoint, **labels}
+    key = name + "{" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}"
+    return metrics.snapshot()["counters"].get(key, 0)
+
+
+@pytest.mark.parametrize("path, endpoint", [("/api/verify", "verify"), ("/api/verify/stream", "verify_stream")])
+def test_clarification_counts_as_completed(vague_parser, path, endpoint):
+    from benchmarks.run import asgi_post
+    from main import app
+
+    started = _counter("pipeline_started", endpoint)
+    completed = _counter("pipeline_completed", endpoint, outcome="clarification")
+    status, body, _ = asyncio.run(asgi_post(app, path, {"content": "听说那边出事了"}, 54100))
+    assert status == 200
+    assert "请说明具体的时间和地点".encode() in body
+    assert _counter("pipeline_started", endpoint) == started + 1
+    assert _counter("pipeline_completed", endpoint, outcome="clarification") == completed + 1
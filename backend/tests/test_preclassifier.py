@@ -0,0 +1,40 @@
+"""输入预分类器：明显无法核实的输入直接澄清，其余交给 LLM"""
+import pytest
+
+from app.agents.preclassifier import clarification_for, get_classifier
+
+
+@pytest.mark.parametrize("content", [
+    "Elon Musk died yesterday",
+    "5G towers spread covid",
+    "COVID-19 vaccine contains microchips",
+    "Apple announced bankruptcy",
+    "hidden cameras found in hotel rooms",
+    "testing shows tap water contains lead",
+    "为什么说某地出现了疫情？",
+    "网传某明星因吸毒被捕",
+    "隔夜菜会致癌吗",
+    "测试显示某品牌奶粉含有三聚氰胺",
+])
+def test_claims_reach_llm(content):
+    assert clarification_for(content) is None
+
+
+@pytest.mark.parametrize("content, input_type", [
+    ("我觉得现在的科技公司都太不靠谱了", "opinion"),
+    ("请问有什么好用的手机推荐吗？", "question"),
+    ("你好，在吗", "non_event"),
+    ("hello", "non_event"),
+    ("12345", "non_event"),
+    ("hi", "too_short"),
+])
+def test_unverifiable_input_is_clarified(content, input_type):
+    result = clarification_for(content)
+    assert result is not None
+    assert result["input_type"] == input_type
+    assert result["clarification_prompt"]
+
+
+def test_english_text_is_scored_by_rules_only():
+    label, confidence = get_classifier().classify("Apple announced bankruptcy")
+    assert confidence < 0.5
@@ -0,0 +1,50 @@
+"""Agent 单例：首次访问时才创建、后台预热不包含新闻稿 Agent、预热连接失败只记录日志"""
+import asyncio
+
+import pytest
+
+from app.agents import registry
+from app.agents.registry import AgentRegistry
+from app.core.config import settings
+from app.core.key_pool import ApiKey, KeyPool
+
+
+def test_agents_are_created_on_first_use():
+    agents = AgentRegistry()
+    assert "parser" not in vars(agents)
+    assert agents.parser is agents.parser
+    assert agents.claims.search_agent is agents.search
+    assert "article" not in vars(agents)
+
+
+def test_warm_up_prepares_the_pipeline_without_the_article_agent(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "claude")
+    monkeypatch.setattr(settings, "PRECLASSIFIER_ENABLED", False)
+    calls = []
+
+    async def warm_up(providers, timeout):
+        calls.append(("warm_up", providers))
+
+    monkeypatch.setattr(registry.key_pool, "prepare", lambda providers: calls.append(("prepare", providers)))
+    monkeypatch.setattr(registry.key_pool, "warm_up", warm_up)
+    agents = AgentRegistry()
+    asyncio.run(agents.warm_up())
+    assert calls == [("prepare", ["claude"]), ("warm_up", ["claude"])]
+    assert {"parser", "search", "verdict", "claims"} <= set(vars(agents))
+    assert "article" not in vars(agents)
+
+
+@pytest.mark.parametrize("failure", ["error", "hang"])
+def test_failed_connection_warm_up_is_only_logged(monkeypatch, failure, capsys):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test-a")
+    monkeypatch.setattr(settings, "OPENAI_API_KEYS", ["sk-test-b"])
+
+    async def warm_up(key):
+        if failure == "error" and key.index == 0:
+            raise ConnectionError("refused")
+        if failure == "hang" and key.index == 0:
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(ApiKey, "warm_up", warm_up)
+    asyncio.run(KeyPool().warm_up(["openai"], 0.05))
+    assert "Warmed 1/2 keys" in capsys.readouterr().out
@@ -0,0 +1,118 @@
+"""LLM 调度：interactive 预留名额、加权公平放行、取消排队、AIMD 上调与下调"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.scheduler import LLMScheduler, lower_priority, priority_scope
+
+
+class Throttled(Exception):
+    status_code = 429
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENT_CALLS", 2)
+    monkeypatch.setattr(settings, "LLM_INTERACTIVE_RESERVED_CALLS", 1)
+    monkeypatch.setattr(settings, "LLM_AIMD_ENABLED", False)
+    return LLMScheduler()
+
+
+async def _hold(scheduler, priority, started, release):
+    with priority_scope(priority):
+        async with scheduler.slot():
+            started.append(priority)
+            await release.wait()
+
+
+def test_interactive_overtakes_queued_background_calls(scheduler):
+    async def run():
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(_hold(scheduler, p, started, release))
+                 for p in ("background", "background", "interactive")]
+        await asyncio.sleep(0.01)
+        # 第二个 background 不能占用预留名额，interactive 越过它先放行
+        assert started == ["background", "interactive"]
+        assert scheduler.queued == 1
+        release.set()
+        await asyncio.gather(*tasks)
+        return started, scheduler.total_running
+
+    started, running = asyncio.run(run())
+    assert started == ["background", "interactive", "background"]
+    assert running == 0
+
+
+def test_cancelled_waiter_leaves_the_queue(scheduler):
+    async def run():
+        started, release = [], asyncio.Event()
+        holders = [asyncio.create_task(_hold(scheduler, "interactive", started, release)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(_hold(scheduler, "batch", started, release))
+        await asyncio.sleep(0.01)
+        assert scheduler.queued == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        queued = scheduler.queued
+        release.set()
+        await asyncio.gather(*holders)
+        return queued, started, scheduler.total_running
+
+    assert asyncio.run(run()) == (0, ["interactive", "interactive"], 0)
+
+
+def test_throttling_lowers_the_limit_once_per_cooldown(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_AIMD_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENT_CALLS", 10)
+    assert scheduler.limit == 10
+    scheduler.record("verdict", 1.0, Throttled())
+    scheduler.record("verdict", 1.0, Throttled())
+    assert scheduler.limit == 7
+    # 请求本身的错误不影响并发上限
+    scheduler.record("verdict", 1.0, ValueError("bad request"))
+    assert scheduler.limit == 7
+
+
+@pytest.fixture
+def aimd(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_AIMD_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENT_CALLS", 4)
+    monkeypatch.setattr(settings, "LLM_AIMD_MIN_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "LLM_AIMD_MAX_CONCURRENCY", 6)
+    monkeypatch.setattr(settings, "LLM_AIMD_COOLDOWN_SECONDS", 0.0)
+    return scheduler
+
+
+def test_limit_grows_by_one_per_round_only_when_saturated(aimd):
+    for _ in range(8):
+        aimd.record("verdict", 1.0)
+    # 名额没有用满时不上调
+    assert aimd.limit == 4
+    aimd.running["interactive"] = 4
+    # 每次成功加 1 / 上限，约一轮（上限个数的调用）加一
+    for _ in range(5):
+        aimd.record("verdict", 1.0)
+    assert aimd.limit == 5
+    aimd.running["interactive"] = 6
+    for _ in range(20):
+        aimd.record("verdict", 1.0)
+    assert aimd.limit == 6
+
+
+def test_timeouts_and_latency_inflation_lower_the_limit(aimd):
+    aimd.record("verdict", 1.0, asyncio.TimeoutError())
+    assert aimd.limit == 2
+    aimd.record("verdict", 1.0, asyncio.TimeoutError())
+    assert aimd.limit == 2
+
+    aimd._limit = 4.0
+    aimd.record("search", 1.0)
+    aimd.record("search", 5.0)
+    assert aimd.limit == 2
+
+
+def test_clients_can_only_lower_priority():
+    assert lower_priority("interactive", "batch") == "batch"
+    assert lower_priority("background", "interactive") == "background"
+    assert lower_priority("interactive", "urgent") == "interactive"
@@ -0,0 +1,61 @@
+"""Search Agent：自适应搜索深度（提前结束、争议时扩展）与分析模式"""
+import asyncio
+
+import pytest
+
+from app.agents.search import SearchAgent
+from app.core.analysis_mode import mode_scope
+from app.core.config import settings
+
+PARSER_RESULT = {"search_queries": ["某公司 破产 公告", "某公司 裁员", "某公司 官方声明"],
+                 "analysis": {"core_question": "某公司是否破产"}}
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_ADAPTIVE", True)
+    monkeypatch.setattr(settings, "SEARCH_MIN_QUERIES", 1)
+    monkeypatch.setattr(settings, "SEARCH_QUERY_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "LINK_CHECK_ENABLED", False)
+    monkeypatch.setattr(settings, "PAGE_FETCH_ENABLED", False)
+
+
+def _search(mode):
+    from benchmarks.mock_llm import MockLLM
+
+    async def run():
+        with MockLLM().installed(), mode_scope(mode):
+            return await SearchAgent().search(PARSER_RESULT, "某公司宣布破产")
+    return asyncio.run(run())["search_metadata"]
+
+
+@pytest.mark.parametrize("mode, depth, queries", [("deep", "deep", 3), ("standard", "basic", 1)])
+def test_sufficient_evidence_ends_early_except_in_deep_mode(adaptive, monkeypatch, mode, depth, queries):
+    monkeypatch.setattr(settings, "SEARCH_SUFFICIENCY_THRESHOLD", 0.0)
+    metadata = _search(mode)
+    assert metadata["analysis_depth"] == depth
+    assert metadata["executed_queries"] == queries
+
+
+def test_contested_evidence_expands_the_search(adaptive, monkeypatch):
+    from app.agents import search
+    from app.agents.sufficiency import Sufficiency
+
+    monkeypatch.setattr(settings, "SEARCH_MAX_QUERIES", 3)
+    monkeypatch.setattr(settings, "SEARCH_EXPANDED_MAX_QUERIES", 5)
+    monkeypatch.setattr(search, "assess_sufficiency", lambda sources: Sufficiency(0.5, 1.0, 0.5, True, "supportive"))
+    metadata = _search("standard")
+    assert metadata["search_mode"] == "expanded"
+    assert metadata["executed_queries"] == 5
+    assert metadata["total_queries"] == 3 + len(search.EXPANSION_SUFFIXES)
+
+
+def test_fixed_search_without_adaptive(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_ADAPTIVE", False)
+    monkeypatch.setattr(settings, "SEARCH_MAX_QUERIES", 2)
+    monkeypatch.setattr(settings, "LINK_CHECK_ENABLED", False)
+    monkeypatch.setattr(settings, "PAGE_FETCH_ENABLED", False)
+    metadata = _search("standard")
+    assert metadata["search_mode"] == "standard"
+    assert metadata["executed_queries"] == 2
+    assert metadata["analysis_depth"] == "standard"
@@ -0,0 +1,58 @@
+"""一次鉴定内共享的搜索结果池"""
+import asyncio
+
+from app.agents.search import SearchPool
+from app.models.source import Source
+
+
+def _speculated(*queries):
+    pool = SearchPool()
+    pool.speculative.extend(queries)
+    return pool
+
+
+def test_match_reuses_near_duplicate_speculative_query():
+    pool = _speculated("某科技公司宣布破产 官方通报")
+    assert pool.match("某科技公司宣布破产官方通报") == "某科技公司宣布破产 官方通报"
+
+
+def test_match_does_not_treat_substring_as_duplicate():
+    pool = _speculated("近日网传消息称某知名科技公司宣布破产数千名员工失业 官方通报")
+    assert pool.match("公司破产") is None
+
+
+def test_fetch_runs_each_query_once_and_copies_sources():
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {"sources": [Source.from_llm({"title": "官方通报"})]}
+
+    async def run():
+        pool = SearchPool()
+        first, second = await asyncio.gather(pool.fetch("公司 破产", search), pool.fetch("公司  破产", search))
+        pool.close()
+        return pool, first, second
+
+    pool, first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert pool.shared == 1
+    assert first["sources"][0] is not second["sources"][0]
+
+
+def _plan(parser_queries, *speculative):
+    from app.agents.search import SearchAgent
+    return SearchAgent._plan_queries(object.__new__(SearchAgent), parser_queries, _speculated(*speculative))
+
+
+def test_parser_queries_are_planned_before_speculative_ones():
+    speculative = ["某科技公司宣布破产", "某科技公司宣布破产 官方通报", "某科技公司宣布破产 最新消息"]
+    parser = ["某科技公司 破产 法院公告", "某科技公司 员工 裁员", "某科技公司 官方声明", "破产 谣言 辟谣"]
+    assert _plan(parser, *speculative) == parser + speculative
+
+
+def test_duplicate_parser_query_takes_the_speculative_result():
+    speculative = ["某科技公司宣布破产", "某科技公司宣布破产 官方通报"]
+    planned = _plan(["某科技公司 员工 裁员", "某科技公司宣布破产官方通报"], *speculative)
+    assert planned == ["某科技公司 员工 裁员", "某科技公司宣布破产 官方通报", "某科技公司宣布破产"]
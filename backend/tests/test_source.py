@@ -0,0 +1,46 @@
+"""信源记录：LLM 字典的规范化、完整度比较、对外字段与 Evidence 校验"""
+from app.models.source import Source
+
+
+def test_from_llm_normalizes_fields():
+    source = Source.from_llm({
+        "evidence_id": 7,
+        "title": None,
+        "publish_time": "",
+        "source_credibility": " HIGH ",
+        "source_stance": "hostile",
+        "relevance_score": "1.7",
+        "evidence_type": None,
+    })
+    assert source.evidence_id == "7"
+    assert source.title == ""
+    assert source.publish_time is None
+    assert source.source_credibility == "high"
+    assert source.source_stance == "neutral"
+    assert source.relevance_score == 1.0
+    assert source.evidence_type == "primary"
+    assert source.source_category == "news"
+
+
+def test_missing_or_invalid_scores_use_the_default():
+    assert Source.from_llm({"relevance_score": "很高"}).relevance_score == 0.8
+    assert Source.from_llm({"relevance_score": 0}).relevance_score == 0.8
+    assert Source.from_llm({"relevance_score": -0.5}).relevance_score == 0.0
+
+
+def test_missing_evidence_ids_are_unique():
+    assert Source.from_llm({}).evidence_id != Source.from_llm({}).evidence_id
+
+
+def test_completeness_counts_filled_fields():
+    sparse = Source.from_llm({"evidence_id": "e1"})
+    rich = Source.from_llm({"evidence_id": "e1", "title": "通报", "source_url": "https://www.gov.cn/a"})
+    assert rich.completeness() == sparse.completeness() + 2
+
+
+def test_evidence_is_validated_from_attributes():
+    source = Source.from_llm({"evidence_id": "e1", "title": "通报", "publish_time": "2024-05-01"})
+    evidence = source.to_evidence()
+    assert evidence.evidence_id == "e1"
+    assert evidence.title == "通报"
+    assert source.to_dict()["publish_time"] == "2024-05-01"
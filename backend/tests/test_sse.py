@@ -0,0 +1,67 @@
+"""SSE 编码：事件 id 递增、信源只编码一次、原始片段不会被内容伪造、空闲时发送心跳"""
+import asyncio
+import json
+
+import pytest
+
+from app.api.sse import HEARTBEAT, SSEStream, with_heartbeat
+from app.core import serialization
+from app.models.source import Source
+
+
+def _payload(encoded: bytes):
+    return json.loads(encoded.split(b"data: ", 1)[1])
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(serialization, "_dumps", serialization._BACKENDS[request.param]())
+    return request.param
+
+
+def test_event_ids_increase():
+    stream = SSEStream()
+    assert stream.event({"type": "a"}).startswith(b"id: 1\n")
+    assert stream.event({"type": "b"}).startswith(b"id: 2\n")
+
+
+def test_same_source_is_encoded_once(backend):
+    stream = SSEStream()
+    source = Source(evidence_id="e1", title="通报")
+    first = stream.fragment_list([source])
+    second = stream.fragment_list([source, source])
+    assert first.data == b"[" + stream.encode_once(source) + b"]"
+    assert len(stream._fragments) == 1
+    payload = _payload(stream.event({"a": first, "b": second}))
+    assert [item["title"] for item in payload["b"]] == ["通报", "通报"]
+
+
+def test_content_that_looks_like_a_placeholder_is_kept_verbatim(backend):
+    stream = SSEStream()
+    spoof = "\x00raw:0\x00"
+    source = Source(evidence_id="e1", title=spoof)
+    payload = _payload(stream.event({"claim": spoof, "sources": stream.fragment_list([source])}))
+    assert payload["claim"] == spoof
+    assert payload["sources"][0]["title"] == spoof
+
+
+def test_heartbeat_is_sent_while_idle():
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        chunks = []
+
+        async def consume():
+            async for chunk in with_heartbeat(queue, 0.01, done):
+                chunks.append(chunk)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        await queue.put(b"event")
+        await queue.put(done)
+        await task
+        return chunks
+
+    chunks = asyncio.run(run())
+    assert HEARTBEAT in chunks
+    assert chunks[-1] == b"event"
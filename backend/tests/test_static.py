@@ -0,0 +1,62 @@
+"""生产部署：worker 数默认值、前端静态文件的缓存策略、预压缩文件与无扩展名路径"""
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.api.static import IMMUTABLE_CACHE, REVALIDATE_CACHE, FrontendFiles, compress_directory
+from app.core.config import settings
+
+SCRIPT = b"console.log('aletheia');\n" * 100
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "_next" / "static").mkdir(parents=True)
+    (tmp_path / "_next" / "static" / "app.3f9a.js").write_bytes(SCRIPT)
+    (tmp_path / "index.html").write_text("<html>首页</html>", encoding="utf-8")
+    (tmp_path / "about.html").write_text("<html>关于</html>", encoding="utf-8")
+    assert compress_directory(str(tmp_path)) >= 1
+    app = Starlette(routes=[Mount("/", FrontendFiles(directory=str(tmp_path), html=True))])
+    return TestClient(app)
+
+
+def test_hashed_assets_are_immutable_and_html_revalidates(client):
+    assert client.get("/_next/static/app.3f9a.js").headers["cache-control"] == IMMUTABLE_CACHE
+    assert client.get("/").headers["cache-control"] == REVALIDATE_CACHE
+
+
+def test_precompressed_variant_is_served_when_accepted(client):
+    response = client.get("/_next/static/app.3f9a.js", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == SCRIPT
+    assert int(response.headers["content-length"]) < len(SCRIPT)
+
+    plain = client.get("/_next/static/app.3f9a.js", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == SCRIPT
+
+
+def test_extensionless_path_resolves_to_html(client):
+    response = client.get("/about")
+    assert response.status_code == 200
+    assert "关于" in response.text
+
+
+def test_unchanged_file_is_not_resent(client):
+    etag = client.get("/").headers["etag"]
+    assert client.get("/", headers={"if-none-match": etag}).status_code == 304
+
+
+def test_worker_count_defaults_to_one(monkeypatch):
+    import main
+
+    assert type(settings).model_fields["WEB_CONCURRENCY"].default == 1
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    assert main.worker_count() == 1
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    assert main.worker_count() == 3
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 0)
+    monkeypatch.setattr(main.os, "sched_getaffinity", lambda pid: {0, 1, 2, 3, 4}, raising=False)
+    assert main.worker_count() == 5
@@ -0,0 +1,37 @@
+"""证据充分度：覆盖度与立场一致度、重复链接不重复计数、争议判定"""
+from app.agents.sufficiency import assess_sufficiency
+from app.models.source import Source
+
+
+def _source(stance, credibility="high", url="", relevance=1.0):
+    return Source(evidence_id=url or stance, source_stance=stance, source_credibility=credibility,
+                  source_url=url, relevance_score=relevance)
+
+
+def test_two_agreeing_authoritative_sources_are_sufficient():
+    result = assess_sufficiency([_source("opposing", url="https://a"), _source("opposing", url="https://b")])
+    assert result.score == 1.0
+    assert result.dominant_stance == "opposing"
+    assert not result.contested
+
+
+def test_neutral_sources_never_count_as_sufficient():
+    result = assess_sufficiency([_source("neutral", url=f"https://{i}") for i in range(5)])
+    assert result.coverage == 1.0
+    assert result.score == 0.0
+    assert result.dominant_stance == "unclear"
+
+
+def test_duplicate_urls_are_counted_once():
+    result = assess_sufficiency([_source("supportive", url="https://a"), _source("supportive", url="https://a")])
+    assert result.coverage == 0.5
+
+
+def test_contested_needs_both_share_and_mass():
+    contested = assess_sufficiency([_source("supportive", url="https://a"), _source("opposing", url="https://b")])
+    assert contested.contested
+    assert contested.agreement == 0.5
+    # 少数立场占比够但证据量不足（低可信度）时不算争议
+    weak = assess_sufficiency([_source("supportive", url="https://a"),
+                               _source("opposing", "low", url="https://b")])
+    assert not weak.contested
@@ -0,0 +1,36 @@
+"""文本相似度与主张去重"""
+import pytest
+
+from app.agents.parser import ParserAgent
+from app.core.text import bigram_similarity, normalize_text
+
+
+def test_normalize_text_strips_punctuation_and_case():
+    assert normalize_text(" 网传：Apple 破产！") == "网传apple破产"
+
+
+def test_bigram_similarity_is_plain_jaccard():
+    assert bigram_similarity("公司破产", "公司破产") == 1.0
+    assert bigram_similarity("", "公司破产") == 0.0
+    # 包含关系不等于相同
+    assert bigram_similarity("公司破产", "公司破产导致数千名员工失业") == pytest.approx(3 / 12)
+    assert bigram_similarity("某公司宣布破产", "某公司已宣布破产") >= 0.6
+
+
+def _claims(*texts):
+    analysis = {"core_question": "整体", "search_queries": ["整体"],
+                "claims": [{"claim_text": text, "search_queries": [text]} for text in texts]}
+    # _extract_claims 不使用实例状态，不必构造（会创建 LLM 客户端）
+    return ParserAgent._extract_claims(object.__new__(ParserAgent), analysis, "整体")
+
+
+def test_contained_claim_is_kept_separate():
+    claims = _claims("公司破产", "公司破产导致数千名员工失业")
+    assert [c["claim_text"] for c in claims] == ["公司破产", "公司破产导致数千名员工失业"]
+    assert [c["claim_id"] for c in claims] == ["c1", "c2"]
+
+
+def test_near_duplicate_claims_are_merged():
+    claims = _claims("某公司宣布破产", "某公司已宣布破产", "数千名员工失业")
+    assert [c["claim_text"] for c in claims] == ["某公司宣布破产", "数千名员工失业"]
+    assert claims[0]["search_queries"] == ["某公司宣布破产", "某公司已宣布破产"]
@@ -0,0 +1,67 @@
+"""综合判断调用中途耗尽时延预算时按证据权重降级判定"""
+import asyncio
+
+import pytest
+
+from app.agents.verdict import VerdictAgent
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.models.source import Source
+from benchmarks.mock_llm import MockLLM, detect_stage
+
+
+def _search_result():
+    sources = [
+        Source.from_llm({"source_url": f"https://{domain}/a", "source_domain": domain, "title": domain,
+                         "source_credibility": credibility, "source_stance": stance, "relevance_score": 0.9})
+        for domain, credibility, stance in [
+            ("gov.cn", "high", "opposing"),
+            ("xinhuanet.com", "high", "opposing"),
+            ("weibo.com", "low", "supportive"),
+        ]
+    ]
+    return {"search_id": "s1", "key_sources": sources[:2], "regular_sources": sources[2:],
+            "all_sources": sources, "analysis": {}, "query_analysis": {}}
+
+
+@pytest.fixture
+def slow_synthesis(monkeypatch):
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_ENABLED", False)
+    monkeypatch.setattr(settings, "DEADLINE_MIN_CALL_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "DEADLINE_OPTIONAL_STAGE_SECONDS", 0.05)
+    mock = MockLLM()
+    with mock.installed():
+        respond = VerdictAgent._request_llm
+
+        async def request(agent, prompt, *args, **kwargs):
+            if detect_stage(prompt) == "synthesis":
+                await asyncio.sleep(10)
+            return await respond(agent, prompt, *args, **kwargs)
+
+        monkeypatch.setattr(VerdictAgent, "_request_llm", request)
+        yield
+
+
+def test_verdict_degrades_when_synthesis_runs_out_of_budget(slow_synthesis):
+    async def run():
+        with deadline_scope(0.5) as deadline:
+            result = await VerdictAgent().verdict(_search_result(), "某公司已经破产")
+            return result, deadline.degraded_stages
+
+    result, degraded_stages = asyncio.run(run())
+    assert "synthesis" in degraded_stages
+    assert result["conclusion"] == "false"
+    assert "无法完成鉴定" not in result["conclusion_summary"]
+    assert result["evidence_chain"]
+
+
+def test_verdict_stream_degrades_when_synthesis_runs_out_of_budget(slow_synthesis):
+    async def run():
+        with deadline_scope(0.5):
+            return [event async for event in VerdictAgent().verdict_stream(_search_result(), "某公司已经破产")]
+
+    events = asyncio.run(run())
+    result = events[-1]
+    assert result["type"] == "result"
+    assert result["data"]["conclusion"] == "false"
+    assert any(event.get("step") == "结论生成" and "剩余时间不足" in event["content"] for event in events)
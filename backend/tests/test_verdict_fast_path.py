@@ -0,0 +1,76 @@
+"""快速判定：只有证据高度一致、主导立场有足够的高可信度信源且没有高可信度反方时才跳过 LLM 分析"""
+import asyncio
+
+import pytest
+
+from app.agents.verdict import VerdictAgent
+from app.core.config import settings
+from app.models.source import Source
+from benchmarks.mock_llm import MockLLM
+
+
+def _sources(*specs):
+    return [Source.from_llm({"source_url": f"https://s{i}.example.com/a", "source_credibility": credibility,
+                             "source_stance": stance, "relevance_score": 0.9})
+            for i, (credibility, stance) in enumerate(specs)]
+
+
+AGREEING = _sources(("high", "opposing"), ("high", "opposing"), ("low", "supportive"))
+
+
+@pytest.fixture(autouse=True)
+def fast_path(monkeypatch):
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_ENABLED", True)
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_MARGIN", 0.7)
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_MIN_HIGH", 2)
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_SUMMARY", False)
+
+
+def _consensus(sources):
+    return VerdictAgent()._aggregate_evidence(sources)
+
+
+def test_agreeing_authoritative_sources_are_eligible():
+    consensus = _consensus(AGREEING)
+    assert consensus["eligible"]
+    assert consensus["stance"] == "opposing"
+    assert consensus["high_credibility"] == 2
+    assert 0.5 < consensus["confidence"] <= 0.95
+
+
+def test_disabled_by_default(monkeypatch):
+    assert type(settings).model_fields["VERDICT_FAST_PATH_ENABLED"].default is False
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_ENABLED", False)
+    assert not _consensus(AGREEING)["eligible"]
+
+
+@pytest.mark.parametrize("sources", [
+    # 高可信度信源不足
+    _sources(("high", "opposing"), ("medium", "opposing")),
+    # 反方有高可信度信源
+    _sources(("high", "opposing"), ("high", "opposing"), ("high", "opposing"), ("high", "supportive")),
+    # 重复链接只计一次
+    [*_sources(("high", "opposing")), *_sources(("high", "opposing"))],
+])
+def test_ineligible_evidence(sources):
+    assert not _consensus(sources)["eligible"]
+
+
+def test_margin_threshold(monkeypatch):
+    margin = _consensus(AGREEING)["margin"]
+    monkeypatch.setattr(settings, "VERDICT_FAST_PATH_MARGIN", margin + 0.01)
+    assert not _consensus(AGREEING)["eligible"]
+
+
+def test_fast_verdict_makes_no_llm_calls():
+    search_result = {"search_id": "s1", "key_sources": AGREEING[:2], "regular_sources": AGREEING[2:],
+                     "all_sources": AGREEING, "analysis": {}, "query_analysis": {}}
+    mock = MockLLM()
+
+    async def run():
+        with mock.installed():
+            return await VerdictAgent().verdict(search_result, "某公司宣布破产")
+
+    result = asyncio.run(run())
+    assert mock.stats()["total_calls"] == 0
+    assert result["conclusion"] == "false"
@@ -361,7 +361,7 @@ function EvidenceCard({
                 className="flex items-center gap-1 text-xs text-blue-600 hover:text-blue-700 transition-colors"
                 onClick={(e) => e.stopPropagation()}
               >
-                查看原文
+                {evidence.link_status === 'dead' ? '原文链接已失效' : '查看原文'}
                 <ExternalLink className="w-3 h-3" />
               </a>
             </div>
@@ -26,6 +26,7 @@ export interface Evidence {
   potential_bias?: string;
   deep_analysis?: string;
   unique_value?: string;
+  link_status?: 'alive' | 'dead' | 'unknown' | '';
 }
 
 // 关键信源引用
@@ -102,9 +103,13 @@ export interface Findings {
   nuanced_claims: string[];
 }
 
+export type AnalysisMode = 'fast' | 'standard' | 'deep';
+
 export interface VerifyRequest {
   content: string;
   image_url?: string;
+  // 搜索后的信源分析方式，未指定时使用服务端默认值
+  mode?: AnalysisMode;
 }
 
 // 扩展 VerifyResponse
@@ -115,6 +120,8 @@ export interface VerifyResponse {
   summary: string;
   evidence_list: Evidence[];
   reasoning_chain: string[];
+  // 实际执行的信源分析方式：fast / standard / deep，跳过深度分析时为 basic
+  analysis_depth?: string;
   
   // 新增扩展字段
   dimensional_analysis?: MultiDimensionalAnalysis;
@@ -141,6 +148,15 @@ export interface VerifyResponse {
     key_sources_count: number;
     analysis_depth: string;
   };
+  // 图片与此前鉴定过的图片相同：说法也一致时沿用之前的结论（reused），否则照常鉴定并附上之前的鉴定
+  image_match?: {
+    verdict_id: string;
+    distance: number;
+    original_content: string;
+    original_conclusion?: string;
+    content_similarity: number;
+    reused: boolean;
+  };
 }
 
 export interface LoadingStep {
@@ -150,8 +166,10 @@ export interface LoadingStep {
 
 // 流式事件类型
 export interface StreamEvent {
-  type: 'start' | 'reasoning' | 'result' | 'complete' | 'error';
+  type: 'start' | 'queued' | 'reasoning' | 'result' | 'complete' | 'error';
   agent?: 'parser' | 'search' | 'verdict';
+  position?: number;  // queued 事件：排队位置
+  retry_after?: number;  // 排队超时时建议的重试间隔（秒）
   step?: string;
   content?: string;
   data?: any;